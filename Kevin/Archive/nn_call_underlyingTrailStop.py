@@ -34,6 +34,7 @@ from datetime import timedelta
 import pandas as pd  # data processing
 import io # converting data to csv 
 import requests # importing data from URL
+from event_log import EventLog # buffered logging, formatted at day end
 
 class BasicTemplateOptionsAlgorithm(QCAlgorithm):
 
@@ -90,6 +91,8 @@ class BasicTemplateOptionsAlgorithm(QCAlgorithm):
         self.buyNumOfContracts = 0 # number of contracts to purchase
         self.portfolioRisk = 0.05 # percentage of portfolio to be used for purchases
         self.AdjRiskForMomentum = 0 
+        # OnData runs every minute, keep one low balance line per day (390 minutes)
+        self.events = EventLog(self, sampleEvery={"low balance": 390})
         
         # iterate through the predictions and schedule a buy event
         self.daysInARow = 0
@@ -103,12 +106,16 @@ class BasicTemplateOptionsAlgorithm(QCAlgorithm):
         #                    self.TimeRules.At(9,35), \
         #                    self.BuySignal)
 
+        # one log line for the whole day, just before the close
+        self.Schedule.On(self.DateRules.EveryDay(self.stockSymbol), \
+                        self.TimeRules.BeforeMarketClose(self.stockSymbol, 1), \
+                        self.events.flush)
+
     # OnData event is the primary entry point for your algorithm. 
     # Each new data point will be pumped in here.
     def OnData(self,slice):
         if self.Portfolio.Cash <= 10000:
-            self.Log("Low Balance < $10,000")
-            self.Debug("Low Balance < $10,000")
+            self.events.event("low balance", "cash {0:.2f} < $10,000", self.Portfolio.Cash)
         elif self.buyOptionSignal == 1:
             self.BuyCall(slice)
             
@@ -125,7 +132,7 @@ class BasicTemplateOptionsAlgorithm(QCAlgorithm):
             # Sell all contracts if the underlying equity's price has dropped below the stop loss
             elif self.equity.Price <= self.newStopPrice:
                 self.Liquidate()
-                self.Log("Stop Loss Hit: Portfolio Liquidated")
+                self.events.stopHit(self.stockSymbol, self.equity.Price)
                 self.contractList = []
                 self.highestUnderlyingPrice = 0
                 self.newStopPrice = 0
@@ -134,7 +141,7 @@ class BasicTemplateOptionsAlgorithm(QCAlgorithm):
             for i in self.contractList:
                 if(i.Symbol.ID.Date - self.Time) <= timedelta(self.DaysBeforeExp):
                     self.Liquidate(i.Symbol, "Closed: too close to expiration")
-                    self.Log("Closed: too close to expiration")
+                    self.events.expiryClose(i.Symbol, i.Symbol.ID.Date)
                     self.contractList.remove(i)
     
     # Filter Options: https://www.quantconnect.com/docs/data-library/options
@@ -149,7 +156,7 @@ class BasicTemplateOptionsAlgorithm(QCAlgorithm):
     
     # Sets 'Buy' Indicator to 1
     def BuySignal(self):
-        self.Log("BuySignal: Fired at : {0}".format(self.Time))
+        self.events.event("buy signal", "fired")
         self.buyOptionSignal = 1
 
     # Buy a Call Option - 
@@ -190,4 +197,8 @@ class BasicTemplateOptionsAlgorithm(QCAlgorithm):
         if orderEvent.Status != OrderStatus.Filled:
             return
         
-        self.Log(str(orderEvent))
\ No newline at end of file
+        self.events.trade(orderEvent)
+
+    # Log whatever is still buffered and the totals of the run
+    def OnEndOfAlgorithm(self):
+        self.events.close()
@@ -0,0 +1,86 @@
+###############################################################################################################################
+# FileName: event_log.py
+# Description:  Buffered, sampled event log for the QC algorithms. Add this file
+#               to the QuantConnect project next to the algorithm and import it
+#               with "from event_log import EventLog".
+#
+#               QuantConnect caps how much a backtest may log, and every
+#               self.Log(str(x) + ...) builds its string even when nobody reads
+#               it. EventLog keeps each event as (time, kind, template, args)
+#               and only formats it when the buffer is flushed, keeps every
+#               n-th event of high-frequency kinds (sampleEvery) and at most
+#               maxLinesPerDay events per day, and counts all of them. flush()
+#               writes one Log call per day: a count of every kind followed
+#               by the kept events. close() flushes and logs the totals of the
+#               whole run, call it from OnEndOfAlgorithm.
+#
+#               self.events = EventLog(self, sampleEvery={"low balance": 390})
+#               self.events.stopUpdate(contract.Symbol, high, stop)
+#               self.events.flush()   # end of the day
+#               self.events.close()   # OnEndOfAlgorithm
+###############################################################################################################################
+
+
+class EventLog:
+    def __init__(self, algorithm, sampleEvery=None, maxLinesPerDay=50):
+        self.algorithm = algorithm
+        self.sampleEvery = sampleEvery or {}  # kind -> keep every n-th event
+        self.maxLinesPerDay = maxLinesPerDay
+        self.buffer = []  # (time, kind, template, args), formatted at flush
+        self.counts = {}  # events of each kind since the last flush
+        self.totals = {}  # events of each kind over the whole run
+        self.dropped = 0  # events past maxLinesPerDay since the last flush
+
+    def event(self, kind, template, *args):
+        count = self.counts.get(kind, 0) + 1
+        self.counts[kind] = count
+        if (count - 1) % self.sampleEvery.get(kind, 1):
+            return
+        if len(self.buffer) >= self.maxLinesPerDay:
+            self.dropped += 1
+            return
+        self.buffer.append((self.algorithm.Time, kind, template, args))
+
+    # The events the algorithms log
+    def trade(self, orderEvent):
+        self.event(
+            "trade",
+            "{0} {1} @ {2}",
+            orderEvent.Symbol,
+            orderEvent.FillQuantity,
+            orderEvent.FillPrice,
+        )
+
+    def stopUpdate(self, symbol, high, stop):
+        self.event("stop update", "{0} high {1} stop {2:.2f}", symbol, high, stop)
+
+    def stopHit(self, symbol, price):
+        self.event("stop hit", "{0} @ {1}", symbol, price)
+
+    def expiryClose(self, symbol, expiry):
+        self.event("expiry close", "{0} expires {1:%Y-%m-%d}", symbol, expiry)
+
+    def flush(self):
+        if not self.counts:
+            return
+        lines = [
+            "events: "
+            + ", ".join("%s %d" % (kind, n) for kind, n in sorted(self.counts.items()))
+        ]
+        for time, kind, template, args in self.buffer:
+            lines.append("  %s %s: %s" % (time, kind, template.format(*args)))
+        if self.dropped:
+            lines.append("  ... %d more" % self.dropped)
+        self.algorithm.Log("\n".join(lines))
+        for kind, n in self.counts.items():
+            self.totals[kind] = self.totals.get(kind, 0) + n
+        self.buffer = []
+        self.counts = {}
+        self.dropped = 0
+
+    def close(self):
+        self.flush()
+        self.algorithm.Log(
+            "total events: "
+            + ", ".join("%s %d" % (kind, n) for kind, n in sorted(self.totals.items()))
+        )
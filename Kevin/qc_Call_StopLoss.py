@@ -26,6 +26,7 @@ from datetime import timedelta # to help calculate contract time
 import pandas as pd # to create dataframes from CSV data
 import io # to import CSV data
 import requests # http requests for CSV data from GitHub RAW files
+from event_log import EventLog # buffered logging, formatted at day end
 
 class NeuralNetworkTrailingStopLoss(QCAlgorithm):
     
@@ -40,17 +41,21 @@ class NeuralNetworkTrailingStopLoss(QCAlgorithm):
         
         # modify dataframes
         df = pd.read_csv(io.StringIO(self.Download(self.url)))
-        # split date column to three different columns for year, month and day 
-        df[['year','month','day']] = df['date'].str.split("-", expand = True) 
         df.columns = df.columns.str.lower()
         df = df[df['prediction'] == 1]  # filter rows with predictions
-        df['year'] = df['year'].astype(int) 
-        df['month'] = df['month'].astype(int) 
-        df['day'] = df['day'].astype(int) 
+        # dates are YYYY-MM-DD for daily predictions and YYYY-MM-DD HH:MM
+        # (the end of the bar) for intraday ones from rots.intraday
+        dates = pd.to_datetime(df['date'])
+        intraday = bool((dates.dt.hour > 0).any())
+        df['year'] = dates.dt.year
+        df['month'] = dates.dt.month
+        df['day'] = dates.dt.day
+        # daily signals buy at 9:31, intraday signals when their bar closes
+        df['hour'] = dates.dt.hour if intraday else 9
+        df['minute'] = dates.dt.minute if intraday else 31
         # NOTE: QuantConnect only provides options data as far back as 2010
         df = df[df['year'] >= 2010]
-        df = df.drop(columns=['date','prediction','expected','equal','correctbuysignal'])
-        buyArray = df.to_numpy() # convert to array
+        buyArray = df[['ticker','year','month','day','hour','minute']].to_numpy() # convert to array
         
         # NOTE: QuantConnect provides equity options data from AlgoSeek going 
         # back as far as 2010. The options data is available only in minute 
@@ -82,11 +87,13 @@ class NeuralNetworkTrailingStopLoss(QCAlgorithm):
         self.portfolioRisk = 0.05 # percentage of portfolio to be used for purchases
         self.minPortfolioBalance = 10000 # stop if our balance gets this low
         self.stopLossPercentage = .015 # stop loss % for contract ask price
+        self.events = EventLog(self) # flushed before the close each day
         
-        # Iterate through the predictions and schedule a buy event at 9:31
+        # Iterate through the predictions and schedule a buy event at the
+        # signal's time
         for x in buyArray:
             self.Schedule.On(self.DateRules.On(x[1], x[2], x[3]), \
-                            self.TimeRules.At(9,31), \
+                            self.TimeRules.At(x[4], x[5]), \
                             self.BuySignal)
         
         # Schedule events everyday 5 minutes before the market closes          
@@ -114,27 +121,26 @@ class NeuralNetworkTrailingStopLoss(QCAlgorithm):
                 # check if the contract is close to expiration
                 if(i.Symbol.ID.Date - self.Time) <= timedelta(self.DaysBeforeExp):
                     self.Liquidate(i.Symbol, "Liquidate: Close to Expiration")
-                    self.Log("Closed: too close to expiration")
+                    self.events.expiryClose(i.Symbol, i.Symbol.ID.Date)
                     self.contractList.remove(i) # remove the contract from our list
                 # update each contracts highest ask price
                 elif self.Securities[i.Symbol].AskPrice > self.contractDictionary[i]:
-                    self.Log("Contract AskPrice is higher, update stop loss")
                     # Save the new AskPrice high then update the stop loss %
                     self.contractDictionary[i] = self.Securities[i.Symbol].AskPrice
                     self.stopLossPercentage = self.stopLossPercentage * 2
-                    self.Log(self.stockSymbol + "- NewHigh: " + str(self.contractDictionary[i]) + \
-                               " Stop: " + str(round((self.contractDictionary[i] * (1-self.stopLossPercentage)),2)))
+                    self.events.stopUpdate(i.Symbol, self.contractDictionary[i], \
+                               self.contractDictionary[i] * (1-self.stopLossPercentage))
                 # sell our contract(s) if we hit our stop loss
                 elif self.Securities[i.Symbol].AskPrice <= round((self.contractDictionary[i] * (1-self.stopLossPercentage)),2):
                     self.Liquidate(i.Symbol, "Liquidate: Stop Loss")
-                    self.Log("Stop Loss Hit")
+                    self.events.stopHit(i.Symbol, self.Securities[i.Symbol].AskPrice)
                     self.contractList.remove(i) # remove the contract from our list
                     self.stopLossPercentage = .015 # reset stop loss
-        else: return
+        self.events.flush() # one log line for the whole day
 
     # Sets the 'Buy' Indicator to 1
     def BuySignal(self):
-        self.Log("BuySignal: Fired at : {0}".format(self.Time))
+        self.events.event("buy signal", "fired")
         self.buyOptions = 1
 
     # Receives our options chain data, sorts the options contracts and purchases
@@ -167,6 +173,13 @@ class NeuralNetworkTrailingStopLoss(QCAlgorithm):
             self.buyOptions = 0 # reset our buy signal
             self.contract = str()
 
-    # All OrderEvents are logged here
+    # All OrderEvents are logged here, fills as trades
     def OnOrderEvent(self, orderEvent):
-        self.Log(str(orderEvent))
+        if orderEvent.Status == OrderStatus.Filled:
+            self.events.trade(orderEvent)
+        else:
+            self.events.event("order", "{0}", orderEvent)
+
+    # Log whatever is still buffered and the totals of the run
+    def OnEndOfAlgorithm(self):
+        self.events.close()
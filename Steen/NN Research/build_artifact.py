@@ -0,0 +1,159 @@
+"""Offline build step for the stock_app dashboard.
+
+Does everything stock_app.py used to do at import time (parse Newdata.csv,
+fit the scaler, build the 60 day windows, run the LSTM over the validation
+span) once, and writes the results to a memory-mappable .npy artifact plus a
+small json sidecar with the scaler parameters. The app then only has to
+np.load(..., mmap_mode="r") the artifact at startup.
+
+stock_data.csv is also partitioned by ticker into one array sorted by
+(Stock, Date), with each ticker's [start, end) row offsets in the sidecar, so
+the figure callbacks slice a ticker's rows instead of scanning the table.
+
+    python build_artifact.py [--source Newdata.csv] [--model saved_model.h5]
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+ARTIFACT = "stock_app_artifact.npy"
+STOCK_INDEX = "stock_data_artifact.npy"
+SPLIT = 987  # first validation row, same split as stock_pred.py
+WINDOW = 60  # days of history fed to the LSTM
+
+ARTIFACT_DTYPE = np.dtype(
+    [
+        ("date", "datetime64[D]"),
+        ("close", "f8"),
+        ("scaled", "f4"),
+        ("prediction", "f8"),  # NaN on the training rows
+    ]
+)
+
+STOCK_INDEX_DTYPE = np.dtype(
+    [
+        ("date", "datetime64[D]"),
+        ("high", "f8"),
+        ("low", "f8"),
+        ("close", "f8"),
+        ("volume", "f8"),
+    ]
+)
+
+
+def meta_path(path):
+    return os.path.splitext(path)[0] + ".json"
+
+
+def predict_closes(model, scaled, split=SPLIT, window=WINDOW):
+    # every validation row is predicted from the window ending the day before,
+    # sliding_window_view builds those windows without copying
+    windows = np.lib.stride_tricks.sliding_window_view(scaled, window)
+    x_test = windows[split - window : len(scaled) - window]
+    return model.predict(x_test[:, :, None]).ravel()
+
+
+def build(source="Newdata.csv", model_path="saved_model.h5", path=ARTIFACT):
+    import pandas as pd
+    from keras.models import load_model
+    from sklearn.preprocessing import MinMaxScaler
+
+    df = pd.read_csv(source, usecols=["Date", "Close"])
+    df["Date"] = pd.to_datetime(df.Date, format="%Y-%m-%d")
+    df = df.sort_values("Date")
+    close = df["Close"].to_numpy(dtype=np.float64)
+
+    scaler = MinMaxScaler(feature_range=(0, 1))
+    scaled = scaler.fit_transform(close.reshape(-1, 1)).ravel()
+
+    model = load_model(model_path)
+    predictions = scaler.inverse_transform(
+        predict_closes(model, scaled).reshape(-1, 1)
+    ).ravel()
+
+    artifact = np.empty(len(close), dtype=ARTIFACT_DTYPE)
+    artifact["date"] = df["Date"].to_numpy().astype("datetime64[D]")
+    artifact["close"] = close
+    artifact["scaled"] = scaled
+    artifact["prediction"] = np.nan
+    artifact["prediction"][SPLIT:] = predictions
+    np.save(path, artifact)
+
+    with open(meta_path(path), "w") as f:
+        json.dump(
+            {
+                "source": source,
+                "model": model_path,
+                "split": SPLIT,
+                "window": WINDOW,
+                "scale_": float(scaler.scale_[0]),
+                "min_": float(scaler.min_[0]),
+            },
+            f,
+            indent=2,
+        )
+    return path
+
+
+def load(path=ARTIFACT):
+    # the structured array is memory-mapped, nothing is read until a page is used
+    artifact = np.load(path, mmap_mode="r")
+    with open(meta_path(path)) as f:
+        meta = json.load(f)
+    return artifact, meta
+
+
+def build_stock_index(source="stock_data.csv", path=STOCK_INDEX):
+    import pandas as pd
+
+    df = pd.read_csv(
+        source, usecols=["Date", "High", "Low", "Close", "Volume", "Stock"]
+    )
+    df["Date"] = pd.to_datetime(df.Date, format="%Y-%m-%d")
+    df = df.sort_values(["Stock", "Date"], kind="stable")
+
+    index = np.empty(len(df), dtype=STOCK_INDEX_DTYPE)
+    index["date"] = df["Date"].to_numpy().astype("datetime64[D]")
+    index["high"] = df["High"].to_numpy()
+    index["low"] = df["Low"].to_numpy()
+    index["close"] = df["Close"].to_numpy()
+    index["volume"] = df["Volume"].to_numpy()
+    np.save(path, index)
+
+    # rows are grouped by ticker, so each one is a contiguous [start, end) run
+    tickers, starts = np.unique(df["Stock"].to_numpy(), return_index=True)
+    ends = np.append(starts[1:], len(df))
+    with open(meta_path(path), "w") as f:
+        json.dump(
+            {
+                "source": source,
+                "offsets": {
+                    str(t): [int(s), int(e)] for t, s, e in zip(tickers, starts, ends)
+                },
+            },
+            f,
+            indent=2,
+        )
+    return path
+
+
+def load_stock_index(path=STOCK_INDEX):
+    index = np.load(path, mmap_mode="r")
+    with open(meta_path(path)) as f:
+        offsets = json.load(f)["offsets"]
+    return {ticker: index[start:end] for ticker, (start, end) in offsets.items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", default="Newdata.csv")
+    parser.add_argument("--model", default="saved_model.h5")
+    parser.add_argument("--out", default=ARTIFACT)
+    parser.add_argument("--stock-data", default="stock_data.csv")
+    parser.add_argument("--stock-index", default=STOCK_INDEX)
+    args = parser.parse_args()
+    print(build(args.source, args.model, args.out))
+    print(build_stock_index(args.stock_data, args.stock_index))
@@ -0,0 +1,70 @@
+"""Server side downsampling for the dashboard line charts.
+
+Uses Largest-Triangle-Three-Buckets (LTTB), which keeps the visual shape of a
+series (peaks and troughs) with a fixed number of points. The visible x range
+is sampled at full budget and the rest of the series at the same budget over
+its whole length, so the payload stays bounded however long the series is.
+"""
+
+import numpy as np
+
+MAX_POINTS = 1000  # per trace and per zoom level
+
+
+def lttb(x, y, threshold):
+    """Return the indices of the points LTTB keeps out of x/y."""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0] = 0
+    kept[-1] = n - 1
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        # area of the triangle between the last kept point, each candidate
+        # in this bucket and the average of the next bucket
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        kept[i + 1] = a
+    return kept
+
+
+def parse_range(relayout):
+    """Pull the visible x range out of a dcc.Graph relayoutData dict.
+
+    Returns a (start, end) pair of date strings or None for the full range.
+    """
+    if not relayout or relayout.get("xaxis.autorange"):
+        return None
+    if "xaxis.range" in relayout:
+        start, end = relayout["xaxis.range"]
+    elif "xaxis.range[0]" in relayout:
+        start, end = relayout["xaxis.range[0]"], relayout["xaxis.range[1]"]
+    else:
+        return None
+    return str(start)[:10], str(end)[:10]
+
+
+def downsample(dates, values, x_range=None, threshold=MAX_POINTS):
+    """Downsample one trace, keeping full detail budget for x_range."""
+    dates = np.asarray(dates)
+    x = dates.astype("datetime64[D]").astype(np.float64)
+    kept = lttb(x, values, threshold)
+    if x_range is not None:
+        start, end = np.searchsorted(dates, np.array(x_range, dtype="datetime64[D]"))
+        end = min(end + 1, len(dates))
+        visible = start + lttb(x[start:end], values[start:end], threshold)
+        kept = np.union1d(kept[(kept < start) | (kept >= end)], visible)
+    return dates[kept], np.asarray(values)[kept]
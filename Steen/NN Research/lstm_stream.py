@@ -0,0 +1,190 @@
+"""Stateful streaming inference for the saved LSTM closing price model.
+
+stock_pred.py/stock_app.py rebuild every 60 day window and re-run predict on
+all of them to get a single new close. StreamingLSTM instead runs the LSTM
+cells in numpy and carries the hidden/cell state of every layer forward, so
+each new bar costs one cell step per layer no matter how long the history is.
+
+Note: the model was trained on 60 bar windows starting from a zero state, so
+a state carried over a long history is an approximation of the windowed
+predictions. Use warmup() with the last 60 bars to start from the same point
+the windowed code does.
+"""
+
+import json
+
+import numpy as np
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _hard_sigmoid(x):
+    return np.clip(0.2 * x + 0.5, 0.0, 1.0)
+
+
+def _linear(x):
+    return x
+
+
+ACTIVATIONS = {
+    "sigmoid": _sigmoid,
+    "hard_sigmoid": _hard_sigmoid,
+    "tanh": np.tanh,
+    "relu": lambda x: np.maximum(x, 0.0),
+    "linear": _linear,
+}
+
+
+def _layers_from_h5(path):
+    # read the weights straight from the keras h5 file so that streaming does
+    # not have to pay the tensorflow import
+    import h5py
+
+    layers = []
+    with h5py.File(path, "r") as f:
+        config = f.attrs["model_config"]
+        if isinstance(config, bytes):
+            config = config.decode("utf-8")
+        config = json.loads(config)
+        weights = f["model_weights"]
+        for layer in config["config"]["layers"]:
+            kind = layer["class_name"]
+            if kind not in ("LSTM", "Dense"):
+                continue
+            cfg = layer["config"]
+            group = weights[cfg["name"]]
+            names = [
+                n.decode("utf-8") if isinstance(n, bytes) else n
+                for n in group.attrs["weight_names"]
+            ]
+            arrays = [np.asarray(group[n], dtype=np.float64) for n in names]
+            layers.append((kind, cfg, arrays))
+    return layers
+
+
+def _layers_from_model(model):
+    layers = []
+    for layer in model.layers:
+        kind = layer.__class__.__name__
+        if kind not in ("LSTM", "Dense"):
+            continue
+        arrays = [np.asarray(w, dtype=np.float64) for w in layer.get_weights()]
+        layers.append((kind, layer.get_config(), arrays))
+    return layers
+
+
+class StreamingLSTM:
+    """Carries LSTM state forward one bar at a time for one or many tickers.
+
+    n_streams is the number of independent series advanced together (batch
+    mode, e.g. one per ticker). scale_/min_ are the MinMaxScaler attributes
+    used to scale raw closes on the way in and un-scale predictions on the
+    way out; leave them as None to feed already scaled values.
+    """
+
+    def __init__(self, layers, n_streams=1, scale_=None, min_=None):
+        self.lstm = []
+        self.dense = []
+        for kind, cfg, arrays in layers:
+            if kind == "LSTM":
+                if not cfg.get("use_bias", True):
+                    arrays = arrays + [np.zeros(arrays[1].shape[1])]
+                kernel, recurrent, bias = arrays
+                self.lstm.append(
+                    (
+                        kernel,
+                        recurrent,
+                        bias,
+                        cfg.get("units", recurrent.shape[0]),
+                        ACTIVATIONS[cfg.get("activation", "tanh")],
+                        ACTIVATIONS[cfg.get("recurrent_activation", "sigmoid")],
+                    )
+                )
+            else:
+                if not cfg.get("use_bias", True):
+                    arrays = arrays + [np.zeros(arrays[0].shape[1])]
+                kernel, bias = arrays
+                self.dense.append(
+                    (kernel, bias, ACTIVATIONS[cfg.get("activation", "linear")])
+                )
+        if not self.lstm:
+            raise ValueError("model has no LSTM layers")
+        self.scale_ = None if scale_ is None else float(np.ravel(scale_)[0])
+        self.min_ = None if min_ is None else float(np.ravel(min_)[0])
+        self.reset(n_streams)
+
+    @classmethod
+    def from_h5(cls, path="saved_model.h5", **kwargs):
+        return cls(_layers_from_h5(path), **kwargs)
+
+    @classmethod
+    def from_model(cls, model, **kwargs):
+        return cls(_layers_from_model(model), **kwargs)
+
+    @classmethod
+    def from_scaler(cls, path, scaler, **kwargs):
+        # reuse a fitted sklearn MinMaxScaler for the input/output scaling
+        return cls.from_h5(path, scale_=scaler.scale_, min_=scaler.min_, **kwargs)
+
+    def reset(self, n_streams=None):
+        if n_streams is not None:
+            self.n_streams = n_streams
+        self.h = [
+            np.zeros((self.n_streams, units)) for _, _, _, units, _, _ in self.lstm
+        ]
+        self.c = [
+            np.zeros((self.n_streams, units)) for _, _, _, units, _, _ in self.lstm
+        ]
+
+    def _scale(self, x):
+        if self.scale_ is None:
+            return x
+        return x * self.scale_ + self.min_
+
+    def _unscale(self, y):
+        if self.scale_ is None:
+            return y
+        return (y - self.min_) / self.scale_
+
+    def step(self, values):
+        """Advance every stream by one bar and return the next predictions.
+
+        values has one entry per stream; the result has the same shape.
+        """
+        x = self._scale(
+            np.asarray(values, dtype=np.float64).reshape(self.n_streams, -1)
+        )
+        for i, (kernel, recurrent, bias, units, act, rec_act) in enumerate(self.lstm):
+            # keras gate order is input, forget, cell, output
+            z = x @ kernel + self.h[i] @ recurrent + bias
+            gate_i = rec_act(z[:, :units])
+            gate_f = rec_act(z[:, units : 2 * units])
+            gate_c = act(z[:, 2 * units : 3 * units])
+            gate_o = rec_act(z[:, 3 * units :])
+            self.c[i] = gate_f * self.c[i] + gate_i * gate_c
+            self.h[i] = gate_o * act(self.c[i])
+            x = self.h[i]
+        for kernel, bias, act in self.dense:
+            x = act(x @ kernel + bias)
+        return self._unscale(x[:, 0])
+
+    def update(self, value):
+        # single ticker convenience wrapper around step
+        return float(self.step([value])[0])
+
+    def warmup(self, history):
+        """Reset and run the given bars through the cells.
+
+        history is (n_bars,) for one stream or (n_bars, n_streams) for many;
+        returns the prediction after the last bar.
+        """
+        history = np.asarray(history, dtype=np.float64)
+        if history.ndim == 1:
+            history = history[:, None]
+        self.reset(history.shape[1])
+        prediction = None
+        for row in history:
+            prediction = self.step(row)
+        return prediction
@@ -0,0 +1,83 @@
+"""Change-aware columnar cache of the ROTS prediction files.
+
+Kevin/Final_NN_Output holds one <TICKER>_pred_<date>.csv per model run. The
+cache only lists the directory up front; a file is parsed into numpy columns
+the first time its ticker is requested, and re-parsed only when its mtime or
+size changed and its content hash differs. Adding a new prediction file
+therefore costs one incremental load.
+"""
+
+import glob
+import hashlib
+import os
+
+import numpy as np
+
+SIGNAL_DIR = os.path.join("..", "..", "Kevin", "Final_NN_Output")
+PATTERN = "*_pred_*.csv"
+
+
+def ticker_of(path):
+    return os.path.basename(path).split("_pred_")[0]
+
+
+def file_digest(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_signals(path):
+    import pandas as pd
+
+    df = pd.read_csv(path, usecols=["date", "prediction", "expected"])
+    return {
+        "date": pd.to_datetime(df["date"]).to_numpy().astype("datetime64[D]"),
+        "prediction": df["prediction"].to_numpy(dtype=np.int8),
+        "expected": df["expected"].to_numpy(dtype=np.int8),
+    }
+
+
+class SignalCache:
+    def __init__(self, directory=SIGNAL_DIR, pattern=PATTERN):
+        self.directory = directory
+        self.pattern = pattern
+        self.entries = {}  # path -> (mtime_ns, size, digest, columns)
+        self.loads = 0  # number of files actually parsed
+
+    def files(self):
+        """Map each ticker to its newest prediction file."""
+        latest = {}
+        for path in glob.glob(os.path.join(self.directory, self.pattern)):
+            ticker = ticker_of(path)
+            if ticker not in latest or os.path.getmtime(path) > os.path.getmtime(
+                latest[ticker]
+            ):
+                latest[ticker] = path
+        return latest
+
+    def tickers(self):
+        return sorted(self.files())
+
+    def load(self, path):
+        stat = os.stat(path)
+        entry = self.entries.get(path)
+        if entry is not None and entry[:2] == (stat.st_mtime_ns, stat.st_size):
+            return entry[3]
+        digest = file_digest(path)
+        if entry is not None and entry[2] == digest:
+            # touched but unchanged, keep the parsed columns
+            columns = entry[3]
+        else:
+            columns = read_signals(path)
+            self.loads += 1
+        self.entries[path] = (stat.st_mtime_ns, stat.st_size, digest, columns)
+        return columns
+
+    def get(self, ticker):
+        path = self.files().get(ticker)
+        if path is None:
+            raise KeyError(ticker)
+        return self.load(path)
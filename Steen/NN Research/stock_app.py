@@ -1,75 +1,71 @@
+import os
+from functools import lru_cache
+
 import dash
 import dash_core_components as dcc
 import dash_html_components as html
-import pandas as pd
 import plotly.graph_objs as go
 from dash.dependencies import Input, Output
-from keras.models import load_model
-from sklearn.preprocessing import MinMaxScaler
 import numpy as np
 
+import build_artifact
+import downsample
+import signal_cache
 
 app = dash.Dash()
 server = app.server
 
-scaler = MinMaxScaler(feature_range=(0, 1))
-
-
-df_nse = pd.read_csv("./Newdata.csv")
-
-df_nse["Date"] = pd.to_datetime(df_nse.Date, format="%Y-%m-%d")
-df_nse.index = df_nse["Date"]
-
-
-data = df_nse.sort_index(ascending=True, axis=0)
-new_data = pd.DataFrame(index=range(0, len(df_nse)), columns=["Date", "Close"])
-
-for i in range(0, len(data)):
-    new_data["Date"][i] = data["Date"][i]
-    new_data["Close"][i] = data["Close"][i]
-
-new_data.index = new_data.Date
-new_data.drop("Date", axis=1, inplace=True)
-
-dataset = new_data.values
-
-train = dataset[0:987, :]
-valid = dataset[987:, :]
+# predictions and the scaled series are built offline by build_artifact.py,
+# startup only memory-maps them instead of refitting and re-running the LSTM
+if not os.path.exists(build_artifact.ARTIFACT):
+    build_artifact.build()
+artifact, meta = build_artifact.load()
+split = meta["split"]
 
-scaler = MinMaxScaler(feature_range=(0, 1))
-scaled_data = scaler.fit_transform(dataset)
+dates = artifact["date"]
+valid_dates = dates[split:]
+valid_close = artifact["close"][split:]
+valid_predictions = artifact["prediction"][split:]
 
-x_train, y_train = [], []
+FIGURE_CACHE_SIZE = 256
 
-for i in range(60, len(train)):
-    x_train.append(scaled_data[i - 60 : i, 0])
-    y_train.append(scaled_data[i, 0])
+_model = None
 
-x_train, y_train = np.array(x_train), np.array(y_train)
 
-x_train = np.reshape(x_train, (x_train.shape[0], x_train.shape[1], 1))
+def get_model():
+    # keras is only imported when live re-scoring is requested
+    global _model
+    if _model is None:
+        from keras.models import load_model
 
-model = load_model("saved_model.h5")
+        _model = load_model(meta["model"])
+    return _model
 
-inputs = new_data[len(new_data) - len(valid) - 60 :].values
-inputs = inputs.reshape(-1, 1)
-inputs = scaler.transform(inputs)
 
-X_test = []
-for i in range(60, inputs.shape[0]):
-    X_test.append(inputs[i - 60 : i, 0])
-X_test = np.array(X_test)
-
-X_test = np.reshape(X_test, (X_test.shape[0], X_test.shape[1], 1))
-closing_price = model.predict(X_test)
-closing_price = scaler.inverse_transform(closing_price)
+def prediction_figure(predictions):
+    return {
+        "data": [
+            go.Scatter(
+                x=valid_dates,
+                y=predictions,
+                mode="markers",
+            )
+        ],
+        "layout": go.Layout(
+            title="scatter plot",
+            xaxis={"title": "Date"},
+            yaxis={"title": "Closing Rate"},
+        ),
+    }
 
-train = new_data[:987]
-valid = new_data[987:]
-valid["Predictions"] = closing_price
 
+# stock_data.csv pre-partitioned by ticker, see build_artifact.build_stock_index
+if not os.path.exists(build_artifact.STOCK_INDEX):
+    build_artifact.build_stock_index()
+stocks = build_artifact.load_stock_index()
 
-df = pd.read_csv("./stock_data.csv")
+# prediction files are only listed here, each one is parsed on first use
+signals = signal_cache.SignalCache()
 
 app.layout = html.Div(
     [
@@ -91,8 +87,8 @@ app.layout = html.Div(
                                     figure={
                                         "data": [
                                             go.Scatter(
-                                                x=train.index,
-                                                y=valid["Close"],
+                                                x=valid_dates,
+                                                y=valid_close,
                                                 mode="markers",
                                             )
                                         ],
@@ -109,20 +105,12 @@ app.layout = html.Div(
                                 ),
                                 dcc.Graph(
                                     id="Predicted Data",
-                                    figure={
-                                        "data": [
-                                            go.Scatter(
-                                                x=valid.index,
-                                                y=valid["Predictions"],
-                                                mode="markers",
-                                            )
-                                        ],
-                                        "layout": go.Layout(
-                                            title="scatter plot",
-                                            xaxis={"title": "Date"},
-                                            yaxis={"title": "Closing Rate"},
-                                        ),
-                                    },
+                                    figure=prediction_figure(valid_predictions),
+                                ),
+                                html.Button(
+                                    "Re-score with model",
+                                    id="rescore",
+                                    n_clicks=0,
                                 ),
                             ]
                         )
@@ -181,40 +169,92 @@ app.layout = html.Div(
                         ),
                     ],
                 ),
+                dcc.Tab(
+                    label="NN Buy Signals",
+                    children=[
+                        html.Div(
+                            [
+                                html.H1(
+                                    "Neural Network Buy Signals",
+                                    style={"textAlign": "center"},
+                                ),
+                                dcc.Dropdown(
+                                    id="signal-dropdown",
+                                    style={
+                                        "display": "block",
+                                        "margin-left": "auto",
+                                        "margin-right": "auto",
+                                        "width": "60%",
+                                    },
+                                ),
+                                dcc.Graph(id="signals"),
+                            ],
+                            className="container",
+                        ),
+                    ],
+                ),
             ],
         ),
     ]
 )
 
 
-@app.callback(Output("highlow", "figure"), [Input("my-dropdown", "value")])
-def update_graph(selected_dropdown):
-    dropdown = {
-        "TSLA": "Tesla",
-        "AAPL": "Apple",
-        "FB": "Facebook",
-        "MSFT": "Microsoft",
-    }
+@app.callback(Output("Predicted Data", "figure"), [Input("rescore", "n_clicks")])
+def rescore(n_clicks):
+    if not n_clicks:
+        return prediction_figure(valid_predictions)
+    scaled = np.asarray(artifact["scaled"], dtype=np.float64)
+    predictions = build_artifact.predict_closes(
+        get_model(), scaled, split, meta["window"]
+    )
+    return prediction_figure((predictions - meta["min_"]) / meta["scale_"])
+
+
+dropdown = {
+    "TSLA": "Tesla",
+    "AAPL": "Apple",
+    "FB": "Facebook",
+    "MSFT": "Microsoft",
+}
+
+
+@app.callback(
+    Output("highlow", "figure"),
+    [Input("my-dropdown", "value"), Input("highlow", "relayoutData")],
+)
+def update_graph(selected_dropdown, relayout):
+    return highlow_figure(
+        tuple(selected_dropdown or ()), downsample.parse_range(relayout)
+    )
+
+
+# figures are cached per (selection, visible range) so repeated interactions
+# with the same dropdown/zoom state do not rebuild them
+@lru_cache(maxsize=FIGURE_CACHE_SIZE)
+def highlow_figure(selected_dropdown, x_range):
     trace1 = []
     trace2 = []
     for stock in selected_dropdown:
+        rows = stocks[stock]
+        x, y = downsample.downsample(rows["date"], rows["high"], x_range)
         trace1.append(
             go.Scatter(
-                x=df[df["Stock"] == stock]["Date"],
-                y=df[df["Stock"] == stock]["High"],
+                x=x,
+                y=y,
                 mode="lines",
                 opacity=0.7,
-                name=f"High {dropdown[stock]}",
+                name=f"High {dropdown.get(stock, stock)}",
                 textposition="bottom center",
             )
         )
+        x, y = downsample.downsample(rows["date"], rows["low"], x_range)
         trace2.append(
             go.Scatter(
-                x=df[df["Stock"] == stock]["Date"],
-                y=df[df["Stock"] == stock]["Low"],
+                x=x,
+                y=y,
                 mode="lines",
                 opacity=0.6,
-                name=f"Low {dropdown[stock]}",
+                name=f"Low {dropdown.get(stock, stock)}",
                 textposition="bottom center",
             )
         )
@@ -225,7 +265,8 @@ def update_graph(selected_dropdown):
         "layout": go.Layout(
             colorway=["#5E0DAC", "#FF4F00", "#375CB1", "#FF7400", "#FFF400", "#FF0056"],
             height=600,
-            title=f"High and Low Prices for {', '.join(str(dropdown[i]) for i in selected_dropdown)} Over Time",
+            uirevision=str(selected_dropdown),
+            title=f"High and Low Prices for {', '.join(str(dropdown.get(i, i)) for i in selected_dropdown)} Over Time",
             xaxis={
                 "title": "Date",
                 "rangeselector": {
@@ -256,23 +297,29 @@ def update_graph(selected_dropdown):
     return figure
 
 
-@app.callback(Output("volume", "figure"), [Input("my-dropdown2", "value")])
-def update_graph(selected_dropdown_value):
-    dropdown = {
-        "TSLA": "Tesla",
-        "AAPL": "Apple",
-        "FB": "Facebook",
-        "MSFT": "Microsoft",
-    }
+@app.callback(
+    Output("volume", "figure"),
+    [Input("my-dropdown2", "value"), Input("volume", "relayoutData")],
+)
+def update_volume(selected_dropdown_value, relayout):
+    return volume_figure(
+        tuple(selected_dropdown_value or ()), downsample.parse_range(relayout)
+    )
+
+
+@lru_cache(maxsize=FIGURE_CACHE_SIZE)
+def volume_figure(selected_dropdown_value, x_range):
     trace1 = []
     for stock in selected_dropdown_value:
+        rows = stocks[stock]
+        x, y = downsample.downsample(rows["date"], rows["volume"], x_range)
         trace1.append(
             go.Scatter(
-                x=df[df["Stock"] == stock]["Date"],
-                y=df[df["Stock"] == stock]["Volume"],
+                x=x,
+                y=y,
                 mode="lines",
                 opacity=0.7,
-                name=f"Volume {dropdown[stock]}",
+                name=f"Volume {dropdown.get(stock, stock)}",
                 textposition="bottom center",
             )
         )
@@ -283,7 +330,8 @@ def update_graph(selected_dropdown_value):
         "layout": go.Layout(
             colorway=["#5E0DAC", "#FF4F00", "#375CB1", "#FF7400", "#FFF400", "#FF0056"],
             height=600,
-            title=f"Market Volume for {', '.join(str(dropdown[i]) for i in selected_dropdown_value)} Over Time",
+            uirevision=str(selected_dropdown_value),
+            title=f"Market Volume for {', '.join(str(dropdown.get(i, i)) for i in selected_dropdown_value)} Over Time",
             xaxis={
                 "title": "Date",
                 "rangeselector": {
@@ -314,5 +362,76 @@ def update_graph(selected_dropdown_value):
     return figure
 
 
+@app.callback(Output("signal-dropdown", "options"), [Input("tabs", "value")])
+def update_signal_options(tab):
+    # re-list the directory whenever the tabs change so new files show up
+    return [{"label": t, "value": t} for t in signals.tickers()]
+
+
+def price_at(ticker, when):
+    # closing price on each date, NaN where stock_data.csv has no bar
+    if ticker not in stocks:
+        return np.full(len(when), np.nan)
+    rows = stocks[ticker]
+    at = np.clip(np.searchsorted(rows["date"], when), 0, max(len(rows) - 1, 0))
+    found = len(rows) > 0 and rows["date"][at] == when
+    return np.where(found, rows["close"][at], np.nan)
+
+
+@app.callback(Output("signals", "figure"), [Input("signal-dropdown", "value")])
+def update_signals(ticker):
+    if not ticker:
+        return {"data": [], "layout": go.Layout(height=600)}
+    columns = signals.get(ticker)
+    buys = columns["date"][columns["prediction"] == 1]
+    hits = columns["date"][(columns["prediction"] == 1) & (columns["expected"] == 1)]
+    buy_y, hit_y = price_at(ticker, buys), price_at(ticker, hits)
+    if not np.isnan(buy_y).all():
+        # overlay the signals on the closing price where we have it
+        rows = stocks[ticker]
+        x, y = downsample.downsample(rows["date"], rows["close"])
+        base = [go.Scatter(x=x, y=y, mode="lines", name=f"Close {ticker}")]
+        y_title = "Price (USD)"
+    else:
+        base = [
+            go.Scatter(
+                x=columns["date"],
+                y=columns["expected"],
+                mode="lines",
+                line={"shape": "hv"},
+                opacity=0.4,
+                name="Expected",
+            )
+        ]
+        buy_y, hit_y, y_title = np.ones(len(buys)), np.ones(len(hits)), "Signal"
+    figure = {
+        "data": base
+        + [
+            go.Scatter(
+                x=buys,
+                y=buy_y,
+                mode="markers",
+                marker={"symbol": "triangle-up", "size": 9},
+                name="Buy signal",
+            ),
+            go.Scatter(
+                x=hits,
+                y=hit_y,
+                mode="markers",
+                marker={"symbol": "circle-open", "size": 14},
+                name="Correct buy signal",
+            ),
+        ],
+        "layout": go.Layout(
+            colorway=["#375CB1", "#5E0DAC", "#FF4F00"],
+            height=600,
+            title=f"Buy Signals for {ticker}",
+            xaxis={"title": "Date", "type": "date"},
+            yaxis={"title": y_title},
+        ),
+    }
+    return figure
+
+
 if __name__ == "__main__":
     app.run_server(debug=True)
@@ -0,0 +1,46 @@
+"""Batched numpy training of many per-ticker networks (rots.batched)."""
+
+import numpy as np
+import pytest
+
+from rots import batched
+
+
+def _datasets(n_models, rows=300, n_features=12, seed=0):
+    rng = np.random.default_rng(seed)
+    datasets = []
+    for m in range(n_models):
+        n = rows - 20 * (m % 5)  # tickers with shorter histories, like a real store
+        X = rng.random((n, n_features)).astype(np.float32)
+        y = (X[:, 0] + 0.5 * rng.random(n) > 0.75).astype(np.float32)
+        datasets.append((X, y))
+    return datasets
+
+
+def _val_loss(network, datasets, validation_split):
+    X, y, counts = batched.stack(datasets)
+    position = np.arange(y.shape[1])
+    n_train = (counts * (1.0 - validation_split)).astype(int)
+    val_rows = (position < counts[:, None]) & (position >= n_train[:, None])
+    p = np.clip(network.predict(X), batched.EPSILON, 1.0 - batched.EPSILON)
+    losses = -(val_rows * (y * np.log(p) + (1.0 - y) * np.log(1.0 - p)))
+    return losses.sum(axis=1) / val_rows.sum(axis=1)
+
+
+@pytest.mark.parametrize("n_models", [1, 16, 64])
+def test_train_batched(benchmark, n_models):
+    datasets = _datasets(n_models)
+    benchmark(batched.train_batched, datasets, epochs=5)
+
+
+def test_patience_restores_best_weights():
+    datasets = _datasets(4)
+    network, history = batched.train_batched(
+        datasets, epochs=60, batch_size=16, patience=5, validation_split=0.3
+    )
+    assert (history["stopped"] < 60).any()
+    np.testing.assert_allclose(
+        _val_loss(network, datasets, 0.3),
+        np.nanmin(history["val_loss"], axis=0),
+        rtol=1e-5,
+    )
@@ -0,0 +1,124 @@
+import numpy as np
+import pytest
+
+from rots import features, labels, model, pipeline
+from rots.scaler import FeatureScaler, expanding_transform
+from rots.synthetic import synthetic_ohlc
+
+
+@pytest.mark.benchmark(group="indicators")
+def test_indicators(benchmark, bars):
+    benchmark(features.indicator_columns, bars)
+
+
+@pytest.mark.benchmark(group="features")
+def test_build_features(benchmark, bars):
+    benchmark(features.build_features, bars)
+
+
+@pytest.mark.benchmark(group="labels")
+def test_label_loop(benchmark, bars):
+    benchmark(labels.label_loop, bars["adjusted_close"].tolist())
+
+
+@pytest.mark.benchmark(group="labels")
+def test_label_vectorized(benchmark, bars):
+    benchmark(labels.expected_labels, bars["adjusted_close"].to_numpy())
+
+
+@pytest.mark.benchmark(group="scaling")
+def test_min_max_scale(benchmark, bars):
+    pytest.importorskip("sklearn")
+    data = features.build_features(bars)
+    benchmark(features.min_max_scale, data)
+
+
+@pytest.mark.benchmark(group="scaling")
+def test_feature_scaler_transform(benchmark, bars):
+    data = features.build_features(bars)[features.FEATURES].to_numpy()
+    scaler = FeatureScaler().fit("SYN", data)
+    scaled = benchmark(scaler.transform, "SYN", data)
+    data_min, data_max = data.min(axis=0), data.max(axis=0)
+    np.testing.assert_allclose(scaled, (data - data_min) / (data_max - data_min))
+    # the saved parameters are those of the expanding scaling's last row
+    np.testing.assert_allclose(scaled[-1], expanding_transform(data)[-1])
+
+
+def test_update_with_saved_scaler(tmp_path):
+    bars = synthetic_ohlc(800, seed=3)
+    state = features.FeatureState()
+    history = pipeline.labelled(bars.iloc[:780], state)
+    scaler, _ = pipeline.scale("SYN", history, len(history))
+    scaler.save(pipeline.scaler_path("SYN", tmp_path))
+    pipeline.save_state(pipeline.state_path("SYN", tmp_path), state, bars.index[779])
+    network = model.DenseWeights([(np.full((12, 1), 1 / 12), np.zeros(1), "sigmoid")])
+    _, rows = pipeline.update(
+        "SYN", tmp_path, bars=bars, out_dir=tmp_path, network=network, refit=None
+    )
+    new = pipeline.labelled(bars)[features.FEATURES].iloc[-20:]
+    np.testing.assert_allclose(
+        rows["probability"], network.predict(scaler.transform("SYN", new))
+    )
+
+
+def _lstm_windows_loop(scaled, window=60):
+    # the windowing loop from Steen/NN Research/stock_pred.py
+    x_train_data, y_train_data = [], []
+    for i in range(window, len(scaled)):
+        x_train_data.append(scaled[i - window : i, 0])
+        y_train_data.append(scaled[i, 0])
+    x_train_data, y_train_data = np.array(x_train_data), np.array(y_train_data)
+    return np.reshape(x_train_data, (x_train_data.shape[0], x_train_data.shape[1], 1))
+
+
+def _lstm_windows_view(scaled, window=60):
+    windows = np.lib.stride_tricks.sliding_window_view(scaled[:, 0], window)
+    return windows[:-1, :, None]
+
+
+@pytest.mark.benchmark(group="lstm-windows")
+def test_lstm_windows_loop(benchmark, bars):
+    scaled = bars[["close"]].to_numpy()
+    benchmark(_lstm_windows_loop, scaled)
+
+
+@pytest.mark.benchmark(group="lstm-windows")
+def test_lstm_windows_view(benchmark, bars):
+    scaled = bars[["close"]].to_numpy()
+    benchmark(_lstm_windows_view, scaled)
+
+
+@pytest.fixture
+def training_set(bars):
+    pytest.importorskip("sklearn")
+    data = features.min_max_scale(features.build_features(bars))
+    X = data[features.FEATURES].to_numpy(dtype=np.float32)
+    y = labels.expected_labels(bars["adjusted_close"].to_numpy())[features.WARMUP :]
+    return X, y.astype(np.float32)
+
+
+@pytest.mark.benchmark(group="train-epoch")
+def test_train_epoch(benchmark, training_set):
+    pytest.importorskip("keras")
+    from rots.model import BATCH_SIZE, build_model
+
+    X, y = training_set
+    model = build_model(X.shape[1])
+    # one epoch at the notebook's batch size; a full run is 300 of these
+    benchmark.pedantic(
+        model.fit,
+        args=(X, y),
+        kwargs={"epochs": 1, "batch_size": BATCH_SIZE, "verbose": 0},
+        rounds=3,
+        warmup_rounds=1,
+    )
+
+
+@pytest.mark.benchmark(group="predict")
+def test_predict(benchmark, training_set):
+    pytest.importorskip("keras")
+    from rots.model import build_model, predict_classes
+
+    X, _ = training_set
+    model = build_model(X.shape[1])
+    benchmark(predict_classes, model, X)
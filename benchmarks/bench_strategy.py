@@ -0,0 +1,121 @@
+"""Strategy logic from Kevin/qc_Call_StopLoss.py on synthetic option chains.
+
+The algorithm file is executed with a few stand-in QuantConnect names so its
+methods can be timed directly, without Initialize or the cloud engine.
+"""
+
+import datetime
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from conftest import ROOT
+
+ALGORITHM = os.path.join(ROOT, "Kevin", "qc_Call_StopLoss.py")
+
+
+def load_algorithm(path=ALGORITHM, name="NeuralNetworkTrailingStopLoss"):
+    pytest.importorskip("requests")
+    # project files next to the algorithm (event_log.py) import by name
+    if os.path.dirname(path) not in sys.path:
+        sys.path.append(os.path.dirname(path))
+    namespace = {"QCAlgorithm": object, "__name__": "algorithm"}
+    with open(path) as f:
+        exec(compile(f.read(), path, "exec"), namespace)
+    return namespace[name]
+
+
+class Stub:
+    # like SimpleNamespace but hashable, contracts and symbols are dict keys
+    def __init__(self, **attributes):
+        self.__dict__.update(attributes)
+
+
+class FakeSecurities(dict):
+    def __missing__(self, symbol):
+        return SimpleNamespace(AskPrice=0.0)
+
+
+def synthetic_chain(
+    n_contracts, seed=0, price=100.0, now=datetime.datetime(2021, 1, 4)
+):
+    rng = np.random.default_rng(seed)
+    strikes = np.round(price * rng.uniform(0.8, 1.3, n_contracts))
+    days = rng.integers(25, 36, n_contracts)
+    contracts = [
+        Stub(
+            Strike=float(strike),
+            Expiry=now + datetime.timedelta(days=int(day)),
+            Right=int(i % 2),
+            AskPrice=float(max(price - strike, 0) + 1.0),
+            Symbol=Stub(ID=Stub(Date=now + datetime.timedelta(days=int(day)))),
+        )
+        for i, (strike, day) in enumerate(zip(strikes, days))
+    ]
+    return contracts
+
+
+def make_algorithm(cls, now=datetime.datetime(2021, 1, 4)):
+    from event_log import EventLog
+
+    algorithm = cls()
+    algorithm.Time = now
+    algorithm.Log = lambda message: None
+    algorithm.Liquidate = lambda symbol, tag="": None
+    algorithm.MarketOrder = lambda symbol, quantity: SimpleNamespace(
+        AverageFillPrice=1.0
+    )
+    algorithm.Portfolio = SimpleNamespace(Cash=100000.0)
+    algorithm.Securities = FakeSecurities()
+    algorithm.option_symbol = "TSLA_OPTION"
+    algorithm.stockSymbol = "TSLA"
+    algorithm.contract = str()
+    algorithm.buyOptions = 1
+    algorithm.DaysBeforeExp = 3
+    algorithm.portfolioRisk = 0.05
+    algorithm.stopLossPercentage = 0.015
+    algorithm.contractList = []
+    algorithm.contractDictionary = {}
+    algorithm.events = EventLog(algorithm)
+    return algorithm
+
+
+@pytest.mark.benchmark(group="strategy-buy-call")
+@pytest.mark.parametrize("n_contracts", [50, 500, 5000])
+def test_buy_call(benchmark, n_contracts):
+    cls = load_algorithm()
+    contracts = synthetic_chain(n_contracts)
+    chain_type = type("Chain", (list,), {})
+    chain = chain_type(contracts)
+    chain.Underlying = SimpleNamespace(Price=100.0)
+    data = SimpleNamespace(
+        OptionChains=[SimpleNamespace(Key="TSLA_OPTION", Value=chain)]
+    )
+
+    def setup():
+        return (make_algorithm(cls), data), {}
+
+    benchmark.pedantic(cls.BuyCall, setup=setup, rounds=20)
+
+
+@pytest.mark.benchmark(group="strategy-stop-check")
+@pytest.mark.parametrize("n_open", [10, 100, 1000])
+def test_every_day_before_market_close(benchmark, n_open):
+    cls = load_algorithm()
+    contracts = synthetic_chain(n_open, seed=1)
+    rng = np.random.default_rng(2)
+    asks = rng.uniform(0.5, 1.5, n_open)
+
+    def setup():
+        algorithm = make_algorithm(cls)
+        algorithm.contractList = list(contracts)
+        algorithm.contractDictionary = {c: 1.0 for c in contracts}
+        algorithm.Securities.update(
+            {c.Symbol: SimpleNamespace(AskPrice=a) for c, a in zip(contracts, asks)}
+        )
+        return (algorithm,), {}
+
+    benchmark.pedantic(cls.EveryDayBeforeMarketClose, setup=setup, rounds=20)
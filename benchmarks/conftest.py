@@ -0,0 +1,31 @@
+"""Benchmark suite for the ROTS pipeline and the QuantConnect strategy logic.
+
+Uses pytest-benchmark on deterministic synthetic data. The files are named
+bench_*.py so a plain `pytest` run does not pick them up; run them from the
+repo root and save the results so they can be compared across commits:
+
+    python -m pytest benchmarks/bench_*.py --benchmark-autosave
+    python -m pytest benchmarks/bench_*.py --benchmark-compare
+    pytest-benchmark compare --group-by=group,param
+
+Results are written to .benchmarks/, one json per run tagged with the commit.
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from rots.synthetic import synthetic_ohlc  # noqa: E402
+
+# ~3 years (one notebook run), ~20 years, and a long intraday-sized history
+SIZES = [750, 5000, 50000]
+
+
+@pytest.fixture(params=SIZES, ids=lambda n: f"{n}d")
+def bars(request):
+    return synthetic_ohlc(request.param, seed=42)
@@ -0,0 +1,6 @@
+"""ROTS (Return On Technical Signals) pipeline.
+
+The pieces of Kevin/ROTS_Neural_Network.ipynb as importable functions:
+technical indicators, the feature frame, the 3% in 3 days label, scaling and
+the Dense model, so they can be reused outside the notebook and measured.
+"""
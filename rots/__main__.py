@@ -0,0 +1,191 @@
+"""ROTS command line.
+
+    python -m rots fetch TSLA --out TSLA_bars.csv
+    python -m rots features TSLA_bars.csv --out TSLA_features.csv
+    python -m rots train TSLA --bars TSLA_bars.csv --model-dir models
+    python -m rots predict TSLA AMD --model-dir models --bars-dir bars
+    python -m rots evaluate Kevin/Final_NN_Output
+    python -m rots backtest Kevin/qc_Call_StopLoss.py
+    python -m rots tickers Kevin/Final_NN_Output
+
+Only the standard library is imported up front. Every subcommand imports what
+it needs when it runs, so --help and tickers start in a few tens of
+milliseconds, the numpy/pandas commands never load TensorFlow, and only
+train (and ensemble) pay for Keras. predict scores with the numpy forward
+pass of pipeline.update.
+"""
+
+import argparse
+import os
+import re
+import sys
+
+PREDICTION = re.compile(r"^(?P<ticker>[A-Za-z0-9.\-]+)_pred_(?P<date>[0-9-]+)\.csv$")
+MODEL = re.compile(r"^(?P<ticker>[A-Za-z0-9.\-]+)\.h5$")
+
+
+def _read_bars(path):
+    import pandas as pd
+
+    return pd.read_csv(path, index_col=0, parse_dates=True)
+
+
+def fetch(args):
+    from rots import pipeline
+
+    bars = pipeline.fetch_bars(args.ticker)
+    bars.to_csv(args.out or "%s_bars.csv" % args.ticker)
+
+
+def features(args):
+    from rots import pipeline
+
+    data = pipeline.prepare(_read_bars(args.bars), years=args.years)
+    data.to_csv(args.out or sys.stdout)
+
+
+def train(args):
+    from rots import pipeline
+    from rots.instrument import Recorder
+
+    bars = _read_bars(args.bars) if args.bars else None
+    path, _ = pipeline.run(
+        args.ticker,
+        bars=bars,
+        out_dir=args.out_dir,
+        recorder=Recorder(args.stages),
+        epochs=args.epochs,
+        model_dir=args.model_dir,
+    )
+    print(path)
+
+
+def predict(args):
+    from rots import pipeline
+
+    if args.bars and len(args.tickers) > 1:
+        sys.exit("rots predict: --bars holds one ticker's bars, use --bars-dir")
+    for ticker in args.tickers:
+        bars = None
+        if args.bars:
+            bars = _read_bars(args.bars)
+        elif args.bars_dir and os.path.exists(
+            os.path.join(args.bars_dir, ticker + ".csv")
+        ):
+            bars = _read_bars(os.path.join(args.bars_dir, ticker + ".csv"))
+        path, rows = pipeline.update(
+            ticker, args.model_dir, bars=bars, out_dir=args.out_dir
+        )
+        print(path)
+        if len(rows):
+            print(rows.to_string())
+
+
+def evaluate(args):
+    from rots import evaluate as evaluation
+
+    table = evaluation.evaluate(*evaluation.load(args.pred_dir, args.pattern))
+    if args.out:
+        table.to_csv(args.out)
+    print(table.round(3).to_string())
+
+
+def backtest(args):
+    from rots import localqc
+
+    jobs = [
+        {
+            "path": path,
+            "bars_dir": args.bars_dir,
+            "vol": args.vol,
+            "seed": args.seed,
+            "library": args.library,
+        }
+        for path in args.algorithms
+    ]
+    if len(jobs) > 1:
+        results = localqc.run_many(jobs, args.workers)
+    else:
+        results = [localqc.run(**jobs[0])]
+    for path, result in zip(args.algorithms, results):
+        print(path, result.name)
+        for key, value in result.statistics.items():
+            print("  %-16s %s" % (key, value))
+
+
+def tickers(args):
+    found = {}
+    for name in sorted(os.listdir(args.directory)):
+        match = PREDICTION.match(name) or MODEL.match(name)
+        if match:
+            dates = found.setdefault(match.group("ticker"), [])
+            dates.append(match.groupdict().get("date") or "model")
+    for ticker, dates in sorted(found.items()):
+        print(ticker, " ".join(dates))
+
+
+def parser():
+    main = argparse.ArgumentParser(prog="rots", description=__doc__.splitlines()[0])
+    commands = main.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("fetch", help="download daily bars (Alpha Vantage)")
+    command.add_argument("ticker")
+    command.add_argument("--out")
+    command.set_defaults(run=fetch)
+
+    command = commands.add_parser("features", help="feature frame of a bars CSV")
+    command.add_argument("bars")
+    command.add_argument("--years", type=float, default=3)
+    command.add_argument("--out")
+    command.set_defaults(run=features)
+
+    command = commands.add_parser("train", help="full notebook run for a ticker")
+    command.add_argument("ticker")
+    command.add_argument("--bars", help="bars CSV instead of fetching")
+    command.add_argument("--epochs", type=int, default=300)
+    command.add_argument("--model-dir")
+    command.add_argument("--out-dir", default=".")
+    command.add_argument("--stages", help="append stage timings to this file")
+    command.set_defaults(run=train)
+
+    command = commands.add_parser("predict", help="score new bars with saved models")
+    command.add_argument("tickers", nargs="+")
+    command.add_argument("--model-dir", required=True)
+    bars = command.add_mutually_exclusive_group()
+    bars.add_argument("--bars", help="bars CSV instead of fetching (one ticker)")
+    bars.add_argument(
+        "--bars-dir", help="directory of <TICKER>.csv bars, others are fetched"
+    )
+    command.add_argument("--out-dir", default=".")
+    command.set_defaults(run=predict)
+
+    command = commands.add_parser("evaluate", help="summary over prediction files")
+    command.add_argument("pred_dir")
+    command.add_argument("--pattern", default="*_pred_*.csv")
+    command.add_argument("--out")
+    command.set_defaults(run=evaluate)
+
+    command = commands.add_parser("backtest", help="replay QC algorithm files")
+    command.add_argument("algorithms", nargs="+")
+    command.add_argument("--bars-dir", help="directory of <SYMBOL>.csv daily bars")
+    command.add_argument("--vol", type=float, help="fixed option volatility")
+    command.add_argument("--seed", type=int, default=0)
+    command.add_argument("--workers", type=int)
+    command.add_argument(
+        "--library", action="append", default=[], help="more project directories"
+    )
+    command.set_defaults(run=backtest)
+
+    command = commands.add_parser("tickers", help="list prediction files and models")
+    command.add_argument("directory", nargs="?", default=".")
+    command.set_defaults(run=tickers)
+    return main
+
+
+def main(argv=None):
+    args = parser().parse_args(argv)
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+"""Local, vectorized stock backtest of ROTS buy signals.
+
+Every signal buys at that day's close and sells at the first close in the
+next `horizon` days that reaches the `target` gain, otherwise at the close
+`horizon` days later. That is the trade the 3%/3-day label describes, so it
+gives a PnL for a set of signals without going through QuantConnect.
+"""
+
+import numpy as np
+
+
+def signal_trades(close, signals, target=0.03, horizon=3):
+    """Entry index, exit index and return of the trade for every signal."""
+    close = np.asarray(close, dtype=np.float64)
+    signals = np.asarray(signals).astype(bool)
+    n = len(close)
+    if n <= horizon:
+        empty = np.array([], dtype=np.int64)
+        return {"entry": empty, "exit": empty, "return": np.array([])}
+    # future[i] holds the closes of days i+1 .. i+horizon
+    future = np.lib.stride_tricks.sliding_window_view(close[1:], horizon)
+    entry = np.flatnonzero(signals[: n - horizon])
+    hits = future[entry] >= close[entry, None] * (1 + target)
+    first = np.where(hits.any(axis=1), hits.argmax(axis=1), horizon - 1)
+    exit_ = entry + 1 + first
+    return {
+        "entry": entry,
+        "exit": exit_,
+        "return": close[exit_] / close[entry] - 1.0,
+    }
+
+
+def summarize(trades):
+    returns = trades["return"]
+    return {
+        "trades": int(len(returns)),
+        "hit_rate": float((returns > 0).mean()) if len(returns) else 0.0,
+        "mean_return": float(returns.mean()) if len(returns) else 0.0,
+        "total_return": float(returns.sum()),
+    }
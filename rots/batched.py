@@ -0,0 +1,306 @@
+"""Many per-ticker ROTS networks trained at once in numpy.
+
+A per-ticker network has 12 -> 12 -> 10 -> 8 -> 1 units, about 400
+weights, so a Keras fit of one model spends its time in framework overhead,
+not arithmetic. BatchedMLP holds the weights of M independent networks as
+stacked arrays (kernels [M, in, out], biases [M, out]), and train_batched
+runs the forward pass, backprop and Adam update of all M with batched
+matmuls: one numpy call per layer per step for every model.
+
+Each model still sees only its own rows, shuffled every epoch, in minibatches
+of BATCH_SIZE, with Adam at the Keras defaults and Glorot uniform
+initialisation, so a model trains like model.train would. Tickers with fewer
+rows run out of batches earlier in an epoch and are masked out of the
+remaining steps. With patience, each model stops on its own when its
+validation (or training) loss has not improved for that many epochs; its
+best weights are kept and its mask switched off while the others go on.
+
+    python -m rots.batched features_store models/ --patience 20
+
+unstack() gives one model.DenseWeights per ticker, and save() writes the
+usual <TICKER>.h5 and <TICKER>_scaler.npz files that pipeline.update and
+Keras load.
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+from rots import model, pipeline
+from rots.store import FeatureStore
+
+UNITS = (12, 10, 8, 1)  # the Dense layers of model.build_model
+ACTIVATIONS = ("relu", "relu", "relu", "sigmoid")
+LEARNING_RATE = 0.001
+BETA_1 = 0.9
+BETA_2 = 0.999
+EPSILON = 1e-7  # Keras' Adam and log loss epsilon
+
+
+def stack(datasets):
+    """Zero padded X [M, rows, features], y [M, rows] and row counts [M]."""
+    counts = np.array([len(y) for _, y in datasets])
+    n_features = np.shape(datasets[0][0])[1]
+    X = np.zeros((len(datasets), counts.max(), n_features), dtype=np.float32)
+    y = np.zeros((len(datasets), counts.max()), dtype=np.float32)
+    for i, (features, labels) in enumerate(datasets):
+        X[i, : counts[i]] = features
+        y[i, : counts[i]] = labels
+    return X, y, counts
+
+
+class BatchedMLP:
+    def __init__(self, kernels, biases, activations=ACTIVATIONS):
+        self.kernels = kernels  # [M, in, out] per layer
+        self.biases = biases  # [M, out] per layer
+        self.activations = activations
+
+    @classmethod
+    def initialise(cls, n_models, n_features, units=UNITS, seed=0):
+        """Glorot uniform kernels and zero biases, like a new Keras Dense."""
+        rng = np.random.default_rng(seed)
+        kernels, biases = [], []
+        for fan_in, fan_out in zip((n_features,) + units[:-1], units):
+            limit = np.sqrt(6.0 / (fan_in + fan_out))
+            kernels.append(
+                rng.uniform(-limit, limit, (n_models, fan_in, fan_out)).astype(
+                    np.float32
+                )
+            )
+            biases.append(np.zeros((n_models, fan_out), dtype=np.float32))
+        return cls(kernels, biases)
+
+    @property
+    def n_models(self):
+        return len(self.kernels[0])
+
+    def forward(self, X):
+        """Layer outputs of every model for X [M, rows, features]."""
+        outputs = [X]
+        for kernel, bias, activation in zip(
+            self.kernels, self.biases, self.activations
+        ):
+            z = np.matmul(outputs[-1], kernel) + bias[:, None, :]
+            if activation == "relu":
+                outputs.append(np.maximum(z, 0.0))
+            else:
+                outputs.append(1.0 / (1.0 + np.exp(-z)))
+        return outputs
+
+    def predict(self, X):
+        """Buy probabilities [M, rows]."""
+        return self.forward(X)[-1][..., 0]
+
+    def gradients(self, X, y, weight):
+        """Log loss per model and its gradients; weight masks and averages rows."""
+        outputs = self.forward(X)
+        p = np.clip(outputs[-1][..., 0], EPSILON, 1.0 - EPSILON)
+        loss = -(weight * (y * np.log(p) + (1.0 - y) * np.log(1.0 - p))).sum(axis=1)
+        # sigmoid + log loss: dL/dz = p - y
+        delta = ((outputs[-1][..., 0] - y) * weight)[..., None]
+        kernel_grads, bias_grads = [], []
+        for layer in range(len(self.kernels) - 1, -1, -1):
+            kernel_grads.append(np.matmul(outputs[layer].transpose(0, 2, 1), delta))
+            bias_grads.append(delta.sum(axis=1))
+            if layer:
+                delta = np.matmul(delta, self.kernels[layer].transpose(0, 2, 1))
+                delta *= outputs[layer] > 0
+        return loss, kernel_grads[::-1], bias_grads[::-1]
+
+    def select(self, keep):
+        """Copy of the models where keep is True (or at the indices in keep)."""
+        # a slice indexes a view; copy so the result never aliases self
+        return BatchedMLP(
+            [k[keep].copy() for k in self.kernels],
+            [b[keep].copy() for b in self.biases],
+            self.activations,
+        )
+
+    def copy_from(self, other, where):
+        for mine, theirs in zip(
+            self.kernels + self.biases, other.kernels + other.biases
+        ):
+            mine[where] = theirs[where]
+
+    def unstack(self):
+        """One model.DenseWeights per model."""
+        return [
+            model.DenseWeights(
+                [
+                    (kernel[m].astype(np.float64), bias[m].astype(np.float64), name)
+                    for kernel, bias, name in zip(
+                        self.kernels, self.biases, self.activations
+                    )
+                ]
+            )
+            for m in range(self.n_models)
+        ]
+
+    def copy(self):
+        return self.select(slice(None))
+
+
+class Adam:
+    """Adam over stacked weights with a step count per model."""
+
+    def __init__(self, network, learning_rate=LEARNING_RATE):
+        self.learning_rate = learning_rate
+        self.moments = [
+            (np.zeros_like(w), np.zeros_like(w))
+            for w in network.kernels + network.biases
+        ]
+        self.steps = np.zeros(network.n_models)
+
+    def step(self, network, kernel_grads, bias_grads, active):
+        self.steps += active
+        t = np.maximum(self.steps, 1)
+        alpha = (
+            self.learning_rate * np.sqrt(1.0 - BETA_2**t) / (1.0 - BETA_1**t) * active
+        ).astype(np.float32)
+        for w, g, (m, v) in zip(
+            network.kernels + network.biases,
+            kernel_grads + bias_grads,
+            self.moments,
+        ):
+            shape = (-1,) + (1,) * (w.ndim - 1)
+            on = active.reshape(shape).astype(np.float32)
+            m += (g - m) * (1.0 - BETA_1) * on
+            v += (g * g - v) * (1.0 - BETA_2) * on
+            w -= alpha.reshape(shape) * m / (np.sqrt(v) + EPSILON)
+
+
+def train_batched(
+    datasets,
+    epochs=model.EPOCHS,
+    batch_size=model.BATCH_SIZE,
+    patience=None,
+    validation_split=0.0,
+    learning_rate=LEARNING_RATE,
+    shuffle=True,
+    seed=0,
+    network=None,
+):
+    """Train one network per (X, y) in datasets at once.
+
+    Like Keras' validation_split, the last validation_split of each model's
+    rows are held out for early stopping. Returns the network and a history
+    dict: loss and val_loss [epochs, M] (NaN once a model has stopped) and
+    the epoch each model stopped at.
+    """
+    X, y, counts = stack(datasets)
+    n_models, rows = y.shape
+    n_train = (counts * (1.0 - validation_split)).astype(int)
+    network = network or BatchedMLP.initialise(n_models, X.shape[2], seed=seed)
+    optimiser = Adam(network, learning_rate)
+    rng = np.random.default_rng(seed)
+    models = np.arange(n_models)[:, None]
+    position = np.arange(rows)
+    train_rows = position < n_train[:, None]
+    val_rows = (position < counts[:, None]) & ~train_rows
+    n_val = np.maximum(val_rows.sum(axis=1), 1)
+
+    running = np.ones(n_models, dtype=bool)
+    best = network.copy()
+    best_loss = np.full(n_models, np.inf)
+    waited = np.zeros(n_models, dtype=int)
+    stopped = np.full(n_models, epochs)
+    history = {
+        "loss": np.full((epochs, n_models), np.nan),
+        "val_loss": np.full((epochs, n_models), np.nan),
+    }
+    n_steps = int(np.ceil(n_train.max() / batch_size))
+    for epoch in range(epochs):
+        if not running.any():
+            break
+        if shuffle:
+            keys = np.where(train_rows, rng.random((n_models, rows)), 2.0)
+            order = np.argsort(keys, axis=1)
+        else:
+            order = np.broadcast_to(position, (n_models, rows))
+        epoch_loss = np.zeros(n_models)
+        for step in range(n_steps):
+            start = step * batch_size
+            index = order[:, start : start + batch_size]
+            in_batch = (start + np.arange(index.shape[1])) < n_train[:, None]
+            in_batch &= running[:, None]
+            sizes = in_batch.sum(axis=1)
+            active = sizes > 0
+            weight = in_batch / np.maximum(sizes, 1)[:, None]
+            loss, kernel_grads, bias_grads = network.gradients(
+                X[models, index], y[models, index], weight.astype(np.float32)
+            )
+            optimiser.step(network, kernel_grads, bias_grads, active)
+            epoch_loss += loss * sizes
+        history["loss"][epoch, running] = (epoch_loss / np.maximum(n_train, 1))[running]
+        if patience is None:
+            continue
+
+        if validation_split:
+            p = np.clip(network.predict(X), EPSILON, 1.0 - EPSILON)
+            losses = -(val_rows * (y * np.log(p) + (1.0 - y) * np.log(1.0 - p)))
+            monitored = losses.sum(axis=1) / n_val
+            history["val_loss"][epoch, running] = monitored[running]
+        else:
+            monitored = history["loss"][epoch]
+        improved = running & (monitored < best_loss)
+        best_loss[improved] = monitored[improved]
+        best.copy_from(network, improved)
+        waited = np.where(improved, 0, waited + running)
+        done = running & (waited >= patience)
+        stopped[done] = epoch + 1
+        running &= ~done
+    if patience is not None:
+        network = best
+    history["stopped"] = stopped
+    return network, history
+
+
+def save(network, tickers, model_dir, store=None):
+    """<TICKER>.h5 for every model (and <TICKER>_scaler.npz from store)."""
+    os.makedirs(model_dir, exist_ok=True)
+    keras_model = model.build_model(network.kernels[0].shape[1])
+    paths = {}
+    for m, ticker in enumerate(tickers):
+        keras_model.set_weights(
+            [w for k, b in zip(network.kernels, network.biases) for w in (k[m], b[m])]
+        )
+        paths[ticker] = pipeline.model_path(ticker, model_dir)
+        keras_model.save(paths[ticker])
+        if store is not None:
+            store.scaler([ticker]).save(pipeline.scaler_path(ticker, model_dir))
+    return paths
+
+
+def train_store(store, tickers=None, **options):
+    """train_batched on every ticker of a FeatureStore; (network, tickers, history)."""
+    tickers = list(tickers or store.tickers())
+    network, history = train_batched(
+        [store.training_set(ticker) for ticker in tickers], **options
+    )
+    return network, tickers, history
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("store_dir")
+    parser.add_argument("model_dir")
+    parser.add_argument("--tickers", nargs="*")
+    parser.add_argument("--epochs", type=int, default=model.EPOCHS)
+    parser.add_argument("--batch-size", type=int, default=model.BATCH_SIZE)
+    parser.add_argument("--patience", type=int)
+    parser.add_argument("--validation-split", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    store = FeatureStore(args.store_dir)
+    network, tickers, history = train_store(
+        store,
+        args.tickers,
+        epochs=args.epochs,
+        batch_size=args.batch_size,
+        patience=args.patience,
+        validation_split=args.validation_split,
+        seed=args.seed,
+    )
+    for ticker, path in save(network, tickers, args.model_dir, store).items():
+        print(ticker, path)
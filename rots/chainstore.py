@@ -0,0 +1,276 @@
+"""Compressed, memory-mapped store for minute option chains and bars.
+
+Minute option chains run to hundreds of thousands of rows per underlying per
+day, far too many for CSV. The store keeps them as columnar blocks:
+
+    <root>/<UNDERLYING>/<kind>/<year>.blk        compressed column chunks
+    <root>/<UNDERLYING>/<kind>/<year>.idx.npy    one index row per block
+
+A block is one day of one underlying, split further by expiry for option
+chains. Rows in a block are sorted by timestamp, and every column is
+byte-shuffled and zlib compressed on its own. The index row of a block holds
+its day, expiry, row count, first/last timestamp, strike range and the
+offset and length of each column chunk in the .blk file.
+
+Queries read the index, skip every block whose day, expiry or strike range
+misses the request, and decompress only the chunks of the blocks that are
+left, straight out of a memory map of the .blk file. A year of TSLA chains
+can therefore be streamed day by day without loading the whole year:
+
+    store = ChainStore("chains")
+    store.append("TSLA", columns)                 # one day, dict of arrays
+    for day, chain in store.days("TSLA", "2021-01-01", "2021-12-31",
+                                 strikes=(600, 800), expiries=(25, 35)):
+        ...
+
+ChainStore holds option chains (timestamp, strike, expiry, right, bid, ask,
+underlying); BarStore holds minute equity bars through the same code.
+"""
+
+import glob
+import os
+import zlib
+
+import numpy as np
+
+CHAIN_SCHEMA = [
+    ("timestamp", "datetime64[m]"),
+    ("strike", "f4"),
+    ("expiry", "datetime64[D]"),
+    ("right", "i1"),
+    ("bid", "f4"),
+    ("ask", "f4"),
+    ("underlying", "f4"),
+]
+
+BAR_SCHEMA = [
+    ("timestamp", "datetime64[m]"),
+    ("open", "f4"),
+    ("high", "f4"),
+    ("low", "f4"),
+    ("close", "f4"),
+    ("volume", "i8"),
+]
+
+LEVEL = 6  # zlib level, higher buys little on shuffled columns
+
+
+def index_dtype(n_columns):
+    return np.dtype(
+        [
+            ("day", "datetime64[D]"),
+            ("expiry", "datetime64[D]"),  # NaT for bars
+            ("rows", "i8"),
+            ("first", "datetime64[m]"),
+            ("last", "datetime64[m]"),
+            ("strike_min", "f4"),
+            ("strike_max", "f4"),
+            ("offset", "i8", (n_columns,)),
+            ("length", "i8", (n_columns,)),
+        ]
+    )
+
+
+def compress(values):
+    # byte shuffle: the high bytes of neighbouring values are mostly equal,
+    # grouping them makes long runs for zlib
+    raw = np.ascontiguousarray(values).view(np.uint8)
+    shuffled = raw.reshape(-1, values.dtype.itemsize).T
+    return zlib.compress(np.ascontiguousarray(shuffled).tobytes(), LEVEL)
+
+
+def decompress(buffer, dtype, rows):
+    dtype = np.dtype(dtype)
+    raw = np.frombuffer(zlib.decompress(buffer), dtype=np.uint8)
+    return np.ascontiguousarray(raw.reshape(dtype.itemsize, rows).T).view(dtype)[:, 0]
+
+
+class BlockStore:
+    kind = None
+    schema = None
+    split = None  # column that splits a day into blocks
+
+    def __init__(self, root):
+        self.root = root
+        self.dtype = index_dtype(len(self.schema))
+        self._maps = {}
+
+    def _base(self, underlying, year):
+        return os.path.join(self.root, underlying, self.kind, str(year))
+
+    def index(self, underlying, year):
+        path = self._base(underlying, year) + ".idx.npy"
+        if not os.path.exists(path):
+            return np.empty(0, dtype=self.dtype)
+        return np.load(path)
+
+    def years(self, underlying):
+        paths = glob.glob(os.path.join(self.root, underlying, self.kind, "*.idx.npy"))
+        return sorted(int(os.path.basename(p).split(".")[0]) for p in paths)
+
+    def append(self, underlying, columns):
+        """Add one day of rows (a dict of equal length column arrays)."""
+        columns = {
+            name: np.asarray(columns[name]).astype(dtype) for name, dtype in self.schema
+        }
+        days = np.unique(columns["timestamp"].astype("datetime64[D]"))
+        if len(days) != 1:
+            raise ValueError("append takes the rows of exactly one day")
+        day = days[0]
+        year = day.astype(object).year
+        index = self.index(underlying, year)
+        if np.any(index["day"] == day):
+            raise ValueError("%s %s is already stored" % (underlying, day))
+        if len(index) and day < index["day"].max():
+            raise ValueError("days must be appended in order")
+
+        # blocks by the split column, rows in time order within a block
+        keys = [columns["timestamp"]]
+        if self.split:
+            keys.append(columns[self.split])
+        order = np.lexsort(keys)
+        columns = {name: values[order] for name, values in columns.items()}
+        if self.split:
+            groups = np.unique(columns[self.split], return_index=True)[1]
+            bounds = list(groups) + [len(order)]
+        else:
+            bounds = [0, len(order)]
+
+        base = self._base(underlying, year)
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+        rows = np.zeros(len(bounds) - 1, dtype=self.dtype)
+        with open(base + ".blk", "ab") as f:
+            offset = f.tell()
+            for i, (start, end) in enumerate(zip(bounds[:-1], bounds[1:])):
+                block = {name: values[start:end] for name, values in columns.items()}
+                row = rows[i]
+                row["day"] = day
+                row["expiry"] = (
+                    block[self.split][0] if self.split else np.datetime64("NaT")
+                )
+                row["rows"] = end - start
+                row["first"] = block["timestamp"][0]
+                row["last"] = block["timestamp"][-1]
+                strike = block.get("strike")
+                row["strike_min"] = strike.min() if strike is not None else np.nan
+                row["strike_max"] = strike.max() if strike is not None else np.nan
+                for j, (name, dtype) in enumerate(self.schema):
+                    chunk = compress(block[name])
+                    f.write(chunk)
+                    row["offset"][j] = offset
+                    row["length"][j] = len(chunk)
+                    offset += len(chunk)
+        np.save(base + ".idx.npy", np.concatenate((index, rows)))
+        self._maps.pop((underlying, year), None)
+        return len(rows)
+
+    def _map(self, underlying, year):
+        key = (underlying, year)
+        if key not in self._maps:
+            path = self._base(underlying, year) + ".blk"
+            self._maps[key] = np.memmap(path, dtype=np.uint8, mode="r")
+        return self._maps[key]
+
+    def _select(self, index, start, end, strikes, expiries):
+        keep = (index["day"] >= start) & (index["day"] <= end)
+        if strikes is not None and self.split:
+            keep &= (index["strike_max"] >= strikes[0]) & (
+                index["strike_min"] <= strikes[1]
+            )
+        if expiries is not None and self.split:
+            dte = (index["expiry"] - index["day"]).astype(np.int64)
+            keep &= (dte >= expiries[0]) & (dte <= expiries[1])
+        return index[keep]
+
+    def _read(self, data, row, names, times):
+        rows = int(row["rows"])
+        columns = {}
+        position = {name: j for j, (name, _) in enumerate(self.schema)}
+        dtypes = dict(self.schema)
+        take = slice(None)
+        if times is not None:
+            j = position["timestamp"]
+            stamps = decompress(
+                data[row["offset"][j] : row["offset"][j] + row["length"][j]],
+                dtypes["timestamp"],
+                rows,
+            )
+            take = slice(*np.searchsorted(stamps, times, side="left"))
+        for name in names:
+            j = position[name]
+            chunk = data[row["offset"][j] : row["offset"][j] + row["length"][j]]
+            columns[name] = decompress(chunk, dtypes[name], rows)[take]
+        return columns
+
+    def days(
+        self,
+        underlying,
+        start,
+        end,
+        strikes=None,
+        expiries=None,
+        times=None,
+        columns=None,
+    ):
+        """Yield (day, columns) for every stored day in [start, end].
+
+        strikes is a (low, high) strike window, expiries a (min, max) days
+        to expiry window and times a (first, last) time of day such as
+        ("09:31", "10:00"); rows outside them are dropped and blocks wholly
+        outside them are never decompressed.
+        """
+        start = np.datetime64(start, "D")
+        end = np.datetime64(end, "D")
+        names = columns or [name for name, _ in self.schema]
+        read = list(names)
+        filter_strikes = strikes is not None and "strike" in dict(self.schema)
+        if filter_strikes and "strike" not in read:
+            # decoded for the row filter, left out of what is yielded
+            read.append("strike")
+        for year in self.years(underlying):
+            if year < start.astype(object).year or year > end.astype(object).year:
+                continue
+            selected = self._select(
+                self.index(underlying, year), start, end, strikes, expiries
+            )
+            if len(selected) == 0:
+                continue
+            data = self._map(underlying, year)
+            for day in np.unique(selected["day"]):
+                window = None
+                if times is not None:
+                    window = [np.datetime64(str(day) + "T" + t, "m") for t in times]
+                    window[1] += np.timedelta64(1, "m")
+                parts = [
+                    self._read(data, row, read, window)
+                    for row in selected[selected["day"] == day]
+                ]
+                block = {
+                    name: np.concatenate([part[name] for part in parts])
+                    for name in read
+                }
+                if filter_strikes:
+                    keep = (block["strike"] >= strikes[0]) & (
+                        block["strike"] <= strikes[1]
+                    )
+                    block = {name: block[name][keep] for name in names}
+                yield day, block
+
+    def query(self, underlying, start, end, **filters):
+        """All matching rows between start and end as one dict of arrays."""
+        parts = [columns for _, columns in self.days(underlying, start, end, **filters)]
+        names = filters.get("columns") or [name for name, _ in self.schema]
+        if not parts:
+            return {name: np.empty(0, dtype=dict(self.schema)[name]) for name in names}
+        return {name: np.concatenate([part[name] for part in parts]) for name in names}
+
+
+class ChainStore(BlockStore):
+    kind = "chains"
+    schema = CHAIN_SCHEMA
+    split = "expiry"
+
+
+class BarStore(BlockStore):
+    kind = "bars"
+    schema = BAR_SCHEMA
@@ -0,0 +1,149 @@
+"""Out-of-core feature computation for long-format multi-ticker files.
+
+Files like Steen/NN Research/stock_data.csv hold every ticker in one table
+(Date, Open, High, Low, Close, Volume, ..., Stock). stream_features reads
+such a file in chunks (or a parquet file/partitioned Arrow dataset batch by
+batch), groups each chunk by ticker and feeds the rows to that ticker's
+FeatureState, so indicator state carries across chunk boundaries. Finished
+rows are appended to one CSV per ticker as soon as their label is known,
+so memory is bounded by the chunk size and the number of tickers, not by
+the size of the file.
+
+    python -m rots.chunked "Steen/NN Research/stock_data.csv" features/
+
+Rows of each ticker must be in date order within the file; tickers may be
+interleaved or grouped.
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from rots import features, labels
+
+CHUNKSIZE = 250_000
+
+LONG_COLUMNS = {
+    "Date": "date",
+    "Open": "open",
+    "High": "high",
+    "Low": "low",
+    "Close": "close",
+    "Adj Close": "adjusted_close",
+    "Volume": "volume",
+}
+
+
+def read_chunks(path, chunksize=CHUNKSIZE):
+    if os.path.isdir(path) or path.endswith(".parquet"):
+        import pyarrow.dataset as ds
+
+        for batch in ds.dataset(path, format="parquet").to_batches(
+            batch_size=chunksize
+        ):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+def normalize(chunk):
+    chunk = chunk.rename(columns=LONG_COLUMNS)
+    if "adjusted_close" not in chunk:
+        chunk["adjusted_close"] = chunk["close"]
+    chunk["date"] = pd.to_datetime(chunk["date"])
+    return chunk
+
+
+class TickerStream:
+    """Feature state plus the last `horizon` rows still waiting for a label."""
+
+    def __init__(self, threshold=0.03, horizon=3):
+        self.state = features.FeatureState()
+        self.threshold = threshold
+        self.horizon = horizon
+        self.pending = None
+        self.pending_close = np.empty(0)
+        self.last_date = None
+
+    def push(self, block):
+        if self.last_date is not None and block["date"].iloc[0] <= self.last_date:
+            raise ValueError("rows of a ticker must be in date order")
+        self.last_date = block["date"].iloc[-1]
+        bars = block.set_index("date")
+        data = self.state.update(bars)
+        if len(data) == 0:
+            return data
+        close = bars["adjusted_close"].to_numpy(dtype=np.float64)[-len(data) :]
+        if self.pending is not None:
+            data = pd.concat([self.pending, data])
+            close = np.concatenate((self.pending_close, close))
+        hits = labels.future_hits(close, self.threshold, self.horizon)
+        ready = data.iloc[: len(hits)].copy()
+        ready[features.LABEL] = hits
+        self.pending = data.iloc[len(hits) :]
+        self.pending_close = close[len(hits) :]
+        return ready
+
+    def flush(self):
+        # like the notebook, the last days that can not be decided get 0
+        if self.pending is None:
+            return None
+        ready = self.pending.copy()
+        ready[features.LABEL] = 0
+        self.pending = None
+        return ready
+
+
+def feature_path(out_dir, ticker):
+    return os.path.join(out_dir, "%s_features.csv" % ticker)
+
+
+def _write(out_dir, ticker, rows, written):
+    if rows is None or len(rows) == 0:
+        return
+    path = feature_path(out_dir, ticker)
+    rows.to_csv(
+        path, mode="a" if ticker in written else "w", header=ticker not in written
+    )
+    written.add(ticker)
+
+
+def stream_features(
+    path,
+    out_dir,
+    chunksize=CHUNKSIZE,
+    ticker_column="Stock",
+    threshold=0.03,
+    horizon=3,
+):
+    """Write <out_dir>/<TICKER>_features.csv for every ticker in `path`."""
+    os.makedirs(out_dir, exist_ok=True)
+    streams = {}
+    written = set()
+    for chunk in read_chunks(path, chunksize):
+        chunk = normalize(chunk)
+        for ticker, block in chunk.groupby(ticker_column, sort=False):
+            stream = streams.get(ticker)
+            if stream is None:
+                stream = streams[ticker] = TickerStream(threshold, horizon)
+            _write(out_dir, ticker, stream.push(block), written)
+    for ticker, stream in streams.items():
+        _write(out_dir, ticker, stream.flush(), written)
+    return {ticker: feature_path(out_dir, ticker) for ticker in written}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", help="long-format CSV, parquet file or dataset dir")
+    parser.add_argument("out_dir")
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE)
+    parser.add_argument("--ticker-column", default="Stock")
+    args = parser.parse_args()
+    for ticker, out in sorted(
+        stream_features(
+            args.source, args.out_dir, args.chunksize, args.ticker_column
+        ).items()
+    ):
+        print(ticker, out)
@@ -0,0 +1,149 @@
+"""Signal debouncing for prediction files.
+
+The notebook has a commented out loop that zeroes every buy signal within 3
+days of the previous kept one (the *_nonConsecutive.csv variant), because
+the algorithms place one scheduled buy per signal and a run of 1s buys the
+same move several times. debounce() does the same and more, as array passes
+over the prediction column instead of a loop over days:
+
+    min_probability   drop signals whose probability column is below this
+    cooldown          drop signals within `cooldown` rows of a kept signal
+    max_signals/window  drop a signal when it is past the max_signals-th of
+                      the signals left by the rules above in the trailing
+                      `window` rows (dropped ones still count, so this is a
+                      rate cap, not a greedy schedule)
+
+    python -m rots.debounce ../Kevin/Final_NN_Output debounced/ --cooldown 3
+
+debounce_dir() concatenates every file in a directory, with a gap between
+files wider than any rule, so each rule runs once over all tickers.
+"""
+
+import argparse
+import glob
+import os
+
+import numpy as np
+
+COOLDOWN = 3
+SUFFIX = "_nonConsecutive"
+
+
+def cooldown(signals, days=COOLDOWN):
+    """Keep a signal only if no kept signal is in the `days` rows before it."""
+    signals = np.asarray(signals).astype(bool)
+    index = np.flatnonzero(signals)
+    if days <= 0 or len(index) == 0:
+        return signals.copy()
+    kept = np.zeros(len(signals), dtype=bool)
+    # a signal with no other signal in the `days` rows before it is always
+    # kept; from each of those, follow the chain of the next signal outside
+    # the cooldown of the last kept one, advancing all chains at once
+    gap = np.diff(index, prepend=index[0] - days - 1)
+    frontier = np.flatnonzero(gap > days)
+    following = np.searchsorted(index, index + days + 1)
+    while len(frontier):
+        kept[index[frontier]] = True
+        frontier = following[frontier]
+        frontier = frontier[frontier < len(index)]
+        frontier = frontier[~kept[index[frontier]]]
+    return kept
+
+
+def window_limit(signals, max_signals, window):
+    """Drop signals with more than max_signals signals (themselves included)
+    in the `window` rows ending at them."""
+    signals = np.asarray(signals).astype(bool)
+    counts = np.cumsum(signals)
+    before = np.concatenate((np.zeros(window, dtype=counts.dtype), counts[:-window]))
+    return signals & (counts - before[: len(counts)] <= max_signals)
+
+
+def debounce(
+    signals,
+    probabilities=None,
+    min_probability=None,
+    cooldown_days=COOLDOWN,
+    max_signals=None,
+    window=None,
+):
+    signals = np.asarray(signals).astype(bool)
+    if min_probability is not None and probabilities is not None:
+        signals = signals & (np.asarray(probabilities) >= min_probability)
+    if cooldown_days:
+        signals = cooldown(signals, cooldown_days)
+    if max_signals is not None and window:
+        signals = window_limit(signals, max_signals, window)
+    return signals.astype(np.int8)
+
+
+def debounced_path(path, out_dir, suffix=SUFFIX):
+    name, ext = os.path.splitext(os.path.basename(path))
+    return os.path.join(out_dir, name + suffix + ext)
+
+
+def debounce_dir(
+    pred_dir,
+    out_dir,
+    min_probability=None,
+    cooldown_days=COOLDOWN,
+    max_signals=None,
+    window=None,
+    suffix=SUFFIX,
+):
+    """Debounce every *_pred_*.csv in pred_dir; {path: (signals, kept)}."""
+    import pandas as pd
+
+    paths = sorted(glob.glob(os.path.join(pred_dir, "*_pred_*.csv")))
+    paths = [p for p in paths if not os.path.splitext(p)[0].endswith(suffix)]
+    frames = [pd.read_csv(p, index_col="date") for p in paths]
+    if not frames:
+        return {}
+    pad = max(cooldown_days or 0, window or 0) + 1
+    starts = np.cumsum([0] + [len(f) + pad for f in frames])
+    signals = np.zeros(starts[-1], dtype=bool)
+    probabilities = np.ones(starts[-1])
+    for start, frame in zip(starts, frames):
+        signals[start : start + len(frame)] = frame["prediction"].to_numpy() == 1
+        if "probability" in frame:
+            probabilities[start : start + len(frame)] = frame["probability"]
+    kept = debounce(
+        signals, probabilities, min_probability, cooldown_days, max_signals, window
+    )
+
+    os.makedirs(out_dir, exist_ok=True)
+    summary = {}
+    for path, start, frame in zip(paths, starts, frames):
+        frame = frame.copy()
+        frame["prediction"] = kept[start : start + len(frame)]
+        if "expected" in frame:
+            equal = frame["prediction"] == frame["expected"]
+            frame["Equal"] = np.where(equal, 1, 0)
+            frame["correctBuySignal"] = np.where(equal & (frame["expected"] == 1), 1, 0)
+        frame.to_csv(debounced_path(path, out_dir, suffix))
+        summary[path] = (
+            int(signals[start : start + len(frame)].sum()),
+            int(frame["prediction"].sum()),
+        )
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pred_dir")
+    parser.add_argument("out_dir")
+    parser.add_argument("--cooldown", type=int, default=COOLDOWN)
+    parser.add_argument("--max-signals", type=int)
+    parser.add_argument("--window", type=int)
+    parser.add_argument("--min-probability", type=float)
+    args = parser.parse_args()
+    summary = debounce_dir(
+        args.pred_dir,
+        args.out_dir,
+        args.min_probability,
+        args.cooldown,
+        args.max_signals,
+        args.window,
+    )
+    for path, (before, after) in summary.items():
+        print("%s: %d -> %d signals" % (os.path.basename(path), before, after))
@@ -0,0 +1,184 @@
+"""Multi-seed ROTS ensembles trained in parallel.
+
+One randomly initialized network flips a fair share of its buy signals from
+run to run. train_members fits K seeds of the same network in a process
+pool and run() averages their sigmoid outputs into the prediction file, with
+the mean probability next to the 0/1 prediction:
+
+    python -m rots.ensemble TSLA --seeds 5 --workers 5 --threads 2
+
+Every worker is started with an explicit TensorFlow/BLAS thread budget
+(threads intra-op, one inter-op), and by default workers * threads is kept
+within the machine's cores, so K workers do not each spin up one thread per
+core. Each member's fit/predict time comes back as a Recorder record with
+its seed and pid.
+"""
+
+import argparse
+import concurrent.futures
+import multiprocessing
+import os
+
+import numpy as np
+
+from rots import features, model, pipeline
+from rots.instrument import Recorder
+
+THREAD_VARIABLES = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "TF_NUM_INTRAOP_THREADS",
+)
+
+
+def thread_budget(members, workers=None, threads=None, cores=None):
+    """(workers, threads per worker) that fit in the available cores."""
+    cores = cores or os.cpu_count() or 1
+    workers = workers or max(1, min(members, cores))
+    threads = threads or max(1, cores // workers)
+    return workers, threads
+
+
+def _init_worker(threads):
+    # must run before TensorFlow is imported in the worker
+    for name in THREAD_VARIABLES:
+        os.environ[name] = str(threads)
+    os.environ["TF_NUM_INTEROP_THREADS"] = "1"
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+    import tensorflow as tf
+
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def _set_seed(seed):
+    import keras
+
+    if hasattr(keras.utils, "set_random_seed"):
+        keras.utils.set_random_seed(seed)
+    else:  # older Keras
+        import random
+
+        import tensorflow as tf
+
+        random.seed(seed)
+        np.random.seed(seed)
+        tf.random.set_seed(seed)
+
+
+def _member(X, y, seed, epochs, batch_size):
+    recorder = Recorder()
+    _set_seed(seed)
+    with recorder.stage("member", rows=len(X), seed=seed, pid=os.getpid()):
+        fitted = model.train(X, y, epochs=epochs, batch_size=batch_size)
+        probabilities = fitted.predict(X, verbose=0).ravel()
+    return probabilities, recorder.records[0]
+
+
+def train_members(
+    X,
+    y,
+    seeds=5,
+    workers=None,
+    threads=None,
+    epochs=model.EPOCHS,
+    batch_size=model.BATCH_SIZE,
+    recorder=None,
+):
+    """Fit one network per seed; returns (probabilities [K, rows], records).
+
+    seeds is a count (seeds 0..K-1) or an explicit list of seeds.
+    """
+    seeds = list(range(seeds)) if isinstance(seeds, int) else list(seeds)
+    workers, threads = thread_budget(len(seeds), workers, threads)
+    X = np.asarray(X, dtype=np.float32)
+    y = np.asarray(y, dtype=np.float32)
+    # spawn, not fork: a forked TensorFlow runtime is not safe to reuse
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(threads,),
+    ) as pool:
+        futures = [
+            pool.submit(_member, X, y, seed, epochs, batch_size) for seed in seeds
+        ]
+        results = [future.result() for future in futures]
+    records = []
+    for _, record in results:
+        record["threads"] = threads
+        records.append(record)
+        if recorder is not None:
+            recorder.add(record)
+    return np.vstack([probabilities for probabilities, _ in results]), records
+
+
+def run(
+    ticker,
+    bars=None,
+    out_dir=".",
+    seeds=5,
+    workers=None,
+    threads=None,
+    epochs=model.EPOCHS,
+    recorder=None,
+):
+    """Ensemble version of pipeline.run: averaged probabilities to the CSV."""
+    recorder = recorder or Recorder()
+    if bars is None:
+        with recorder.stage("fetch", ticker=ticker) as record:
+            bars = pipeline.fetch_bars(ticker)
+            record["rows"] = len(bars)
+
+    with recorder.stage("features", ticker=ticker) as record:
+        history = pipeline.labelled(bars)
+        data = features.last_years(history)
+        record["rows"] = len(data)
+    _, X = pipeline.scale(ticker, history, len(data))
+    y = data[features.LABEL].to_numpy(dtype=np.float32)
+
+    with recorder.stage("ensemble", ticker=ticker, rows=len(X)):
+        probabilities, records = train_members(
+            X, y, seeds, workers, threads, epochs, recorder=recorder
+        )
+    mean = probabilities.mean(axis=0)
+
+    with recorder.stage("export", ticker=ticker) as record:
+        test_DF = pipeline.prediction_frame(
+            data.index.strftime("%Y-%m-%d"),
+            (mean > pipeline.THRESHOLD).astype("int32"),
+            y.astype(int),
+            ticker,
+            probabilities=mean,
+        )
+        os.makedirs(out_dir, exist_ok=True)
+        path = pipeline.prediction_path(ticker, out_dir)
+        test_DF.to_csv(path)
+        record["rows"] = len(test_DF)
+    return path, records
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("ticker")
+    parser.add_argument("--seeds", type=int, default=5)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--threads", type=int, help="threads per worker")
+    parser.add_argument("--epochs", type=int, default=model.EPOCHS)
+    parser.add_argument("--out-dir", default=".")
+    args = parser.parse_args()
+    path, records = run(
+        args.ticker,
+        out_dir=args.out_dir,
+        seeds=args.seeds,
+        workers=args.workers,
+        threads=args.threads,
+        epochs=args.epochs,
+    )
+    print(path)
+    for record in records:
+        print(
+            "seed %(seed)s pid %(pid)s threads %(threads)s: %(wall_s).1fs wall"
+            ", %(cpu_s).1fs cpu" % record
+        )
@@ -0,0 +1,111 @@
+"""Evaluation of every prediction file in a directory.
+
+The export cell only marks each row Equal/correctBuySignal. evaluate()
+reads all *_pred_*.csv files in parallel into one set of columns and
+computes, per ticker and over all of them, the confusion matrix,
+precision, recall, accuracy, signal density (signals per row) and the hit
+rate (precision) of each calendar year, with bincount over ticker and
+ticker x year codes instead of a groupby per file:
+
+    python -m rots.evaluate ../Kevin/Final_NN_Output --out evaluation.csv
+
+The result is one table with a row per ticker plus an ALL row, and a
+hit_rate_<year> column per year.
+"""
+
+import argparse
+import concurrent.futures
+import glob
+import os
+
+import numpy as np
+
+COLUMNS = ["date", "prediction", "expected", "ticker"]
+
+
+def _read(path):
+    import pandas as pd
+
+    frame = pd.read_csv(path, usecols=COLUMNS)
+    return (
+        frame["date"].to_numpy().astype("datetime64[D]"),
+        frame["prediction"].to_numpy(dtype=np.int8),
+        frame["expected"].to_numpy(dtype=np.int8),
+        frame["ticker"].to_numpy(dtype=str),
+    )
+
+
+def load(pred_dir, pattern="*_pred_*.csv", workers=None):
+    """dates, prediction, expected and ticker columns of every file."""
+    paths = sorted(glob.glob(os.path.join(pred_dir, pattern)))
+    with concurrent.futures.ThreadPoolExecutor(workers) as pool:
+        parts = list(pool.map(_read, paths))
+    if not parts:
+        raise FileNotFoundError("no %s files in %s" % (pattern, pred_dir))
+    return tuple(np.concatenate(column) for column in zip(*parts))
+
+
+def _ratio(numerator, denominator):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator > 0, numerator / denominator, np.nan)
+
+
+def confusion(codes, n_groups, prediction, expected):
+    """tp, fp, fn, tn per group code."""
+    cell = 2 * prediction.astype(np.int64) + expected  # 3 tp, 2 fp, 1 fn, 0 tn
+    counts = np.bincount(codes * 4 + cell, minlength=n_groups * 4).reshape(-1, 4)
+    return counts[:, 3], counts[:, 2], counts[:, 1], counts[:, 0]
+
+
+def evaluate(dates, prediction, expected, ticker):
+    import pandas as pd
+
+    tickers, codes = np.unique(ticker, return_inverse=True)
+    # the ALL row is one more group holding every row
+    codes = np.concatenate((codes, np.full(len(codes), len(tickers))))
+    prediction = np.concatenate((prediction, prediction))
+    expected = np.concatenate((expected, expected))
+    years = np.concatenate((dates, dates)).astype("datetime64[Y]").astype(int) + 1970
+    names = list(tickers) + ["ALL"]
+
+    tp, fp, fn, tn = confusion(codes, len(names), prediction, expected)
+    rows = tp + fp + fn + tn
+    table = pd.DataFrame(
+        {
+            "rows": rows,
+            "signals": tp + fp,
+            "tp": tp,
+            "fp": fp,
+            "fn": fn,
+            "tn": tn,
+            "precision": _ratio(tp, tp + fp),
+            "recall": _ratio(tp, tp + fn),
+            "accuracy": _ratio(tp + tn, rows),
+            "signal_density": _ratio(tp + fp, rows),
+            "base_rate": _ratio(tp + fn, rows),
+        },
+        index=pd.Index(names, name="ticker"),
+    )
+
+    first = years.min()
+    n_years = years.max() - first + 1
+    group = codes * n_years + (years - first)
+    signals = np.bincount(group, weights=prediction, minlength=len(names) * n_years)
+    hits = np.bincount(
+        group, weights=prediction * expected, minlength=len(names) * n_years
+    )
+    hit_rate = _ratio(hits, signals).reshape(len(names), n_years)
+    for offset in range(n_years):
+        table["hit_rate_%d" % (first + offset)] = hit_rate[:, offset]
+    return table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pred_dir")
+    parser.add_argument("--pattern", default="*_pred_*.csv")
+    parser.add_argument("--out", default="evaluation.csv")
+    args = parser.parse_args()
+    table = evaluate(*load(args.pred_dir, args.pattern))
+    table.to_csv(args.out)
+    print(table.round(3).to_string())
@@ -0,0 +1,148 @@
+"""ROTS feature frame.
+
+Mirrors the notebook: the adjusted close as a daily percent change, the
+EMAs and upper Bollinger Bands as a percent distance from the adjusted
+close, plus the raw ADX and RSI values. Column names match the CSV the
+notebook writes, so the model sees the same 12 inputs in the same order.
+"""
+
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from rots import indicators
+
+FEATURES = [
+    "5. adjusted close",
+    "EMA_5",
+    "EMA_10",
+    "EMA_20",
+    "EMA_125",
+    "ADX_5",
+    "ADX_10",
+    "ADX_20",
+    "BB_5 Upper Band",
+    "BB_10 Upper Band",
+    "BB_20 Upper Band",
+    "RSI_15",
+]
+LABEL = "Expected"
+
+# the notebook drops this many leading days so every indicator is warmed up
+WARMUP = 149
+
+# Alpha Vantage get_daily_adjusted column names -> our bar column names
+ALPHA_VANTAGE_COLUMNS = {
+    "1. open": "open",
+    "2. high": "high",
+    "3. low": "low",
+    "4. close": "close",
+    "5. adjusted close": "adjusted_close",
+    "6. volume": "volume",
+}
+
+
+def from_alpha_vantage(data):
+    """Rename a get_daily_adjusted frame (oldest first) to bar columns."""
+    return data.rename(columns=ALPHA_VANTAGE_COLUMNS)
+
+
+def make_indicators():
+    """Fresh indicator state objects, keyed by feature name."""
+    return {
+        "EMA_5": indicators.Ema(5),
+        "EMA_10": indicators.Ema(10),
+        "EMA_20": indicators.Ema(20),
+        "EMA_125": indicators.Ema(125),
+        "ADX_5": indicators.Adx(5),
+        "ADX_10": indicators.Adx(10),
+        # the notebook asks Alpha Vantage for a 15 day ADX under this name
+        "ADX_20": indicators.Adx(15),
+        "BB_5 Upper Band": indicators.BollingerUpper(5),
+        "BB_10 Upper Band": indicators.BollingerUpper(10),
+        "BB_20 Upper Band": indicators.BollingerUpper(20),
+        "RSI_15": indicators.Rsi(15),
+    }
+
+
+class FeatureState:
+    """Feature computation for one ticker that can be fed in blocks.
+
+    update() takes the next bars of the ticker (oldest first) and returns
+    their feature rows, carrying every indicator's state, the previous
+    adjusted close and the warmup count over to the next call. Feeding a
+    history in chunks gives the same rows as build_features on all of it.
+    """
+
+    def __init__(self, warmup=WARMUP):
+        self.indicators = make_indicators()
+        self.warmup = warmup
+        self.last_adjusted = None
+        self.seen = 0
+
+    def raw(self, bars):
+        close = bars["close"].to_numpy(dtype=np.float64)
+        high = bars["high"].to_numpy(dtype=np.float64)
+        low = bars["low"].to_numpy(dtype=np.float64)
+        raw = {}
+        for name, indicator in self.indicators.items():
+            if name.startswith("ADX"):
+                raw[name] = indicator.update(high, low, close)
+            else:
+                raw[name] = indicator.update(close)
+        return raw
+
+    def update(self, bars):
+        adjusted = bars["adjusted_close"].to_numpy(dtype=np.float64)
+        columns = relative_features(adjusted, self.raw(bars), self.last_adjusted)
+        if len(adjusted):
+            self.last_adjusted = adjusted[-1]
+        skip = min(max(self.warmup - self.seen, 0), len(adjusted))
+        self.seen += len(adjusted)
+        data = pd.DataFrame(columns, index=bars.index)[FEATURES]
+        return data.iloc[skip:]
+
+
+def indicator_columns(bars):
+    """Raw indicator values, keyed by feature name."""
+    return FeatureState().raw(bars)
+
+
+def relative_features(adjusted, raw, last_adjusted=None):
+    """Turn raw indicator values into the notebook's feature columns."""
+    adjusted = np.asarray(adjusted, dtype=np.float64)
+    previous = np.concatenate(
+        ([np.nan if last_adjusted is None else last_adjusted], adjusted[:-1])
+    )
+    columns = {"5. adjusted close": adjusted / previous - 1.0}
+    for name in FEATURES[1:]:
+        if name.startswith(("EMA", "BB")):
+            columns[name] = (raw[name] - adjusted) / adjusted
+        else:
+            columns[name] = raw[name]
+    return columns
+
+
+def build_features(bars, warmup=WARMUP):
+    """Feature frame for one ticker's daily bars (oldest first)."""
+    return FeatureState(warmup).update(bars)
+
+
+def last_years(data, years=3, today=None):
+    # the notebook keeps only the last three years of rows for training;
+    # it counts back from today, we count back from the newest row so runs
+    # over older or synthetic histories trim the same way
+    if len(data) <= 252 * years:
+        return data
+    today = today or data.index[-1]
+    start = str(today - datetime.timedelta(days=365 * years))[:10]
+    return data[data.index >= start]
+
+
+def min_max_scale(data, columns=FEATURES):
+    from sklearn.preprocessing import MinMaxScaler
+
+    data = data.copy()
+    data[columns] = MinMaxScaler().fit_transform(data[columns])
+    return data
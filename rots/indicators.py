@@ -0,0 +1,151 @@
+"""Technical indicators used as ROTS features.
+
+The notebook downloads these from Alpha Vantage; these are local versions of
+the same indicators (EMA, Wilder RSI/ADX and the upper Bollinger Band) so
+features can be built from any OHLC history.
+
+Each indicator is a small state object whose update() takes the next block
+of bars (one bar or a whole history) and carries its recursion state to the
+next call, so a series can be processed in chunks, or one new bar at a time,
+with the same result as a single pass. Blocks run through pandas' ewm and
+rolling, so they are vectorized; single bars take a scalar fast path.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class Ewm:
+    """y[t] = (1 - alpha) * y[t-1] + alpha * x[t], seeded with the first x."""
+
+    def __init__(self, alpha):
+        self.alpha = alpha
+        self.value = None
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return values
+        if self.value is not None and len(values) == 1:
+            self.value = (1.0 - self.alpha) * self.value + self.alpha * values[0]
+            return np.array([self.value])
+        if self.value is None:
+            series, drop = values, 0
+        else:
+            # continuing from the last value is the same as prepending it
+            series, drop = np.concatenate(([self.value], values)), 1
+        out = pd.Series(series).ewm(alpha=self.alpha, adjust=False).mean().to_numpy()
+        out = out[drop:]
+        self.value = out[-1]
+        return out
+
+
+class Ema(Ewm):
+    def __init__(self, period):
+        super().__init__(2.0 / (period + 1))
+
+
+class Wilder(Ewm):
+    # Wilder's smoothing is an EMA with alpha = 1 / period
+    def __init__(self, period):
+        super().__init__(1.0 / period)
+
+
+def _previous(values, last):
+    # values shifted right by one bar, starting from the last bar of the
+    # previous block (or the first bar itself at the start of the series)
+    first = values[0] if last is None else last
+    return np.concatenate(([first], values[:-1]))
+
+
+class Rsi:
+    def __init__(self, period):
+        self.gain = Wilder(period)
+        self.loss = Wilder(period)
+        self.last_close = None
+
+    def update(self, close):
+        close = np.asarray(close, dtype=np.float64)
+        if len(close) == 0:
+            return close
+        change = close - _previous(close, self.last_close)
+        self.last_close = close[-1]
+        gain = self.gain.update(np.where(change > 0, change, 0.0))
+        loss = self.loss.update(np.where(change < 0, -change, 0.0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(loss == 0, 100.0, 100.0 - 100.0 / (1.0 + gain / loss))
+
+
+class Adx:
+    def __init__(self, period):
+        self.true_range = Wilder(period)
+        self.plus = Wilder(period)
+        self.minus = Wilder(period)
+        self.dx = Wilder(period)
+        self.last = (None, None, None)
+
+    def update(self, high, low, close):
+        high = np.asarray(high, dtype=np.float64)
+        low = np.asarray(low, dtype=np.float64)
+        close = np.asarray(close, dtype=np.float64)
+        if len(close) == 0:
+            return close
+        last_high, last_low, last_close = self.last
+        prev_close = _previous(close, last_close)
+        up = high - _previous(high, last_high)
+        down = _previous(low, last_low) - low
+        self.last = (high[-1], low[-1], close[-1])
+        plus_dm = np.where((up > down) & (up > 0), up, 0.0)
+        minus_dm = np.where((down > up) & (down > 0), down, 0.0)
+        true_range = np.maximum(
+            high - low,
+            np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)),
+        )
+        atr = self.true_range.update(true_range)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            plus_di = 100.0 * self.plus.update(plus_dm) / atr
+            minus_di = 100.0 * self.minus.update(minus_dm) / atr
+            dx = 100.0 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
+        return self.dx.update(np.nan_to_num(dx))
+
+
+class BollingerUpper:
+    def __init__(self, period, deviations=2.0):
+        self.period = period
+        self.deviations = deviations
+        self.tail = np.empty(0)  # up to the last period - 1 closes
+
+    def update(self, close):
+        close = np.asarray(close, dtype=np.float64)
+        if len(close) == 0:
+            return close
+        series = np.concatenate((self.tail, close))
+        if len(close) == 1 and len(series) >= self.period:
+            window = series[-self.period :]
+            upper = np.array([window.mean() + self.deviations * window.std()])
+        else:
+            rolling = pd.Series(series).rolling(self.period, min_periods=1)
+            upper = (rolling.mean() + self.deviations * rolling.std(ddof=0)).to_numpy()
+            upper = upper[len(self.tail) :]
+        self.tail = series[max(len(series) - (self.period - 1), 0) :]
+        return upper
+
+
+def ema(close, period):
+    return Ema(period).update(close)
+
+
+def wilder(values, period):
+    return Wilder(period).update(values)
+
+
+def rsi(close, period):
+    return Rsi(period).update(close)
+
+
+def adx(high, low, close, period):
+    return Adx(period).update(high, low, close)
+
+
+def bbands_upper(close, period, deviations=2.0):
+    return BollingerUpper(period, deviations).update(close)
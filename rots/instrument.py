@@ -0,0 +1,171 @@
+"""Lightweight per-stage timing and memory instrumentation.
+
+    recorder = Recorder("rots_stages.jsonl")
+    with recorder.stage("fit", ticker="TSLA") as record:
+        model.fit(X, y)
+        record["rows"] = len(X)
+
+Each stage records wall time, CPU time, peak RSS and an optional row count,
+and is appended to a JSON lines file or rewritten into a Prometheus text
+file (format="prom"). Setting profile to a stage name (or the ROTS_PROFILE
+environment variable) captures that one stage with cProfile, or with py-spy
+when profiler="py-spy" and py-spy is on the PATH.
+"""
+
+import contextlib
+import functools
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # windows
+    resource = None
+
+
+def _reset_peak_rss():
+    # linux lets a process reset its own high water mark, elsewhere the peak
+    # is for the whole process lifetime
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def peak_rss_bytes():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on linux and bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Recorder:
+    def __init__(self, path=None, format="jsonl", profile=None, profiler="cprofile"):
+        self.path = path
+        self.format = format
+        self.profile = profile or os.environ.get("ROTS_PROFILE")
+        self.profiler = profiler
+        self.records = []
+
+    @contextlib.contextmanager
+    def stage(self, name, rows=None, **labels):
+        record = {"stage": name, "rows": rows}
+        record.update(labels)
+        _reset_peak_rss()
+        profiling = self._start_profile(name)
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield record
+        finally:
+            record["wall_s"] = time.perf_counter() - wall
+            record["cpu_s"] = time.process_time() - cpu
+            record["peak_rss_bytes"] = peak_rss_bytes()
+            record["timestamp"] = time.time()
+            self._stop_profile(name, profiling)
+            self.add(record)
+
+    def add(self, record):
+        """Keep and emit a record timed elsewhere, e.g. in a worker process."""
+        self.records.append(record)
+        self._emit(record)
+
+    def timed(self, name=None, **labels):
+        """Decorator form of stage(); rows is set from len() of the result."""
+
+        def decorate(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.stage(name or function.__name__, **labels) as record:
+                    result = function(*args, **kwargs)
+                    if record["rows"] is None and hasattr(result, "__len__"):
+                        record["rows"] = len(result)
+                    return result
+
+            return wrapper
+
+        return decorate
+
+    def _start_profile(self, name):
+        if self.profile != name:
+            return None
+        if self.profiler == "py-spy" and shutil.which("py-spy"):
+            return subprocess.Popen(
+                [
+                    "py-spy",
+                    "record",
+                    "--pid",
+                    str(os.getpid()),
+                    "--output",
+                    f"{name}.svg",
+                ],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+
+    def _stop_profile(self, name, profiling):
+        if profiling is None:
+            return
+        if isinstance(profiling, subprocess.Popen):
+            # py-spy writes its flame graph when interrupted
+            profiling.send_signal(signal.SIGINT)
+            profiling.wait()
+        else:
+            profiling.disable()
+            profiling.dump_stats(f"{name}.prof")
+
+    def _emit(self, record):
+        if self.path is None:
+            return
+        if self.format == "prom":
+            with open(self.path, "w") as f:
+                f.write(prometheus_text(self.records))
+        else:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+
+
+METRICS = {
+    "wall_s": "rots_stage_wall_seconds",
+    "cpu_s": "rots_stage_cpu_seconds",
+    "peak_rss_bytes": "rots_stage_peak_rss_bytes",
+    "rows": "rots_stage_rows",
+}
+
+
+def prometheus_text(records):
+    """Render the latest record of each stage in the Prometheus text format."""
+    latest = {}
+    for record in records:
+        labels = {
+            k: v for k, v in record.items() if k not in METRICS and k != "timestamp"
+        }
+        latest[tuple(sorted(labels.items()))] = record
+    lines = []
+    for key, metric in METRICS.items():
+        lines.append(f"# TYPE {metric} gauge")
+        for labels, record in latest.items():
+            if record.get(key) is None:
+                continue
+            label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+            lines.append(f"{metric}{{{label_text}}} {record[key]}")
+    return "\n".join(lines) + "\n"
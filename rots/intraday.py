@@ -0,0 +1,207 @@
+"""The ROTS pipeline on intraday bars.
+
+The daily pipeline signals one day at a time and the algorithms buy at a
+fixed 9:31/9:35. Here minute bars are resampled to 5/15/60 minute bars
+(resample), the same 12 features are computed over them (the indicator
+recursions run vectorized over the whole history, so ~100x the rows of a
+daily run costs well under a second per ticker), and the label is the same
+3% target within the bars of `horizon_days` sessions. Rows and signals are
+stamped with the bar's end time, the first moment the signal is known:
+
+    minutes = intraday.read_minutes("TSLA_minutes.csv")   # or load_minutes()
+    intraday.run("TSLA", minutes, bar_minutes=15, model_dir="models")
+    intraday.update("TSLA", minutes_today, 15, "models")  # score new bars
+
+run() writes TSLA_15m_pred_<date>.csv with a "YYYY-MM-DD HH:MM" date
+column; qc_Call_StopLoss.py schedules its buys at that time instead of
+9:31 when it is given such a file.
+"""
+
+import argparse
+import math
+import os
+
+import numpy as np
+
+from rots import features, labels, model, pipeline
+from rots.instrument import Recorder
+
+SESSION_OPEN = 570  # 09:30 in minutes after midnight
+SESSION_MINUTES = 390
+BAR_MINUTES = (5, 15, 60)
+
+
+def bars_per_day(bar_minutes):
+    return math.ceil(SESSION_MINUTES / bar_minutes)
+
+
+def resample(minutes, bar_minutes=15):
+    """bar_minutes bars of the regular session from minute bars.
+
+    minutes is indexed by minute bar start time. Bars are cut from the
+    09:30 open (a 60 minute day ends with the 15:30-16:00 half bar) and
+    indexed by their end time; adjusted_close is the close, intraday bars
+    are not split or dividend adjusted.
+    """
+    import pandas as pd
+
+    stamps = np.asarray(minutes.index, dtype="datetime64[m]")
+    day = stamps.astype("datetime64[D]")
+    minute = (stamps - day).astype(np.int64) - SESSION_OPEN
+    keep = (minute >= 0) & (minute < SESSION_MINUTES)
+    stamps, day, minute = stamps[keep], day[keep], minute[keep]
+    slot = minute // bar_minutes
+    key = day.astype(np.int64) * bars_per_day(bar_minutes) + slot
+    starts = np.flatnonzero(np.concatenate(([True], key[1:] != key[:-1])))
+    ends = np.concatenate((starts[1:], [len(key)])) - 1
+
+    def column(name):
+        return minutes[name].to_numpy(dtype=np.float64)[keep]
+
+    close = column("close")
+    end_minute = np.minimum((slot[starts] + 1) * bar_minutes, SESSION_MINUTES)
+    end_time = day[starts].astype("datetime64[m]") + (SESSION_OPEN + end_minute).astype(
+        "timedelta64[m]"
+    )
+    return pd.DataFrame(
+        {
+            "open": column("open")[starts],
+            "high": np.maximum.reduceat(column("high"), starts),
+            "low": np.minimum.reduceat(column("low"), starts),
+            "close": close[ends],
+            "adjusted_close": close[ends],
+            "volume": np.add.reduceat(column("volume"), starts),
+        },
+        index=pd.DatetimeIndex(end_time, name="date"),
+    )
+
+
+def read_minutes(path):
+    import pandas as pd
+
+    return pd.read_csv(path, index_col=0, parse_dates=True)
+
+
+def load_minutes(store, ticker, start, end):
+    """Minute bars of ticker from a rots.chainstore.BarStore."""
+    import pandas as pd
+
+    columns = store.query(ticker, start, end)
+    return pd.DataFrame(
+        {name: values for name, values in columns.items() if name != "timestamp"},
+        index=pd.DatetimeIndex(columns["timestamp"], name="date"),
+    )
+
+
+def key(ticker, bar_minutes):
+    """Name of the model, state and prediction files, e.g. TSLA_15m."""
+    return "%s_%dm" % (ticker, bar_minutes)
+
+
+def prepare(bars, bar_minutes, threshold=0.03, horizon_days=3, state=None):
+    """Feature frame plus the Expected label for resampled bars."""
+    state = state if state is not None else features.FeatureState()
+    data = state.update(bars)
+    close = bars["adjusted_close"].to_numpy()
+    horizon = horizon_days * bars_per_day(bar_minutes)
+    expected = labels.expected_labels(close, threshold, horizon)
+    data[features.LABEL] = expected[len(close) - len(data) :]
+    return data
+
+
+def run(
+    ticker,
+    minutes,
+    bar_minutes=15,
+    out_dir=".",
+    recorder=None,
+    epochs=model.EPOCHS,
+    model_dir=None,
+    threshold=0.03,
+    horizon_days=3,
+):
+    """pipeline.run on bar_minutes bars; returns (path, fitted)."""
+    recorder = recorder or Recorder()
+    name = key(ticker, bar_minutes)
+    with recorder.stage("resample", ticker=ticker, rows=len(minutes)):
+        bars = resample(minutes, bar_minutes)
+
+    state = features.FeatureState()
+    with recorder.stage("features", ticker=ticker) as record:
+        data = prepare(bars, bar_minutes, threshold, horizon_days, state)
+        record["rows"] = len(data)
+
+    with recorder.stage("scale", ticker=ticker) as record:
+        scaler, X = pipeline.scale(name, data, len(data))
+        record["rows"] = len(X)
+
+    y = data[features.LABEL].to_numpy(dtype=np.float32)
+
+    with recorder.stage("fit", ticker=ticker, epochs=epochs) as record:
+        fitted = model.train(X, y, epochs=epochs)
+        record["rows"] = len(X)
+
+    if model_dir is not None:
+        with recorder.stage("save", ticker=ticker):
+            os.makedirs(model_dir, exist_ok=True)
+            fitted.save(pipeline.model_path(name, model_dir))
+            scaler.save(pipeline.scaler_path(name, model_dir))
+            pipeline.save_state(
+                pipeline.state_path(name, model_dir), state, bars.index[-1]
+            )
+
+    with recorder.stage("predict", ticker=ticker) as record:
+        probabilities = model.predict_proba(fitted, X)
+        predictions = (probabilities > pipeline.THRESHOLD).astype("int32")
+        record["rows"] = len(predictions)
+
+    with recorder.stage("export", ticker=ticker) as record:
+        test_DF = pipeline.prediction_frame(
+            pipeline.date_strings(data.index),
+            predictions,
+            y.astype(int),
+            ticker,
+            probabilities=probabilities,
+        )
+        os.makedirs(out_dir, exist_ok=True)
+        path = pipeline.prediction_path(name, out_dir)
+        test_DF.to_csv(path)
+        record["rows"] = len(test_DF)
+    return path, fitted
+
+
+def update(ticker, minutes, bar_minutes, model_dir, out_dir=".", recorder=None):
+    """pipeline.update with the bars resampled from new minute bars.
+
+    Only whole bars are scored: pass minutes up to the end of a bar.
+    """
+    return pipeline.update(
+        ticker,
+        model_dir,
+        bars=resample(minutes, bar_minutes),
+        out_dir=out_dir,
+        recorder=recorder,
+        key=key(ticker, bar_minutes),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("ticker")
+    parser.add_argument("minutes", help="minute bars CSV (start time index, OHLCV)")
+    parser.add_argument("--bar-minutes", type=int, default=15, choices=BAR_MINUTES)
+    parser.add_argument("--epochs", type=int, default=model.EPOCHS)
+    parser.add_argument("--model-dir")
+    parser.add_argument("--out-dir", default=".")
+    parser.add_argument("--stages", help="append stage timings to this file")
+    args = parser.parse_args()
+    path, _ = run(
+        args.ticker,
+        read_minutes(args.minutes),
+        args.bar_minutes,
+        out_dir=args.out_dir,
+        recorder=Recorder(args.stages),
+        epochs=args.epochs,
+        model_dir=args.model_dir,
+    )
+    print(path)
@@ -0,0 +1,41 @@
+"""The ROTS training label.
+
+A day is labelled 1 when the adjusted close rises at least `threshold`
+(3%) above that day's close on any of the next `horizon` (3) days.
+"""
+
+import numpy as np
+
+
+def label_loop(close, threshold=0.03, horizon=3):
+    # the loop from the notebook, kept for reference and benchmarks; like the
+    # notebook it never labels the first day or the last `horizon` days
+    expected_list = [0 for _ in range(len(close))]
+    close_list = list(close)
+    for i in range(1, len(close_list) - horizon):
+        target = close_list[i] * (1 + threshold)
+        if any(close_list[i + k] >= target for k in range(1, horizon + 1)):
+            expected_list[i] = 1
+    return expected_list
+
+
+def future_hits(close, threshold=0.03, horizon=3):
+    """1 for every day whose next `horizon` closes reach the target.
+
+    Only the first len(close) - horizon days can be decided, so the result
+    is that much shorter than close.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    if len(close) <= horizon:
+        return np.zeros(0, dtype=np.int8)
+    future = np.lib.stride_tricks.sliding_window_view(close[1:], horizon).max(axis=1)
+    target = close[: len(close) - horizon] * (1 + threshold)
+    return (future[: len(close) - horizon] >= target).astype(np.int8)
+
+
+def expected_labels(close, threshold=0.03, horizon=3):
+    """Vectorized label_loop: max of the next `horizon` closes vs the target."""
+    labels = np.zeros(len(close), dtype=np.int8)
+    hits = future_hits(close, threshold, horizon)
+    labels[1 : len(hits)] = hits[1:]
+    return labels
@@ -0,0 +1,1006 @@
+"""Offline stand-in for the QuantConnect algorithm API.
+
+Replays the unmodified algorithm files (Kevin/qc_Call_StopLoss.py and the
+QCAlgorithm classes in Kevin/Archive) on local or synthetic data, so a
+backtest takes seconds on one machine instead of a place in the cloud queue:
+
+    python -m rots.localqc Kevin/qc_Call_StopLoss.py --bars-dir data/
+
+    result = localqc.run("Kevin/qc_Call_StopLoss.py")
+    result.statistics["total_return"], result.equity, result.orders
+
+Only the part of the API the algorithms use is implemented: Schedule.On
+with DateRules/TimeRules, AddEquity/AddOption/AddOptionContract/AddData,
+option filters and Slice.OptionChains, OptionChainProvider, MarketOrder,
+Buy, Liquidate, Portfolio, Securities, History, Download, Log/Debug/Plot
+and warm-up. The simplifications, compared to LEAN:
+
+- Daily bars are replayed as a few intraday slices per day (09:31, every
+  scheduled event time and 16:00), whatever Resolution was asked for. The
+  price at a slice moves linearly from the day's open to its close.
+- Bars come from the `bars` dict, from <SYMBOL>.csv in bars_dir, or from
+  rots.synthetic when neither has the symbol.
+- Options are priced with Black-Scholes (rots.synthetic.black_scholes) off
+  the underlying at the slice, with the 20 day realized volatility, a
+  smile and a proportional spread. Monthly expiries are the third Friday,
+  weeklys every Friday. Orders fill at once at the ask (buys) or bid
+  (sells); held contracts are cash settled at intrinsic value at the close
+  of their expiry day.
+- Files next to the algorithm file import like the other files of a
+  QuantConnect project (Kevin/event_log.py); library names more
+  directories to import from, like a QuantConnect library.
+- Download() serves raw.githubusercontent.com URLs of this repository from
+  the working tree, falling back to a file of the same name anywhere in it.
+
+run_many() runs several backtests in a process pool.
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import datetime
+import glob
+import os
+import sys
+import time as _time
+import types
+import zlib
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+from rots.synthetic import black_scholes, synthetic_ohlc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RAW_PREFIX = (
+    "https://raw.githubusercontent.com/SteenJennings/Neural-Net-Options/master/"
+)
+MARKET_OPEN = datetime.time(9, 30)
+MARKET_CLOSE = datetime.time(16, 0)
+FIRST_BAR = datetime.time(9, 31)
+SESSION_MINUTES = 390
+OPTION_MULTIPLIER = 100
+EASTERN = ZoneInfo("America/New_York")
+UTC = ZoneInfo("UTC")
+
+KeyValuePair = collections.namedtuple("KeyValuePair", "Key Value")
+Bar = collections.namedtuple("Bar", "open high low close volume vol")
+
+
+class Resolution:
+    Tick, Second, Minute, Hour, Daily = range(5)
+
+
+class DataNormalizationMode:
+    Adjusted, Raw, SplitAdjusted, TotalReturn = range(4)
+
+
+class OptionRight:
+    Call, Put = 0, 1
+
+
+class SecurityType:
+    Base, Equity, Option = 0, 1, 2
+
+
+class OrderStatus:
+    New, Submitted, PartiallyFilled, Filled = 0, 1, 2, 3
+    Canceled, Invalid = 5, 7
+
+
+class CBOE:
+    """Data type for AddData/History of CBOE indices such as VIX."""
+
+
+class SecurityIdentifier:
+    def __init__(self, symbol, date=None, strike=None, right=None):
+        self.Symbol = symbol
+        self.Date = date
+        self.StrikePrice = strike
+        self.OptionRight = right
+
+
+class Symbol:
+    def __init__(self, value, security_type=SecurityType.Equity, underlying=None):
+        self.Value = value
+        self.SecurityType = security_type
+        self.Underlying = underlying
+        self.ID = SecurityIdentifier(underlying.Value if underlying else value)
+
+    @classmethod
+    def option(cls, underlying, expiry, strike, right):
+        value = "%-6s%s%s%08d" % (
+            underlying.Value,
+            expiry.strftime("%y%m%d"),
+            "C" if right == OptionRight.Call else "P",
+            round(strike * 1000),
+        )
+        symbol = cls(value, SecurityType.Option, underlying)
+        symbol.ID = SecurityIdentifier(underlying.Value, expiry, strike, right)
+        return symbol
+
+    def __eq__(self, other):
+        return str(self) == str(other)
+
+    def __hash__(self):
+        return hash(self.Value)
+
+    def __str__(self):
+        return self.Value
+
+    __repr__ = __str__
+
+
+class Security:
+    def __init__(self, symbol, resolution=Resolution.Minute):
+        self.Symbol = symbol
+        self.Type = symbol.SecurityType
+        self.Resolution = resolution
+        self.Open = self.High = self.Low = self.Close = self.Price = 0.0
+        self.BidPrice = self.AskPrice = 0.0
+        self.Volume = 0
+        self.DataNormalizationMode = DataNormalizationMode.Adjusted
+        self.HasData = False
+
+    @property
+    def price(self):
+        return self.Price
+
+    def SetDataNormalizationMode(self, mode):
+        self.DataNormalizationMode = mode
+
+
+class OptionFilterUniverse:
+    # LEAN's default option filter: one strike either side, 0 to 35 days
+    def __init__(self, min_strike=-1, max_strike=1, min_expiry=0, max_expiry=35):
+        self.weeklys = False
+        self.Strikes(min_strike, max_strike)
+        self.Expiration(min_expiry, max_expiry)
+
+    def IncludeWeeklys(self):
+        self.weeklys = True
+        return self
+
+    def Strikes(self, min_strike, max_strike):
+        self.strikes = (int(min_strike), int(max_strike))
+        return self
+
+    def Expiration(self, min_expiry, max_expiry):
+        days = [
+            e.days if isinstance(e, datetime.timedelta) else e
+            for e in (min_expiry, max_expiry)
+        ]
+        self.expiration = tuple(days)
+        return self
+
+
+class Option(Security):
+    """The canonical option of an underlying, as returned by AddOption."""
+
+    def __init__(self, symbol, resolution=Resolution.Minute):
+        super().__init__(symbol, resolution)
+        self.filter = OptionFilterUniverse()
+
+    def SetFilter(self, *args):
+        if len(args) == 1 and callable(args[0]):
+            self.filter = args[0]
+        else:
+            self.filter = OptionFilterUniverse(*args)
+
+    def universe(self):
+        if callable(self.filter):
+            return self.filter(OptionFilterUniverse())
+        return self.filter
+
+
+class OptionContract:
+    def __init__(self, symbol, bid, ask, underlying_price):
+        self.Symbol = symbol
+        self.Strike = symbol.ID.StrikePrice
+        self.Expiry = symbol.ID.Date
+        self.Right = symbol.ID.OptionRight
+        self.UnderlyingSymbol = symbol.Underlying
+        self.BidPrice = bid
+        self.AskPrice = ask
+        self.LastPrice = (bid + ask) / 2
+        self.UnderlyingLastPrice = underlying_price
+
+
+class OptionChain(list):
+    def __init__(self, contracts, underlying):
+        super().__init__(contracts)
+        self.Underlying = underlying
+
+
+class OptionModel:
+    """Strike/expiry grid and Black-Scholes quotes for synthetic chains."""
+
+    def __init__(self, vol=None, rate=0.01, spread=0.02, max_days=120):
+        self.vol = vol
+        self.rate = rate
+        self.spread = spread
+        self.max_days = max_days
+
+    @staticmethod
+    def strike_step(spot):
+        for limit, step in ((25, 0.5), (100, 1.0), (200, 2.5)):
+            if spot < limit:
+                return step
+        return 5.0
+
+    def strikes(self, spot):
+        step = self.strike_step(spot)
+        return np.arange(np.floor(spot * 0.5 / step) * step, spot * 1.5 + step, step)
+
+    def expiries(self, date, weeklys=True):
+        days = np.arange(self.max_days + 1)
+        dates = np.datetime64(date, "D") + days
+        fridays = dates[(dates.astype("datetime64[D]").view("int64") - 1) % 7 == 0]
+        if not weeklys:
+            day = fridays.astype(object)
+            fridays = fridays[[15 <= d.day <= 21 for d in day]]
+        return [
+            datetime.datetime.combine(d, datetime.time())
+            for d in fridays.astype(object)
+        ]
+
+    def quote(self, spot, strike, expiry, right, time, vol):
+        """Bid and ask arrays for the contracts at `time`."""
+        expiry = np.asarray(expiry, dtype="datetime64[m]") + np.timedelta64(
+            16 * 60, "m"
+        )
+        minutes = (expiry - np.datetime64(time, "m")).astype(np.float64)
+        years = np.maximum(minutes, 0.0) / (365.0 * 24 * 60)
+        strike = np.asarray(strike, dtype=np.float64)
+        smile = (self.vol or vol) * (1 + 5 * np.log(strike / spot) ** 2)
+        mid = black_scholes(spot, strike, years, smile, self.rate, right)
+        intrinsic = np.where(np.asarray(right) == 0, spot - strike, strike - spot)
+        mid = np.where(years > 0, mid, np.maximum(intrinsic, 0.0))
+        half = np.where(years > 0, np.maximum(0.01, mid * self.spread), 0.0)
+        return np.round(np.maximum(mid - half, 0.0), 2), np.round(mid + half, 2)
+
+
+def read_bars(path):
+    """Daily bars from a CSV with Date/Open/High/Low/Close/Volume columns."""
+    bars = pd.read_csv(path)
+    bars.columns = [c.strip().lower().replace(" ", "_") for c in bars.columns]
+    bars["date"] = pd.to_datetime(bars["date"])
+    return bars.set_index("date").sort_index()
+
+
+class DailyFeed:
+    """Daily bars per symbol, replayed as intraday prices."""
+
+    def __init__(self, bars=None, bars_dir=None, seed=0):
+        self.bars = dict(bars or {})
+        self.bars_dir = bars_dir
+        self.seed = seed
+        self.frames = {}
+        self.days = {}  # ticker -> {date: Bar}
+
+    def load(self, ticker, start, end):
+        if ticker in self.frames:
+            return self.frames[ticker]
+        if ticker in self.bars:
+            bars = self.bars[ticker]
+        elif self.bars_dir and os.path.exists(
+            os.path.join(self.bars_dir, ticker + ".csv")
+        ):
+            bars = read_bars(os.path.join(self.bars_dir, ticker + ".csv"))
+        else:
+            # synthetic history from well before the start, for History()
+            first = pd.Timestamp(start) - pd.Timedelta(days=400)
+            n_days = len(pd.bdate_range(first, end))
+            bars = synthetic_ohlc(
+                n_days, seed=zlib.crc32(ticker.encode()) + self.seed, start=first
+            )
+        bars = bars.copy()
+        returns = np.log(bars["close"]).diff()
+        vol = returns.rolling(20, min_periods=2).std() * np.sqrt(252)
+        bars["vol"] = vol.bfill().fillna(0.3).clip(lower=0.1)
+        self.frames[ticker] = bars
+        # plain tuples per day, a pandas row lookup per slice is too slow
+        columns = [bars[c].to_numpy(dtype=np.float64) for c in Bar._fields]
+        self.days[ticker] = {
+            d: Bar(*row) for d, row in zip(bars.index.date, zip(*columns))
+        }
+        return bars
+
+    def bar(self, ticker, day):
+        return self.days[ticker].get(day)
+
+    def history(self, ticker, day, n):
+        bars = self.frames[ticker]
+        return bars[bars.index < pd.Timestamp(day)].iloc[-n:]
+
+
+def intraday(bar, time):
+    elapsed = (time.hour - MARKET_OPEN.hour) * 60 + time.minute - MARKET_OPEN.minute
+    fraction = min(max(elapsed / SESSION_MINUTES, 0.0), 1.0)
+    return bar.open + (bar.close - bar.open) * fraction
+
+
+class Holding:
+    def __init__(self, symbol):
+        self.Symbol = symbol
+        self.Type = symbol.SecurityType
+        self.Quantity = 0
+        self.AveragePrice = 0.0
+        self.Price = 0.0
+
+    @property
+    def Invested(self):
+        return self.Quantity != 0
+
+    @property
+    def multiplier(self):
+        return OPTION_MULTIPLIER if self.Type == SecurityType.Option else 1
+
+    @property
+    def HoldingsValue(self):
+        return self.Quantity * self.Price * self.multiplier
+
+    @property
+    def UnrealizedProfit(self):
+        return self.Quantity * (self.Price - self.AveragePrice) * self.multiplier
+
+
+class SecurityPortfolioManager:
+    def __init__(self, algorithm):
+        self.algorithm = algorithm
+        self.Cash = 100000.0
+        self.holdings = {}
+
+    def __getitem__(self, symbol):
+        key = str(symbol)
+        if key not in self.holdings:
+            self.holdings[key] = Holding(self.algorithm.Securities[symbol].Symbol)
+        return self.holdings[key]
+
+    def __iter__(self):
+        for holding in list(self.holdings.values()):
+            yield KeyValuePair(holding.Symbol, holding)
+
+    @property
+    def Invested(self):
+        return any(h.Invested for h in self.holdings.values())
+
+    @property
+    def TotalHoldingsValue(self):
+        return sum(h.HoldingsValue for h in self.holdings.values())
+
+    @property
+    def TotalPortfolioValue(self):
+        return self.Cash + self.TotalHoldingsValue
+
+    def fill(self, symbol, quantity, price):
+        holding = self[symbol]
+        total = holding.Quantity + quantity
+        if total == 0:
+            holding.AveragePrice = 0.0
+        elif holding.Quantity == 0 or (quantity > 0) == (holding.Quantity > 0):
+            holding.AveragePrice = (
+                holding.AveragePrice * holding.Quantity + price * quantity
+            ) / total
+        holding.Quantity = total
+        self.Cash -= quantity * price * holding.multiplier
+
+
+class SecurityManager(dict):
+    """Securities keyed by ticker; option contracts are added on first use."""
+
+    def __init__(self, algorithm):
+        super().__init__()
+        self.algorithm = algorithm
+
+    def __getitem__(self, symbol):
+        key = str(symbol)
+        if key not in self and isinstance(symbol, Symbol):
+            if symbol.SecurityType == SecurityType.Option and symbol.ID.Date:
+                return self.algorithm.AddOptionContract(symbol)
+        return super().__getitem__(key)
+
+    def __contains__(self, symbol):
+        return super().__contains__(str(symbol))
+
+    def ContainsKey(self, symbol):
+        return symbol in self
+
+
+class OrderTicket:
+    def __init__(self, order_id, symbol, quantity, price, time, status, tag):
+        self.OrderId = order_id
+        self.Symbol = symbol
+        self.Quantity = quantity
+        self.AverageFillPrice = price
+        self.Time = time
+        self.Status = status
+        self.Tag = tag
+
+
+class OrderEvent:
+    def __init__(self, ticket, utc_time):
+        self.OrderId = ticket.OrderId
+        self.Symbol = ticket.Symbol
+        self.Status = ticket.Status
+        self.FillPrice = ticket.AverageFillPrice
+        self.FillQuantity = (
+            ticket.Quantity if ticket.Status == OrderStatus.Filled else 0
+        )
+        self.UtcTime = utc_time
+        self.Message = ticket.Tag
+
+    def __str__(self):
+        status = "Filled" if self.Status == OrderStatus.Filled else "Invalid"
+        return (
+            "Time: %s OrderID: %d Symbol: %s Status: %s Quantity: %s FillPrice: %s"
+            % (
+                self.UtcTime,
+                self.OrderId,
+                self.Symbol,
+                status,
+                self.FillQuantity,
+                self.FillPrice,
+            )
+        )
+
+
+class DateRule:
+    def __init__(self, dates=None):
+        self.dates = dates  # None is every trading day
+
+
+class DateRules:
+    def On(self, year, month=None, day=None):
+        if month is None:
+            return DateRule({pd.Timestamp(year).date()})
+        return DateRule({datetime.date(int(year), int(month), int(day))})
+
+    def EveryDay(self, symbol=None):
+        return DateRule()
+
+
+class TimeRules:
+    def At(self, hour, minute=0, second=0):
+        return datetime.time(int(hour), int(minute), int(second))
+
+    def AfterMarketOpen(self, symbol=None, minutes_after_open=0):
+        return _add_minutes(MARKET_OPEN, minutes_after_open)
+
+    def BeforeMarketClose(self, symbol=None, minutes_before_close=0):
+        return _add_minutes(MARKET_CLOSE, -minutes_before_close)
+
+
+def _add_minutes(time, minutes):
+    moment = datetime.datetime.combine(datetime.date.min, time)
+    return (moment + datetime.timedelta(minutes=minutes)).time()
+
+
+class ScheduleManager:
+    def __init__(self):
+        self.by_date = collections.defaultdict(list)
+        self.every_day = []
+
+    def On(self, date_rule, time_rule, callback):
+        if date_rule.dates is None:
+            self.every_day.append((time_rule, callback))
+        else:
+            for day in date_rule.dates:
+                self.by_date[day].append((time_rule, callback))
+
+    def events(self, day):
+        return self.by_date.get(day, []) + self.every_day
+
+
+class OptionChainProvider:
+    def __init__(self, algorithm):
+        self.algorithm = algorithm
+
+    def GetOptionContractList(self, symbol, time):
+        algorithm = self.algorithm
+        underlying = algorithm.Securities[symbol]
+        strikes = algorithm._options.strikes(underlying.Price)
+        return [
+            algorithm._option_symbol(underlying.Symbol, expiry, strike, right)
+            for expiry in algorithm._options.expiries(time.date())
+            for strike in strikes
+            for right in (OptionRight.Call, OptionRight.Put)
+        ]
+
+
+class Slice:
+    def __init__(self, algorithm, time):
+        self.algorithm = algorithm
+        self.Time = time
+        self._chains = None
+
+    def ContainsKey(self, symbol):
+        security = self.algorithm.Securities.get(str(symbol))
+        return security is not None and security.HasData
+
+    def __getitem__(self, symbol):
+        return self.algorithm.Securities[symbol]
+
+    @property
+    def OptionChains(self):
+        # chains are only priced when an algorithm asks for them
+        if self._chains is None:
+            self._chains = [
+                KeyValuePair(option.Symbol, self.algorithm._chain(option))
+                for option in self.algorithm.Securities.values()
+                if isinstance(option, Option)
+            ]
+        return self._chains
+
+
+class QCAlgorithm:
+    def __init__(self, feed=None, options=None, downloads=None, echo=False):
+        self._feed = feed or DailyFeed()
+        self._options = options or OptionModel()
+        self._downloads = downloads or {}
+        self._echo = echo
+        self._symbols = {}
+        self._orders = []
+        self._warmup = None
+        self.logs = []
+        self.plots = collections.defaultdict(list)
+        self.Time = datetime.datetime(1998, 1, 2)
+        self.StartDate = self.EndDate = None
+        self.IsWarmingUp = False
+        self.LiveMode = False
+        self.Portfolio = SecurityPortfolioManager(self)
+        self.Securities = SecurityManager(self)
+        self.Schedule = ScheduleManager()
+        self.DateRules = DateRules()
+        self.TimeRules = TimeRules()
+        self.OptionChainProvider = OptionChainProvider(self)
+        self.Benchmark = None
+
+    # the API used by the algorithm files
+
+    def Initialize(self):
+        pass
+
+    def OnData(self, data):
+        pass
+
+    def OnOrderEvent(self, orderEvent):
+        pass
+
+    def OnEndOfAlgorithm(self):
+        pass
+
+    @property
+    def UtcTime(self):
+        return self.Time.replace(tzinfo=EASTERN).astimezone(UTC).replace(tzinfo=None)
+
+    def SetStartDate(self, year, month=None, day=None):
+        self.StartDate = _as_datetime(year, month, day)
+        self.Time = self.StartDate
+
+    def SetEndDate(self, year, month=None, day=None):
+        self.EndDate = _as_datetime(year, month, day)
+
+    def SetCash(self, cash):
+        self.Portfolio.Cash = float(cash)
+
+    def SetBenchmark(self, symbol):
+        self.Benchmark = str(symbol)
+
+    def SetWarmUp(self, period, resolution=None):
+        # a timedelta, or a number of daily bars
+        if isinstance(period, datetime.timedelta):
+            self._warmup = period
+        else:
+            self._warmup = datetime.timedelta(days=int(period) * 7 / 5)
+
+    def _subscribe(self, security):
+        self.Securities[str(security.Symbol)] = security
+        return security
+
+    def AddEquity(self, ticker, resolution=Resolution.Minute, *args, **kwargs):
+        self._feed.load(ticker, self._first_day(), self._last_day())
+        return self._subscribe(Security(Symbol(ticker), resolution))
+
+    def AddData(self, data_type, ticker, resolution=Resolution.Daily):
+        self._feed.load(ticker, self._first_day(), self._last_day())
+        return self._subscribe(Security(Symbol(ticker, SecurityType.Base), resolution))
+
+    def AddOption(self, ticker, resolution=Resolution.Minute, *args, **kwargs):
+        underlying = (
+            self.Securities[ticker].Symbol if ticker in self.Securities else None
+        )
+        if underlying is None:
+            underlying = self.AddEquity(ticker, resolution).Symbol
+        symbol = Symbol("?" + ticker, SecurityType.Option, underlying)
+        return self._subscribe(Option(symbol, resolution))
+
+    def AddOptionContract(self, symbol, resolution=Resolution.Minute):
+        if symbol in self.Securities:
+            return self.Securities[symbol]
+        security = self._subscribe(Security(symbol, resolution))
+        self._quote_contracts([security])
+        return security
+
+    def History(self, *args):
+        # History(symbol, n, resolution) or History(type, symbol, n, resolution)
+        args = [a for a in args if not isinstance(a, type)]
+        symbol, n = args[0], args[1]
+        if isinstance(n, datetime.timedelta):
+            n = max(1, n.days * 5 // 7)
+        bars = self._feed.history(str(symbol), self.Time.date(), int(n))
+        return bars[["open", "high", "low", "close", "volume"]]
+
+    def Download(self, address, *args, **kwargs):
+        with open(self._local_copy(address)) as f:
+            return f.read()
+
+    def Log(self, message):
+        self.logs.append("%s %s" % (self.Time, message))
+        if self._echo:
+            print(self.logs[-1])
+
+    Debug = Error = Log
+
+    def Plot(self, chart, series, value):
+        self.plots[(chart, str(series))].append((self.Time, float(value)))
+
+    def MarketOrder(self, symbol, quantity, asynchronous=False, tag=""):
+        security = self.Securities[symbol]
+        quantity = int(quantity)
+        price = security.AskPrice if quantity > 0 else security.BidPrice
+        price = price or security.Price
+        multiplier = OPTION_MULTIPLIER if security.Type == SecurityType.Option else 1
+        status = OrderStatus.Filled
+        if self.IsWarmingUp or quantity == 0 or price <= 0:
+            status = OrderStatus.Invalid
+        elif quantity > 0 and quantity * price * multiplier > self.Portfolio.Cash:
+            status = OrderStatus.Invalid  # insufficient buying power
+        return self._order(security.Symbol, quantity, price, status, tag)
+
+    def Buy(self, symbol, quantity):
+        return self.MarketOrder(symbol, abs(quantity))
+
+    def Sell(self, symbol, quantity):
+        return self.MarketOrder(symbol, -abs(quantity))
+
+    def Liquidate(self, symbol=None, tag="Liquidated"):
+        tickets = []
+        for key, holding in self.Portfolio:
+            if holding.Invested and (symbol is None or key == symbol):
+                tickets.append(self.MarketOrder(key, -holding.Quantity, tag=tag))
+        return tickets
+
+    # the replay
+
+    def _order(self, symbol, quantity, price, status, tag):
+        if status == OrderStatus.Filled:
+            self.Portfolio.fill(symbol, quantity, price)
+        else:
+            price = 0.0
+        ticket = OrderTicket(
+            len(self._orders) + 1, symbol, quantity, price, self.UtcTime, status, tag
+        )
+        self._orders.append(
+            {
+                "time": self.Time,
+                "symbol": str(symbol),
+                "quantity": quantity,
+                "price": price,
+                "status": status,
+                "tag": tag,
+            }
+        )
+        self.OnOrderEvent(OrderEvent(ticket, self.UtcTime))
+        return ticket
+
+    def _local_copy(self, address):
+        if address in self._downloads:
+            return self._downloads[address]
+        if address.startswith(RAW_PREFIX):
+            path = os.path.join(ROOT, *address[len(RAW_PREFIX) :].split("/"))
+            if os.path.exists(path):
+                return path
+        name = os.path.basename(address)
+        matches = glob.glob(os.path.join(ROOT, "**", name), recursive=True)
+        if not matches:
+            raise FileNotFoundError("no local copy of %s" % address)
+        return sorted(matches)[0]
+
+    def _first_day(self):
+        start = self.StartDate or self.Time
+        return (start - (self._warmup or datetime.timedelta())).date()
+
+    def _last_day(self):
+        return (self.EndDate or datetime.datetime.now()).date()
+
+    def _option_symbol(self, underlying, expiry, strike, right):
+        key = (str(underlying), expiry, float(strike), right)
+        if key not in self._symbols:
+            self._symbols[key] = Symbol.option(underlying, expiry, float(strike), right)
+        return self._symbols[key]
+
+    def _vol(self, ticker):
+        bar = self._feed.bar(ticker, self.Time.date())
+        return 0.3 if bar is None else bar.vol
+
+    def _chain(self, option):
+        underlying = self.Securities[option.Symbol.Underlying]
+        spot = underlying.Price
+        universe = option.universe()
+        strikes = self._options.strikes(spot)
+        atm = int(np.abs(strikes - spot).argmin())
+        low, high = universe.strikes
+        strikes = strikes[max(atm + low, 0) : max(atm + high + 1, 0)]
+        min_days, max_days = universe.expiration
+        today = datetime.datetime.combine(self.Time.date(), datetime.time())
+        expiries = [
+            e
+            for e in self._options.expiries(self.Time.date(), universe.weeklys)
+            if min_days <= (e - today).days <= max_days
+        ]
+        grid = [
+            (expiry, strike, right)
+            for expiry in expiries
+            for strike in strikes
+            for right in (OptionRight.Call, OptionRight.Put)
+        ]
+        if not grid:
+            return OptionChain([], underlying)
+        expiry, strike, right = zip(*grid)
+        bid, ask = self._options.quote(
+            spot, strike, expiry, right, self.Time, self._vol(underlying.Symbol.Value)
+        )
+        contracts = [
+            OptionContract(self._option_symbol(underlying.Symbol, e, k, r), b, a, spot)
+            for e, k, r, b, a in zip(expiry, strike, right, bid, ask)
+        ]
+        return OptionChain(contracts, underlying)
+
+    def _quote_contracts(self, securities):
+        # one vectorized quote per underlying for all its contracts
+        by_underlying = collections.defaultdict(list)
+        for security in securities:
+            by_underlying[str(security.Symbol.Underlying)].append(security)
+        for ticker, group in by_underlying.items():
+            ids = [security.Symbol.ID for security in group]
+            bid, ask = self._options.quote(
+                self.Securities[ticker].Price,
+                [i.StrikePrice for i in ids],
+                [i.Date for i in ids],
+                [i.OptionRight for i in ids],
+                self.Time,
+                self._vol(ticker),
+            )
+            for security, b, a in zip(group, bid.tolist(), ask.tolist()):
+                security.BidPrice, security.AskPrice = b, a
+                security.Price = security.Close = (b + a) / 2
+                security.HasData = True
+
+    def _update_prices(self, day, time):
+        contracts = []
+        for security in self.Securities.values():
+            if isinstance(security, Option):
+                continue
+            if security.Type == SecurityType.Option:
+                contracts.append(security)
+                continue
+            bar = self._feed.bar(security.Symbol.Value, day)
+            security.HasData = bar is not None
+            if bar is None:
+                continue
+            price = float(intraday(bar, time))
+            security.Price = security.Close = security.BidPrice = security.AskPrice = (
+                price
+            )
+            security.Open, security.High, security.Low = bar.open, bar.high, bar.low
+            security.Volume = bar.volume
+        self._quote_contracts(contracts)
+        for key, holding in self.Portfolio:
+            if holding.Invested:
+                holding.Price = self.Securities[key].Price
+
+    def _settle_expired(self, day):
+        for key, holding in self.Portfolio:
+            symbol = holding.Symbol
+            if not holding.Invested or symbol.SecurityType != SecurityType.Option:
+                continue
+            if symbol.ID.Date.date() > day:
+                continue
+            spot = self.Securities[symbol.Underlying].Price
+            strike = symbol.ID.StrikePrice
+            value = (
+                spot - strike
+                if symbol.ID.OptionRight == OptionRight.Call
+                else strike - spot
+            )
+            self._order(
+                symbol,
+                -holding.Quantity,
+                max(value, 0.0),
+                OrderStatus.Filled,
+                "Expired",
+            )
+        # like LEAN, expired contracts are delisted and stop being quoted
+        for key, security in list(self.Securities.items()):
+            expiry = security.Symbol.ID.Date
+            if security.Type == SecurityType.Option and expiry and expiry.date() <= day:
+                del self.Securities[key]
+
+    def _trading_days(self):
+        first, last = self._first_day(), self._last_day()
+        days = set()
+        for frame in self._feed.frames.values():
+            dates = frame.index.date
+            days.update(dates[(dates >= first) & (dates <= last)])
+        if not days:
+            days = set(d.date() for d in pd.bdate_range(first, last))
+        return sorted(days)
+
+
+def _as_datetime(year, month=None, day=None):
+    if month is None:
+        return pd.Timestamp(year).to_pydatetime()
+    return datetime.datetime(int(year), int(month), int(day))
+
+
+def replay(algorithm):
+    """Initialize the algorithm and step it through every trading day."""
+    algorithm.Initialize()
+    start = algorithm.StartDate.date()
+    equity = {}
+    for day in algorithm._trading_days():
+        algorithm.IsWarmingUp = day < start
+        events = collections.defaultdict(list)
+        for time, callback in algorithm.Schedule.events(day):
+            events[time].append(callback)
+        for time in sorted(set(events) | {FIRST_BAR, MARKET_CLOSE}):
+            algorithm.Time = datetime.datetime.combine(day, time)
+            algorithm._update_prices(day, time)
+            for callback in events.get(time, ()):
+                callback()
+            algorithm.OnData(Slice(algorithm, algorithm.Time))
+        algorithm._settle_expired(day)
+        if not algorithm.IsWarmingUp:
+            equity[pd.Timestamp(day)] = algorithm.Portfolio.TotalPortfolioValue
+    algorithm.OnEndOfAlgorithm()
+    return pd.Series(equity, name="equity", dtype=np.float64)
+
+
+Result = collections.namedtuple("Result", "name equity orders logs statistics")
+
+
+def statistics(equity, orders):
+    if len(equity) == 0:
+        return {"days": 0, "orders": 0}
+    drawdown = equity / equity.cummax() - 1.0
+    filled = [o for o in orders if o["status"] == OrderStatus.Filled]
+    return {
+        "days": len(equity),
+        "start_value": float(equity.iloc[0]),
+        "end_value": float(equity.iloc[-1]),
+        "total_return": float(equity.iloc[-1] / equity.iloc[0] - 1.0),
+        "max_drawdown": float(drawdown.min()),
+        "orders": len(filled),
+        "rejected_orders": len(orders) - len(filled),
+    }
+
+
+def api_namespace():
+    """The names LEAN makes available to an algorithm file."""
+    return {
+        "QCAlgorithm": QCAlgorithm,
+        "Resolution": Resolution,
+        "DataNormalizationMode": DataNormalizationMode,
+        "OptionRight": OptionRight,
+        "SecurityType": SecurityType,
+        "OrderStatus": OrderStatus,
+        "Symbol": Symbol,
+        "CBOE": CBOE,
+        "datetime": datetime.datetime,
+        "timedelta": datetime.timedelta,
+    }
+
+
+def _install_modules():
+    # for "from QuantConnect.Data.Custom.CBOE import *" in the archive files
+    parts = ["QuantConnect", "QuantConnect.Data", "QuantConnect.Data.Custom"]
+    for name in parts + ["QuantConnect.Data.Custom.CBOE"]:
+        module = sys.modules.setdefault(name, types.ModuleType(name))
+        module.__dict__.update(api_namespace())
+        module.__all__ = list(api_namespace())
+
+
+def load_algorithm(path, name=None, library=()):
+    """The QCAlgorithm subclass defined in an algorithm file.
+
+    The file is executed fresh on every call, so class level state such as
+    contractList starts empty for each backtest.
+    """
+    _install_modules()
+    for directory in [os.path.dirname(os.path.abspath(path))] + list(library):
+        if directory not in sys.path:
+            sys.path.append(directory)
+    namespace = api_namespace()
+    namespace["__name__"] = "algorithm"
+    with open(path) as f:
+        exec(compile(f.read(), path, "exec"), namespace)
+    if name:
+        return namespace[name]
+    classes = [
+        v
+        for v in namespace.values()
+        if isinstance(v, type) and issubclass(v, QCAlgorithm) and v is not QCAlgorithm
+    ]
+    if len(classes) != 1:
+        raise ValueError("%s defines %d algorithms, pass name" % (path, len(classes)))
+    return classes[0]
+
+
+def run(
+    path,
+    name=None,
+    bars=None,
+    bars_dir=None,
+    vol=None,
+    downloads=None,
+    seed=0,
+    echo=False,
+    library=(),
+):
+    """Backtest one algorithm file; returns a Result."""
+    cls = load_algorithm(path, name, library)
+    algorithm = cls(
+        feed=DailyFeed(bars, bars_dir, seed),
+        options=OptionModel(vol),
+        downloads=downloads,
+        echo=echo,
+    )
+    wall = _time.perf_counter()
+    equity = replay(algorithm)
+    stats = statistics(equity, algorithm._orders)
+    stats["seconds"] = _time.perf_counter() - wall
+    return Result(
+        cls.__name__, equity, pd.DataFrame(algorithm._orders), algorithm.logs, stats
+    )
+
+
+def _run_job(job):
+    return run(**job)
+
+
+def run_many(jobs, workers=None):
+    """run(**job) for every job dict in a process pool, results in order."""
+    with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+        return list(pool.map(_run_job, jobs))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="+", help="algorithm files")
+    parser.add_argument("--bars-dir", help="directory of <SYMBOL>.csv daily bars")
+    parser.add_argument("--vol", type=float, help="fixed option volatility")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--log", action="store_true", help="print algorithm logs")
+    parser.add_argument(
+        "--library", action="append", default=[], help="more project directories"
+    )
+    args = parser.parse_args()
+    jobs = [
+        {
+            "path": path,
+            "bars_dir": args.bars_dir,
+            "vol": args.vol,
+            "seed": args.seed,
+            "echo": args.log,
+            "library": args.library,
+        }
+        for path in args.paths
+    ]
+    results = run_many(jobs, args.workers) if len(jobs) > 1 else [run(**jobs[0])]
+    for path, result in zip(args.paths, results):
+        print(path, result.name)
+        for key, value in result.statistics.items():
+            print("  %-16s %s" % (key, value))
@@ -0,0 +1,103 @@
+"""The ROTS Dense network (12 -> 12 -> 10 -> 8 -> 1).
+
+Keras is imported inside the functions so importing this module stays cheap.
+DenseWeights scores a saved model in numpy straight from its .h5 file, for
+paths such as the daily update that only need a forward pass for a few rows
+and should not pay the TensorFlow import.
+"""
+
+import json
+
+import numpy as np
+
+EPOCHS = 300
+BATCH_SIZE = 10
+
+
+def build_model(input_dim=12, outputs=1):
+    """outputs > 1 gives one sigmoid unit per target on the shared trunk."""
+    from keras.models import Sequential
+    from keras.layers import Dense
+
+    model = Sequential()
+    model.add(Dense(12, input_dim=input_dim, activation="relu"))
+    model.add(Dense(10, activation="relu"))
+    model.add(Dense(8, activation="relu"))
+    model.add(Dense(outputs, activation="sigmoid"))
+    model.compile(loss="binary_crossentropy", optimizer="adam", metrics=["accuracy"])
+    return model
+
+
+def train(X, y, epochs=EPOCHS, batch_size=BATCH_SIZE, verbose=0):
+    model = build_model(X.shape[1], 1 if np.ndim(y) == 1 else np.shape(y)[1])
+    model.fit(X, y, epochs=epochs, batch_size=batch_size, verbose=verbose)
+    return model
+
+
+def predict_proba(model, X):
+    """Sigmoid output of the network, the buy probability of every row."""
+    return model.predict(X, verbose=0).ravel()
+
+
+def predict_classes(model, X, threshold=0.5):
+    # Sequential.predict_classes was removed from newer Keras, this is the
+    # same 0.5 cut on the sigmoid output
+    return (predict_proba(model, X) > threshold).astype("int32")
+
+
+ACTIVATIONS = {
+    "relu": lambda x: np.maximum(x, 0.0),
+    "sigmoid": lambda x: 1.0 / (1.0 + np.exp(-x)),
+    "linear": lambda x: x,
+}
+
+
+class DenseWeights:
+    """Numpy forward pass of a saved Sequential stack of Dense layers."""
+
+    def __init__(self, layers):
+        self.layers = layers  # [(kernel, bias, activation name)]
+
+    @classmethod
+    def from_h5(cls, path):
+        import h5py
+
+        layers = []
+        with h5py.File(path, "r") as f:
+            config = f.attrs["model_config"]
+            if isinstance(config, bytes):
+                config = config.decode("utf-8")
+            for layer in json.loads(config)["config"]["layers"]:
+                if layer["class_name"] != "Dense":
+                    continue
+                cfg = layer["config"]
+                group = f["model_weights"][cfg["name"]]
+                names = [
+                    n.decode("utf-8") if isinstance(n, bytes) else n
+                    for n in group.attrs["weight_names"]
+                ]
+                kernel, bias = (np.asarray(group[n], dtype=np.float64) for n in names)
+                layers.append((kernel, bias, cfg.get("activation", "linear")))
+        return cls(layers)
+
+    @classmethod
+    def from_model(cls, model):
+        return cls(
+            [
+                (
+                    *(np.asarray(w, dtype=np.float64) for w in layer.get_weights()),
+                    layer.get_config().get("activation", "linear"),
+                )
+                for layer in model.layers
+            ]
+        )
+
+    def forward(self, X):
+        """Output of the last layer, one column per output unit."""
+        x = np.asarray(X, dtype=np.float64)
+        for kernel, bias, activation in self.layers:
+            x = ACTIVATIONS[activation](x @ kernel + bias)
+        return x
+
+    def predict(self, X):
+        return self.forward(X).ravel()
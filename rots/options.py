@@ -0,0 +1,176 @@
+"""Option chain helpers working on column arrays.
+
+A chain is a dict of equal length arrays (strike, expiry, right, bid, ask,
+underlying), as produced by rots.synthetic.synthetic_option_chain or read
+from rots.chainstore.
+
+OptionChainProvider contracts come without IV or Greeks, so implied_vol and
+greeks compute them for a whole chain in one array call (Black-Scholes,
+rots.synthetic.black_scholes), and select_delta picks the call nearest a
+delta target the way select_call picks by strike distance.
+"""
+
+import numpy as np
+from scipy.special import ndtr
+
+from rots.synthetic import black_scholes
+
+MIN_VOL = 1e-4
+MAX_VOL = 5.0
+
+
+def select_call(chain, date, otm=0.10, min_dte=25, max_dte=35):
+    """Index of the contract qc_Call_StopLoss.py would buy, or None.
+
+    Same rules as BuyCall: calls between the money and `otm` above it with
+    min_dte..max_dte days left, farthest expiry first, then the strike
+    closest to the underlying, skipping contracts with no ask.
+    """
+    date = np.datetime64(date, "D")
+    spot = chain["underlying"]
+    dte = (chain["expiry"] - date).astype("timedelta64[D]").astype(np.int64)
+    eligible = (
+        (chain["right"] == 0)
+        & (chain["strike"] >= spot)
+        & (chain["strike"] <= spot * (1 + otm))
+        & (dte >= min_dte)
+        & (dte <= max_dte)
+        & (chain["ask"] > 0)
+    )
+    candidates = np.flatnonzero(eligible)
+    if len(candidates) == 0:
+        return None
+    # lexsort sorts by the last key first
+    order = np.lexsort(
+        (
+            np.abs(spot[candidates] - chain["strike"][candidates]),
+            -dte[candidates],
+        )
+    )
+    return int(candidates[order[0]])
+
+
+def _d1(spot, strike, years, vol, rate):
+    root = vol * np.sqrt(years)
+    return (np.log(spot / strike) + (rate + 0.5 * vol**2) * years) / root, root
+
+
+def _pdf(x):
+    return np.exp(-0.5 * x**2) / np.sqrt(2 * np.pi)
+
+
+def implied_vol(price, spot, strike, years, rate=0.01, right=0, tol=1e-6, max_iter=50):
+    """Black-Scholes implied volatility of every price, NaN where none exists.
+
+    Newton steps on vega, kept inside a [MIN_VOL, MAX_VOL] bracket that is
+    narrowed every iteration; a step that leaves the bracket, or a vega too
+    small to divide by, falls back to bisection, so deep in/out of the money
+    contracts still converge.
+    """
+    price, spot, strike, years, right = np.broadcast_arrays(
+        *(np.asarray(a, dtype=np.float64) for a in (price, spot, strike, years, right))
+    )
+    years = np.maximum(years, 1e-8)
+    discount = strike * np.exp(-rate * years)
+    # no-arbitrage bounds of a European call/put
+    lower = np.where(
+        right == 0, np.maximum(spot - discount, 0), np.maximum(discount - spot, 0)
+    )
+    upper = np.where(right == 0, spot, discount)
+    valid = (price > lower) & (price < upper)
+
+    low = np.full(price.shape, MIN_VOL)
+    high = np.full(price.shape, MAX_VOL)
+    vol = np.full(price.shape, 0.5)
+    active = valid.copy()
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        s, k, t, r, v = (
+            spot[active],
+            strike[active],
+            years[active],
+            right[active],
+            vol[active],
+        )
+        diff = black_scholes(s, k, t, v, rate, r) - price[active]
+        done = np.abs(diff) < tol
+        # the price rises with vol, so the sign of diff says which half to keep
+        high[active] = np.where(diff > 0, v, high[active])
+        low[active] = np.where(diff < 0, v, low[active])
+        d1, _ = _d1(s, k, t, v, rate)
+        vega = s * _pdf(d1) * np.sqrt(t)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = v - diff / vega
+        inside = (vega > 1e-8) & (step > low[active]) & (step < high[active])
+        vol[active] = np.where(
+            done, v, np.where(inside, step, 0.5 * (low[active] + high[active]))
+        )
+        active[active] = ~done
+    return np.where(valid, vol, np.nan)
+
+
+def greeks(spot, strike, years, vol, rate=0.01, right=0):
+    """delta, gamma, theta (per calendar day) and vega (per vol point)."""
+    spot, strike, years, vol, right = np.broadcast_arrays(
+        *(np.asarray(a, dtype=np.float64) for a in (spot, strike, years, vol, right))
+    )
+    years = np.maximum(years, 1e-8)
+    d1, root = _d1(spot, strike, years, vol, rate)
+    d2 = d1 - root
+    call = right == 0
+    pdf = _pdf(d1)
+    discount = strike * np.exp(-rate * years)
+    delta = np.where(call, ndtr(d1), ndtr(d1) - 1.0)
+    gamma = pdf / (spot * root)
+    decay = -spot * pdf * vol / (2 * np.sqrt(years))
+    theta = np.where(
+        call, decay - rate * discount * ndtr(d2), decay + rate * discount * ndtr(-d2)
+    )
+    return {
+        "delta": delta,
+        "gamma": gamma,
+        "theta": theta / 365.0,
+        "vega": spot * pdf * np.sqrt(years) / 100.0,
+    }
+
+
+def chain_greeks(chain, date, rate=0.01):
+    """The chain with iv, delta, gamma, theta and vega columns added.
+
+    IV is solved from the bid/ask midpoint; contracts without a valid price
+    get NaN in every added column.
+    """
+    date = np.datetime64(date, "D")
+    years = (chain["expiry"] - date).astype("timedelta64[D]").astype(np.float64) / 365.0
+    mid = (chain["bid"] + chain["ask"]) / 2.0
+    iv = implied_vol(
+        mid, chain["underlying"], chain["strike"], years, rate, chain["right"]
+    )
+    out = dict(chain)
+    out["iv"] = iv
+    out.update(
+        greeks(chain["underlying"], chain["strike"], years, iv, rate, chain["right"])
+    )
+    return out
+
+
+def select_delta(chain, date, target=0.30, min_dte=25, max_dte=35, rate=0.01):
+    """Index of the call with the delta nearest `target`, farthest expiry
+    first, within min_dte..max_dte days; None if there is none."""
+    if "delta" not in chain:
+        chain = chain_greeks(chain, date, rate)
+    date = np.datetime64(date, "D")
+    dte = (chain["expiry"] - date).astype("timedelta64[D]").astype(np.int64)
+    eligible = (
+        (chain["right"] == 0)
+        & (dte >= min_dte)
+        & (dte <= max_dte)
+        & (chain["ask"] > 0)
+        & np.isfinite(chain["delta"])
+    )
+    candidates = np.flatnonzero(eligible)
+    if len(candidates) == 0:
+        return None
+    order = np.lexsort((np.abs(chain["delta"][candidates] - target), -dte[candidates]))
+    return int(candidates[order[0]])
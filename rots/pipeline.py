@@ -0,0 +1,295 @@
+"""The ROTS notebook as one instrumented run.
+
+fetch -> features -> scale -> fit -> (save) -> predict -> export, each in a
+Recorder stage so a slow daily run shows which stage it was:
+
+    from rots import pipeline
+    from rots.instrument import Recorder
+
+    pipeline.run("TSLA", recorder=Recorder("rots_stages.jsonl"))
+
+Indicators are computed locally from the daily adjusted bars (rots.features)
+instead of eleven Alpha Vantage indicator calls and the df_list merge. The
+exported file keeps the network's sigmoid output in a probability column,
+so other cutoffs than THRESHOLD can be tried with rots.sweep.
+
+A run with model_dir also saves the indicator state next to the model and
+scaler. update() then picks up from there each morning: it takes only the
+bars after the last one seen, steps the indicators forward, scores the new
+rows with a numpy forward pass (no TensorFlow import, no network refit) and
+appends them to the ticker's newest prediction file. Features are scaled
+without look-ahead: each row with the min/max of the rows up to it, in run()
+and, carried on from the saved scaler, in update():
+
+    pipeline.run("TSLA", model_dir="models")        # once, or on a schedule
+    pipeline.update_all(["TSLA", "AMD"], "models")  # every morning
+"""
+
+import datetime
+import glob
+import os
+import pickle
+
+import numpy as np
+
+from rots import features, labels, model
+from rots.instrument import Recorder
+from rots.scaler import FeatureScaler, expanding_transform
+
+THRESHOLD = 0.5  # the notebook's predict_classes cut
+
+
+def fetch_bars(ticker, api_key=None):
+    """Full daily adjusted history from Alpha Vantage, oldest first."""
+    from alpha_vantage.timeseries import TimeSeries
+
+    api_key = api_key or os.environ["ALPHAVANTAGE_API_KEY"]
+    ts = TimeSeries(key=api_key, output_format="pandas")
+    data = ts.get_daily_adjusted(ticker, outputsize="full")
+    return features.from_alpha_vantage(data[0].iloc[::-1])
+
+
+def fetch_recent(ticker, api_key=None):
+    """The last 100 daily adjusted bars, enough for a daily update."""
+    from alpha_vantage.timeseries import TimeSeries
+
+    api_key = api_key or os.environ["ALPHAVANTAGE_API_KEY"]
+    ts = TimeSeries(key=api_key, output_format="pandas")
+    data = ts.get_daily_adjusted(ticker, outputsize="compact")
+    return features.from_alpha_vantage(data[0].iloc[::-1])
+
+
+def labelled(bars, state=None):
+    """Feature frame plus the Expected label over the whole history."""
+    state = state if state is not None else features.FeatureState()
+    data = state.update(bars)
+    close = bars["adjusted_close"].to_numpy()
+    data[features.LABEL] = labels.expected_labels(close)[len(close) - len(data) :]
+    return data
+
+
+def prepare(bars, years=3, state=None):
+    """Feature frame plus the Expected label, trimmed like the notebook."""
+    return features.last_years(labelled(bars, state), years)
+
+
+def scale(key, history, rows):
+    """The scaler to save and the scaled last `rows` rows of history.
+
+    Every row is scaled with the min/max of the history up to and including
+    it (expanding_transform), so no training row sees a later row's range.
+    The scaler holds the min/max of the whole history, which are the last
+    row's parameters; update() carries the expanding scaling on from there.
+    """
+    history = history[features.FEATURES]
+    scaler = FeatureScaler().fit(key, history)
+    X = expanding_transform(history)[len(history) - rows :]
+    return scaler, X.astype(np.float32)
+
+
+def prediction_frame(dates, predictions, expected, ticker, probabilities=None):
+    """The notebook's export table (prediction/expected/Equal/correctBuySignal).
+
+    With probabilities a probability column follows the prediction.
+    """
+    import pandas as pd
+
+    test_DF = pd.DataFrame(
+        {"prediction": predictions}, index=pd.Index(dates, name="date")
+    )
+    if probabilities is not None:
+        test_DF["probability"] = np.asarray(probabilities)
+    test_DF["expected"] = np.asarray(expected)
+    test_DF["Equal"] = np.where(test_DF["prediction"] == test_DF["expected"], 1, 0)
+    test_DF["correctBuySignal"] = np.where(
+        (test_DF["prediction"] == test_DF["expected"])
+        & (test_DF["Equal"] == test_DF["expected"]),
+        1,
+        0,
+    )
+    test_DF["ticker"] = ticker
+    return test_DF
+
+
+def date_strings(index):
+    """Row dates of an export; intraday rows keep their bar time."""
+    if len(index) and (index != index.normalize()).any():
+        return index.strftime("%Y-%m-%d %H:%M")
+    return index.strftime("%Y-%m-%d")
+
+
+def prediction_path(ticker, out_dir=".", today=None):
+    today = today or datetime.date.today()
+    return os.path.join(out_dir, "%s_pred_%s.csv" % (ticker, today))
+
+
+def model_path(ticker, model_dir):
+    return os.path.join(model_dir, "%s.h5" % ticker)
+
+
+def scaler_path(ticker, model_dir):
+    return os.path.join(model_dir, "%s_scaler.npz" % ticker)
+
+
+def state_path(ticker, model_dir):
+    return os.path.join(model_dir, "%s_state.pkl" % ticker)
+
+
+def save_state(path, state, last_date):
+    with open(path, "wb") as f:
+        pickle.dump({"state": state, "last_date": last_date}, f)
+
+
+def load_state(path):
+    with open(path, "rb") as f:
+        saved = pickle.load(f)
+    return saved["state"], saved["last_date"]
+
+
+def latest_prediction(ticker, out_dir="."):
+    """Newest <TICKER>_pred_<date>.csv in out_dir, or None."""
+    paths = sorted(glob.glob(os.path.join(out_dir, "%s_pred_*.csv" % ticker)))
+    return paths[-1] if paths else None
+
+
+def run(
+    ticker,
+    bars=None,
+    out_dir=".",
+    recorder=None,
+    epochs=model.EPOCHS,
+    model_dir=None,
+):
+    """Full run for one ticker; with model_dir the model, scaler and
+    indicator state are saved for update()."""
+    recorder = recorder or Recorder()
+    if bars is None:
+        with recorder.stage("fetch", ticker=ticker) as record:
+            bars = fetch_bars(ticker)
+            record["rows"] = len(bars)
+
+    state = features.FeatureState()
+    with recorder.stage("features", ticker=ticker) as record:
+        history = labelled(bars, state)
+        data = features.last_years(history)
+        record["rows"] = len(data)
+
+    with recorder.stage("scale", ticker=ticker) as record:
+        scaler, X = scale(ticker, history, len(data))
+        record["rows"] = len(X)
+
+    y = data[features.LABEL].to_numpy(dtype=np.float32)
+
+    with recorder.stage("fit", ticker=ticker, epochs=epochs) as record:
+        fitted = model.train(X, y, epochs=epochs)
+        record["rows"] = len(X)
+
+    if model_dir is not None:
+        with recorder.stage("save", ticker=ticker):
+            os.makedirs(model_dir, exist_ok=True)
+            fitted.save(model_path(ticker, model_dir))
+            scaler.save(scaler_path(ticker, model_dir))
+            save_state(state_path(ticker, model_dir), state, bars.index[-1])
+
+    with recorder.stage("predict", ticker=ticker) as record:
+        probabilities = model.predict_proba(fitted, X)
+        predictions = (probabilities > THRESHOLD).astype("int32")
+        record["rows"] = len(predictions)
+
+    with recorder.stage("export", ticker=ticker) as record:
+        test_DF = prediction_frame(
+            date_strings(data.index),
+            predictions,
+            y.astype(int),
+            ticker,
+            probabilities=probabilities,
+        )
+        os.makedirs(out_dir, exist_ok=True)
+        path = prediction_path(ticker, out_dir)
+        test_DF.to_csv(path)
+        record["rows"] = len(test_DF)
+    return path, fitted
+
+
+def update(
+    ticker,
+    model_dir,
+    bars=None,
+    out_dir=".",
+    recorder=None,
+    network=None,
+    key=None,
+    refit="expanding",
+):
+    """Score only the bars after the last saved one and append them.
+
+    bars may be any recent history of the ticker (the Alpha Vantage compact
+    download by default); rows at or before the saved last date are dropped.
+    The new rows are exported with expected 0, like the notebook's last days
+    whose label is not known yet. Returns the prediction file and the rows.
+    key names the saved files and the prediction file when it is not the
+    ticker (rots.intraday saves TSLA_15m next to the daily TSLA).
+
+    refit="expanding" scales the new rows the way run() scaled the training
+    rows, each with the min/max up to and including it, and saves the
+    widened scaler (FeatureScaler.partial_transform); refit=None scores with
+    the saved min/max and leaves the scaler file alone.
+    """
+    if refit not in (None, "expanding"):
+        raise ValueError("refit must be None or 'expanding', not %r" % (refit,))
+    recorder = recorder or Recorder()
+    key = key or ticker
+    state, last_date = load_state(state_path(key, model_dir))
+    if bars is None:
+        with recorder.stage("fetch", ticker=ticker) as record:
+            bars = fetch_recent(ticker)
+            record["rows"] = len(bars)
+    bars = bars[bars.index > last_date]
+
+    with recorder.stage("features", ticker=ticker, rows=len(bars)):
+        data = state.update(bars)
+
+    path = latest_prediction(key, out_dir) or prediction_path(key, out_dir)
+    if len(data) == 0:
+        return path, prediction_frame([], [], [], ticker)
+
+    with recorder.stage("predict", ticker=ticker, rows=len(data)):
+        scaler = FeatureScaler.load(scaler_path(key, model_dir))
+        if refit == "expanding":
+            X = scaler.partial_transform(key, data[features.FEATURES])
+        else:
+            X = scaler.transform(key, data[features.FEATURES])
+        network = network or model.DenseWeights.from_h5(model_path(key, model_dir))
+        probabilities = network.predict(X)
+        predictions = (probabilities > THRESHOLD).astype("int32")
+
+    with recorder.stage("export", ticker=ticker, rows=len(data)):
+        test_DF = prediction_frame(
+            date_strings(data.index),
+            predictions,
+            np.zeros(len(data), dtype=int),
+            ticker,
+            probabilities=probabilities,
+        )
+        os.makedirs(out_dir, exist_ok=True)
+        exists = os.path.exists(path)
+        if exists:
+            # files written before the probability column keep their layout
+            with open(path) as f:
+                header = f.readline().strip().split(",")
+            test_DF = test_DF[[c for c in header if c in test_DF]]
+        test_DF.to_csv(path, mode="a" if exists else "w", header=not exists)
+        # only move the state (and scaler) on once the rows are written
+        if refit is not None:
+            scaler.save(scaler_path(key, model_dir))
+        save_state(state_path(key, model_dir), state, bars.index[-1])
+    return path, test_DF
+
+
+def update_all(tickers, model_dir, out_dir=".", recorder=None):
+    """update() every ticker; returns {ticker: prediction file}."""
+    recorder = recorder or Recorder()
+    return {
+        ticker: update(ticker, model_dir, out_dir=out_dir, recorder=recorder)[0]
+        for ticker in tickers
+    }
@@ -0,0 +1,142 @@
+"""One ROTS network for every ticker.
+
+Instead of one Dense model per ticker fitted on ~750 rows, the pooled model
+is trained once on the scaled rows of all tickers in a FeatureStore, with a
+one-hot ticker block appended to the 12 features so it can still learn
+per-ticker offsets. One model file serves the whole universe:
+
+    python -m rots.pooled features_store models/ --out-dir predictions/
+
+    pooled = PooledModel.load("models")
+    signals = pooled.predict_classes(["TSLA", "AMD"], X_scaled)
+
+The larger training set is fitted with larger batches (POOLED_BATCH_SIZE);
+PooledModel scores with the numpy forward pass from rots.model, so serving
+does not import TensorFlow.
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+from rots import model
+from rots.store import FeatureStore
+
+POOLED_BATCH_SIZE = 256
+MODEL_FILE = "pooled.h5"
+TICKERS_FILE = "pooled_tickers.json"
+
+
+def one_hot(tickers, index):
+    """One row per ticker with a 1 in that ticker's column."""
+    rows = np.array([index[t] for t in tickers])
+    encoded = np.zeros((len(rows), len(index)), dtype=np.float32)
+    encoded[np.arange(len(rows)), rows] = 1.0
+    return encoded
+
+
+def pooled_inputs(store, tickers):
+    """Stacked [features | one-hot] inputs, labels and row tickers."""
+    index = {ticker: i for i, ticker in enumerate(tickers)}
+    rows = sum(store.manifest["tickers"][t]["rows"] for t in tickers)
+    n_features = len(store.manifest["columns"]) - 1
+    X = np.zeros((rows, n_features + len(tickers)), dtype=np.float32)
+    y = np.empty(rows, dtype=np.float32)
+    row_tickers = np.empty(rows, dtype=object)
+    start = 0
+    for ticker in tickers:
+        features, labels = store.training_set(ticker)
+        end = start + len(labels)
+        X[start:end, :n_features] = features
+        X[start:end, n_features + index[ticker]] = 1.0
+        y[start:end] = labels
+        row_tickers[start:end] = ticker
+        start = end
+    return X, y, row_tickers
+
+
+def train_pooled(
+    store, tickers=None, epochs=model.EPOCHS, batch_size=POOLED_BATCH_SIZE
+):
+    tickers = list(tickers or store.tickers())
+    X, y, _ = pooled_inputs(store, tickers)
+    return model.train(X, y, epochs=epochs, batch_size=batch_size), tickers
+
+
+def save(fitted, tickers, model_dir):
+    os.makedirs(model_dir, exist_ok=True)
+    fitted.save(os.path.join(model_dir, MODEL_FILE))
+    with open(os.path.join(model_dir, TICKERS_FILE), "w") as f:
+        json.dump(list(tickers), f)
+    return os.path.join(model_dir, MODEL_FILE)
+
+
+class PooledModel:
+    def __init__(self, network, tickers):
+        self.network = network
+        self.tickers = list(tickers)
+        self.index = {ticker: i for i, ticker in enumerate(self.tickers)}
+
+    @classmethod
+    def load(cls, model_dir):
+        with open(os.path.join(model_dir, TICKERS_FILE)) as f:
+            tickers = json.load(f)
+        network = model.DenseWeights.from_h5(os.path.join(model_dir, MODEL_FILE))
+        return cls(network, tickers)
+
+    def inputs(self, tickers, X):
+        X = np.asarray(X, dtype=np.float32)
+        if isinstance(tickers, str):
+            tickers = [tickers] * len(X)
+        return np.hstack((X, one_hot(tickers, self.index)))
+
+    def predict(self, tickers, X):
+        """Buy probability of scaled rows; tickers is one ticker or one per row."""
+        return self.network.predict(self.inputs(tickers, X))
+
+    def predict_classes(self, tickers, X, threshold=0.5):
+        return (self.predict(tickers, X) > threshold).astype("int32")
+
+
+def export(store, pooled, out_dir="."):
+    """Write the usual <TICKER>_pred_<date>.csv for every pooled ticker."""
+    from rots.pipeline import THRESHOLD, prediction_frame, prediction_path
+
+    os.makedirs(out_dir, exist_ok=True)
+    paths = {}
+    for ticker in pooled.tickers:
+        dates, _ = store.open(ticker)
+        X, y = store.training_set(ticker)
+        probabilities = pooled.predict(ticker, X)
+        test_DF = prediction_frame(
+            np.datetime_as_string(dates),
+            (probabilities > THRESHOLD).astype("int32"),
+            y.astype(int),
+            ticker,
+            probabilities=probabilities,
+        )
+        paths[ticker] = prediction_path(ticker, out_dir)
+        test_DF.to_csv(paths[ticker])
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("store_dir")
+    parser.add_argument("model_dir")
+    parser.add_argument("--epochs", type=int, default=model.EPOCHS)
+    parser.add_argument("--batch-size", type=int, default=POOLED_BATCH_SIZE)
+    parser.add_argument("--out-dir", help="also export prediction files here")
+    args = parser.parse_args()
+    store = FeatureStore(args.store_dir)
+    fitted, tickers = train_pooled(
+        store, epochs=args.epochs, batch_size=args.batch_size
+    )
+    print(save(fitted, tickers, args.model_dir))
+    if args.out_dir:
+        for ticker, path in sorted(
+            export(store, PooledModel.load(args.model_dir), args.out_dir).items()
+        ):
+            print(ticker, path)
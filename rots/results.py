@@ -0,0 +1,276 @@
+"""SQLite store of backtest and training run results.
+
+Backtest outcomes used to be copied by hand into spreadsheets such as
+Kevin/QC_FinalResults_05312021.xlsx. ResultStore keeps every run in one
+SQLite file (standard library, nothing to install):
+
+    runs      one row per run: kind (backtest/train), strategy, ticker,
+              params (JSON), param_hash, start, end, created
+    metrics   (run, name, value), any number of metrics per run
+    equity    the equity curve of a run, dates and values as numpy blobs
+
+runs is indexed by (ticker, strategy, param_hash) and metrics by (name,
+run), so the usual questions are index lookups rather than scans:
+
+    store = ResultStore("results.db")
+    store.add_many([backtest_record(result, "TSLA", params), ...])
+    store.best("total_return", kind="backtest", last=100)   # per ticker
+    store.runs(ticker="TSLA", strategy="NeuralNetworkTrailingStopLoss")
+    store.equity(run_id)
+
+add_many() inserts any number of runs in one transaction with executemany.
+python -m rots.results results.db Kevin/qc_Call_StopLoss.py --ticker TSLA
+replays algorithm files with rots.localqc and records them.
+"""
+
+import argparse
+import datetime
+import hashlib
+import json
+import sqlite3
+
+import numpy as np
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    params TEXT NOT NULL,
+    param_hash TEXT NOT NULL,
+    start TEXT,
+    end TEXT,
+    created TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run INTEGER NOT NULL REFERENCES runs(id),
+    name TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (run, name)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS equity (
+    run INTEGER PRIMARY KEY REFERENCES runs(id),
+    dates BLOB NOT NULL,
+    "values" BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_key ON runs (ticker, strategy, param_hash);
+CREATE INDEX IF NOT EXISTS runs_kind ON runs (kind, id);
+CREATE INDEX IF NOT EXISTS metrics_name ON metrics (name, run);
+"""
+
+
+def param_hash(params):
+    """Stable short hash of a parameter dict, equal for equal parameters."""
+    text = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+def backtest_record(result, ticker, params=None):
+    """Record of a rots.localqc Result."""
+    dates = result.equity.index
+    return {
+        "kind": "backtest",
+        "strategy": result.name,
+        "ticker": ticker,
+        "params": params or {},
+        "start": str(dates[0])[:10] if len(dates) else None,
+        "end": str(dates[-1])[:10] if len(dates) else None,
+        "metrics": result.statistics,
+        "equity": result.equity,
+    }
+
+
+def training_record(ticker, prediction_path, params=None, strategy="rots"):
+    """Record of a training run from the prediction file it wrote."""
+    from rots import evaluate
+
+    dates, prediction, expected, tickers = evaluate._read(prediction_path)
+    table = evaluate.evaluate(dates, prediction, expected, tickers)
+    metrics = table.loc["ALL"].dropna().to_dict()
+    return {
+        "kind": "train",
+        "strategy": strategy,
+        "ticker": ticker,
+        "params": params or {},
+        "start": str(dates.min()) if len(dates) else None,
+        "end": str(dates.max()) if len(dates) else None,
+        "metrics": metrics,
+        "equity": None,
+    }
+
+
+class ResultStore:
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def add(self, record):
+        return self.add_many([record])[0]
+
+    def add_many(self, records):
+        """Insert every record in one transaction; returns the run ids."""
+        created = datetime.datetime.now().isoformat(timespec="seconds")
+        ids = []
+        metrics = []
+        equity = []
+        with self.connection:
+            cursor = self.connection.cursor()
+            for record in records:
+                params = record.get("params") or {}
+                cursor.execute(
+                    "INSERT INTO runs (kind, strategy, ticker, params, param_hash,"
+                    " start, end, created) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        record["kind"],
+                        record["strategy"],
+                        record["ticker"],
+                        json.dumps(params, sort_keys=True, default=str),
+                        param_hash(params),
+                        record.get("start"),
+                        record.get("end"),
+                        created,
+                    ),
+                )
+                run = cursor.lastrowid
+                ids.append(run)
+                metrics.extend(
+                    (run, name, float(value))
+                    for name, value in (record.get("metrics") or {}).items()
+                    if np.isscalar(value) and not isinstance(value, str)
+                )
+                curve = record.get("equity")
+                if curve is not None and len(curve):
+                    dates = np.asarray(curve.index, dtype="datetime64[D]")
+                    equity.append(
+                        (
+                            run,
+                            dates.astype(np.int64).tobytes(),
+                            np.asarray(curve, dtype=np.float64).tobytes(),
+                        )
+                    )
+            cursor.executemany("INSERT INTO metrics VALUES (?, ?, ?)", metrics)
+            cursor.executemany(
+                'INSERT INTO equity (run, dates, "values") VALUES (?, ?, ?)', equity
+            )
+        return ids
+
+    def _frame(self, sql, arguments=()):
+        import pandas as pd
+
+        cursor = self.connection.execute(sql, arguments)
+        columns = [description[0] for description in cursor.description]
+        return pd.DataFrame(cursor.fetchall(), columns=columns)
+
+    def runs(self, ticker=None, strategy=None, kind=None, param_hash=None, last=None):
+        """Matching runs, newest first, one column per metric."""
+        where = []
+        arguments = []
+        for column, value in (
+            ("ticker", ticker),
+            ("strategy", strategy),
+            ("kind", kind),
+            ("param_hash", param_hash),
+        ):
+            if value is not None:
+                where.append("%s = ?" % column)
+                arguments.append(value)
+        sql = "SELECT id FROM runs"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY id DESC"
+        if last is not None:
+            sql += " LIMIT %d" % int(last)
+        frame = self._frame(
+            "SELECT * FROM runs WHERE id IN (%s) ORDER BY id DESC" % sql, arguments
+        ).set_index("id")
+        if len(frame) == 0:
+            return frame
+        values = self._frame(
+            "SELECT run, name, value FROM metrics WHERE run IN (%s)" % sql, arguments
+        )
+        return frame.join(values.pivot(index="run", columns="name", values="value"))
+
+    def best(self, metric, kind=None, last=None, by="ticker", lowest=False):
+        """The best run on metric for every value of by (ticker, strategy...).
+
+        last limits the search to the newest runs (of kind, when given).
+        """
+        if by not in ("ticker", "strategy", "param_hash", "kind"):
+            raise ValueError("cannot group by %r" % by)
+        recent = "SELECT id FROM runs"
+        arguments = []
+        if kind is not None:
+            recent += " WHERE kind = ?"
+            arguments.append(kind)
+        recent += " ORDER BY id DESC"
+        if last is not None:
+            recent += " LIMIT %d" % int(last)
+        # SQLite takes the bare columns from the row that holds the MIN/MAX
+        sql = (
+            "SELECT %s(m.value) AS value, r.id AS run, r.kind, r.strategy,"
+            " r.ticker, r.param_hash, r.params, r.start, r.end FROM metrics m"
+            " JOIN runs r ON r.id = m.run WHERE m.name = ? AND m.run IN (%s)"
+            " GROUP BY r.%s ORDER BY value %s"
+            % ("MIN" if lowest else "MAX", recent, by, "ASC" if lowest else "DESC")
+        )
+        frame = self._frame(sql, [metric] + arguments)
+        return frame.rename(columns={"value": metric}).set_index(by)
+
+    def equity(self, run):
+        """The equity curve of a run as a date indexed Series, or None."""
+        import pandas as pd
+
+        row = self.connection.execute(
+            'SELECT dates, "values" FROM equity WHERE run = ?', (int(run),)
+        ).fetchone()
+        if row is None:
+            return None
+        dates = np.frombuffer(row[0], dtype=np.int64).astype("datetime64[D]")
+        return pd.Series(
+            np.frombuffer(row[1], dtype=np.float64),
+            index=pd.DatetimeIndex(dates),
+            name="equity",
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("database")
+    parser.add_argument("algorithms", nargs="*", help="algorithm files to replay")
+    parser.add_argument("--ticker", required=True)
+    parser.add_argument("--bars-dir")
+    parser.add_argument("--vol", type=float)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--best", default="total_return", help="metric to rank by")
+    args = parser.parse_args()
+    store = ResultStore(args.database)
+    if args.algorithms:
+        from rots import localqc
+
+        jobs = [
+            {
+                "path": path,
+                "bars_dir": args.bars_dir,
+                "vol": args.vol,
+                "seed": args.seed,
+            }
+            for path in args.algorithms
+        ]
+        results = (
+            localqc.run_many(jobs, args.workers)
+            if len(jobs) > 1
+            else [localqc.run(**jobs[0])]
+        )
+        store.add_many(
+            [
+                backtest_record(result, args.ticker, job)
+                for job, result in zip(jobs, results)
+            ]
+        )
+    print(store.best(args.best, kind="backtest").to_string())
@@ -0,0 +1,141 @@
+"""Persisted per-ticker min/max feature scaler.
+
+The notebook calls MinMaxScaler().fit_transform on the whole history every
+run, which refits on every new row and lets the future min/max leak into
+the training rows. FeatureScaler keeps one min/max row per ticker, saved as
+an .npz next to the model:
+
+    X_train = expanding_transform(X_history)      # no row sees later rows
+    scaler = FeatureScaler().fit("TSLA", X_history)   # the last row's min/max
+    scaler.save("models/TSLA_scaler.npz")
+
+    scaler = FeatureScaler.load("models/TSLA_scaler.npz", "models/AMD_scaler.npz")
+    scaled = scaler.transform(["TSLA", "AMD"], X_today)   # one row per ticker
+
+partial_transform() carries the expanding scaling on over new rows and widens
+the saved min/max with them; fit_window() is the rolling alternative.
+transform() gathers the parameters of each row's ticker and scales all rows
+in one vectorized call, so scaling today's row is O(1) per ticker. Scaling
+matches sklearn's MinMaxScaler, including constant features mapping to 0.
+"""
+
+import numpy as np
+
+from rots.features import FEATURES
+
+
+class FeatureScaler:
+    def __init__(self, features=FEATURES):
+        self.features = list(features)
+        self.tickers = []
+        self.index = {}
+        self.data_min = np.empty((0, len(self.features)))
+        self.data_max = np.empty((0, len(self.features)))
+
+    def _row(self, ticker):
+        if ticker not in self.index:
+            self.index[ticker] = len(self.tickers)
+            self.tickers.append(ticker)
+            empty = np.full((1, len(self.features)), np.nan)
+            self.data_min = np.vstack((self.data_min, empty))
+            self.data_max = np.vstack((self.data_max, empty))
+        return self.index[ticker]
+
+    def fit(self, ticker, X):
+        """Replace the ticker's parameters with the min/max of X."""
+        row = self._row(ticker)
+        X = np.asarray(X, dtype=np.float64)
+        self.data_min[row] = np.nanmin(X, axis=0)
+        self.data_max[row] = np.nanmax(X, axis=0)
+        return self
+
+    def partial_fit(self, ticker, X):
+        """Expanding refit: widen the ticker's min/max to cover new rows."""
+        row = self._row(ticker)
+        X = np.asarray(X, dtype=np.float64).reshape(-1, len(self.features))
+        self.data_min[row] = np.fmin(self.data_min[row], np.nanmin(X, axis=0))
+        self.data_max[row] = np.fmax(self.data_max[row], np.nanmax(X, axis=0))
+        return self
+
+    def partial_transform(self, ticker, X):
+        """Expanding scaling of new rows, continuing from the saved min/max.
+
+        Each row is scaled with the min/max up to and including it, as
+        expanding_transform does over a whole history; the ticker's
+        parameters are then widened to cover X (partial_fit).
+        """
+        row = self._row(ticker)
+        X = np.asarray(X, dtype=np.float64).reshape(-1, len(self.features))
+        scaled = expanding_transform(X, self.data_min[row], self.data_max[row])
+        self.partial_fit(ticker, X)
+        return scaled
+
+    def fit_window(self, ticker, X, window):
+        """Rolling refit: min/max over only the last `window` rows of X."""
+        return self.fit(ticker, np.asarray(X)[-window:])
+
+    def _params(self, tickers, n_rows):
+        if isinstance(tickers, str):
+            rows = np.full(n_rows, self.index[tickers])
+        else:
+            rows = np.array([self.index[t] for t in tickers])
+        data_min = self.data_min[rows]
+        data_range = self.data_max[rows] - data_min
+        # constant features scale to 0, like sklearn's _handle_zeros_in_scale
+        data_range[data_range == 0] = 1.0
+        return data_min, data_range
+
+    def transform(self, tickers, X):
+        """Scale X; tickers is one ticker for all rows or one per row."""
+        X = np.asarray(X, dtype=np.float64).reshape(-1, len(self.features))
+        data_min, data_range = self._params(tickers, len(X))
+        return (X - data_min) / data_range
+
+    def inverse_transform(self, tickers, X):
+        X = np.asarray(X, dtype=np.float64).reshape(-1, len(self.features))
+        data_min, data_range = self._params(tickers, len(X))
+        return X * data_range + data_min
+
+    def save(self, path):
+        np.savez(
+            path,
+            features=np.array(self.features),
+            tickers=np.array(self.tickers),
+            data_min=self.data_min,
+            data_max=self.data_max,
+        )
+        return path
+
+    @classmethod
+    def load(cls, *paths):
+        """Load one or more saved scalers into a single cross-ticker scaler."""
+        scaler = None
+        for path in paths:
+            saved = np.load(path)
+            if scaler is None:
+                scaler = cls([str(f) for f in saved["features"]])
+            for i, ticker in enumerate(saved["tickers"]):
+                row = scaler._row(str(ticker))
+                scaler.data_min[row] = saved["data_min"][i]
+                scaler.data_max[row] = saved["data_max"][i]
+        return scaler
+
+
+def expanding_transform(X, data_min=None, data_max=None):
+    """Scale each row with the min/max of the rows up to and including it.
+
+    A leak-free alternative to fitting on the whole history for training
+    sets: no row is scaled with information from later rows. data_min and
+    data_max are the min/max of rows before X, when there were any.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    filled_min = np.where(np.isnan(X), np.inf, X)
+    filled_max = np.where(np.isnan(X), -np.inf, X)
+    running_min = np.minimum.accumulate(filled_min, axis=0)
+    running_max = np.maximum.accumulate(filled_max, axis=0)
+    if data_min is not None:
+        running_min = np.fmin(running_min, data_min)
+        running_max = np.fmax(running_max, data_max)
+    data_range = running_max - running_min
+    data_range[~np.isfinite(data_range) | (data_range == 0)] = 1.0
+    return (X - running_min) / data_range
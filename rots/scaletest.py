@@ -0,0 +1,125 @@
+"""Scale test: push a synthetic universe through the whole ROTS pipeline.
+
+    python -m rots.scaletest --tickers 10 100 1000 --years 3 --out scale.jsonl
+
+For each universe size it generates regime-switching histories, builds
+features and labels, trains and predicts one model per ticker, backtests
+the signals and buys a synthetic option contract for every signal. Tickers
+stream through the stages one at a time, so only one ticker is in memory.
+Every stage is recorded with rots.instrument (wall/CPU time, peak RSS,
+rows) and the throughput per stage is printed as a table, so the scaling
+curve can be tracked from run to run.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from rots import backtest, features, labels, model, options, synthetic
+from rots.instrument import Recorder
+
+STAGES = ["generate", "features", "train", "predict", "backtest", "options"]
+
+
+def run(n_tickers, years, epochs=1, seed=0, recorder=None):
+    """One record per stage for a universe of n_tickers.
+
+    Tickers are generated and taken through every stage one at a time, and
+    each ticker's bars, model and signals are dropped before the next, so
+    memory (and the recorded peak RSS) is that of one ticker at any size.
+    A stage's record sums wall/CPU time and rows over the tickers and keeps
+    the highest peak RSS.
+    """
+    recorder = recorder or Recorder()
+    size = {"tickers": n_tickers, "years": years}
+    per_ticker = Recorder()
+    universe = synthetic.synthetic_universe(n_tickers, years, seed=seed)
+    for _ in range(n_tickers):
+        with per_ticker.stage("generate") as record:
+            ticker, bars = next(universe)
+            record["rows"] = len(bars)
+
+        with per_ticker.stage("features") as record:
+            data = features.min_max_scale(features.build_features(bars))
+            close = bars["adjusted_close"].to_numpy()
+            y = labels.expected_labels(close)[len(close) - len(data) :]
+            X = data[features.FEATURES].to_numpy(np.float32)
+            record["rows"] = len(y)
+
+        with per_ticker.stage("train") as record:
+            fitted = model.train(X, y.astype(np.float32), epochs=epochs)
+            record["rows"] = len(y) * epochs
+
+        with per_ticker.stage("predict") as record:
+            signals = model.predict_classes(fitted, X)
+            record["rows"] = len(signals)
+
+        with per_ticker.stage("backtest") as record:
+            close = bars["close"].to_numpy()[-len(signals) :]
+            trades = backtest.signal_trades(close, signals)
+            record["rows"] = len(signals)
+
+        with per_ticker.stage("options") as record:
+            window = bars.iloc[-len(signals) :]
+            close = window["close"].to_numpy()
+            vol = np.std(np.diff(np.log(close))) * np.sqrt(252)
+            contracts = 0
+            for i in trades["entry"]:
+                chain = synthetic.synthetic_option_chain(
+                    close[i], window.index[i], vol, seed=int(i)
+                )
+                options.select_call(chain, window.index[i])
+                contracts += len(chain["strike"])
+            record["rows"] = contracts
+        del bars, data, X, y, fitted, signals, trades, window
+
+    for name in STAGES:
+        records = [r for r in per_ticker.records if r["stage"] == name]
+        record = {"stage": name, "rows": sum(r["rows"] for r in records)}
+        record.update(size)
+        if name == "train":
+            record["epochs"] = epochs
+        peaks = [r["peak_rss_bytes"] for r in records if r["peak_rss_bytes"]]
+        record["wall_s"] = sum(r["wall_s"] for r in records)
+        record["cpu_s"] = sum(r["cpu_s"] for r in records)
+        record["peak_rss_bytes"] = max(peaks) if peaks else None
+        record["timestamp"] = time.time()
+        recorder.add(record)
+    return recorder.records
+
+
+def throughput_table(records):
+    lines = [
+        "%8s %6s %-9s %12s %10s %12s"
+        % ("tickers", "years", "stage", "rows/s", "wall s", "peak MB")
+    ]
+    for r in records:
+        rate = r["rows"] / r["wall_s"] if r["wall_s"] else float("inf")
+        lines.append(
+            "%8d %6g %-9s %12.0f %10.2f %12.1f"
+            % (
+                r["tickers"],
+                r["years"],
+                r["stage"],
+                rate,
+                r["wall_s"],
+                (r["peak_rss_bytes"] or 0) / 2**20,
+            )
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickers", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--years", type=float, default=3)
+    parser.add_argument("--epochs", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="append stage records to this JSON lines file")
+    args = parser.parse_args()
+
+    recorder = Recorder(args.out)
+    for n_tickers in args.tickers:
+        run(n_tickers, args.years, args.epochs, args.seed, recorder)
+    print(throughput_table(recorder.records))
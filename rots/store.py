@@ -0,0 +1,145 @@
+"""Memory-mapped float32 feature store shared by training jobs.
+
+Each ticker's scaled feature matrix and label are written once as one
+float32 .npy array (columns FEATURES + [LABEL]) plus its dates, and a
+manifest.json in the store directory records the schema, every ticker's row
+count and date range, and the min/max the features were scaled with:
+
+    store = FeatureStore("features_store")
+    store.add("TSLA", pipeline.labelled(bars))     # or python -m rots.store
+
+    X, y = FeatureStore("features_store").training_set("TSLA")
+
+Readers np.load the arrays with mmap_mode="r", so training and sweep
+workers on one machine share the same page-cache pages instead of each
+rebuilding and holding a float64 pandas copy. X and y are read-only views
+into the mapped array.
+
+Rows are scaled without look-ahead, each with the min/max of the rows up to
+it (scaler.expanding_transform), so add() wants the whole history oldest
+first; the manifest's min/max are those of the last row.
+"""
+
+import argparse
+import glob
+import json
+import os
+
+import numpy as np
+
+from rots import features
+from rots.scaler import FeatureScaler, expanding_transform
+
+MANIFEST = "manifest.json"
+DTYPE = "float32"
+COLUMNS = features.FEATURES + [features.LABEL]
+
+
+class FeatureStore:
+    def __init__(self, root):
+        self.root = root
+        self.manifest = self._read_manifest()
+
+    def _read_manifest(self):
+        path = os.path.join(self.root, MANIFEST)
+        if not os.path.exists(path):
+            return {"columns": COLUMNS, "dtype": DTYPE, "tickers": {}}
+        with open(path) as f:
+            return json.load(f)
+
+    def _write_manifest(self):
+        # write then rename so readers never see a half written manifest
+        path = os.path.join(self.root, MANIFEST)
+        with open(path + ".tmp", "w") as f:
+            json.dump(self.manifest, f, indent=1)
+        os.replace(path + ".tmp", path)
+
+    def matrix_path(self, ticker):
+        return os.path.join(self.root, "%s.npy" % ticker)
+
+    def dates_path(self, ticker):
+        return os.path.join(self.root, "%s_dates.npy" % ticker)
+
+    def tickers(self):
+        return sorted(self.manifest["tickers"])
+
+    def add(self, ticker, data, scaler=None):
+        """Scale and store one ticker's feature frame (FEATURES + LABEL).
+
+        The features are min/max scaled with `scaler` when it already knows
+        the ticker, otherwise with the expanding min/max of `data`.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        if scaler is None or ticker not in scaler.index:
+            scaled = expanding_transform(data[features.FEATURES])
+            scaler = FeatureScaler().fit(ticker, data[features.FEATURES])
+        else:
+            scaled = scaler.transform(ticker, data[features.FEATURES])
+        matrix = np.lib.format.open_memmap(
+            self.matrix_path(ticker),
+            mode="w+",
+            dtype=DTYPE,
+            shape=(len(data), len(COLUMNS)),
+        )
+        matrix[:, :-1] = scaled
+        matrix[:, -1] = data[features.LABEL].to_numpy()
+        matrix.flush()
+        del matrix
+        dates = data.index.to_numpy().astype("datetime64[D]")
+        np.save(self.dates_path(ticker), dates)
+
+        row = scaler.index[ticker]
+        self.manifest = self._read_manifest()
+        self.manifest["tickers"][ticker] = {
+            "rows": len(data),
+            "start": str(dates[0]) if len(dates) else None,
+            "end": str(dates[-1]) if len(dates) else None,
+            "data_min": scaler.data_min[row].tolist(),
+            "data_max": scaler.data_max[row].tolist(),
+        }
+        self._write_manifest()
+        return self.matrix_path(ticker)
+
+    def open(self, ticker):
+        """(dates, matrix) of a ticker, the matrix memory-mapped read-only."""
+        matrix = np.load(self.matrix_path(ticker), mmap_mode="r")
+        dates = np.load(self.dates_path(ticker), mmap_mode="r")
+        return dates, matrix
+
+    def training_set(self, ticker):
+        """Scaled X and label y of a ticker as views of the mapped array."""
+        _, matrix = self.open(ticker)
+        return matrix[:, :-1], matrix[:, -1]
+
+    def scaler(self, tickers=None):
+        """FeatureScaler with the stored parameters, for scoring new rows."""
+        scaler = FeatureScaler(self.manifest["columns"][:-1])
+        for ticker in tickers or self.tickers():
+            entry = self.manifest["tickers"][ticker]
+            row = scaler._row(ticker)
+            scaler.data_min[row] = entry["data_min"]
+            scaler.data_max[row] = entry["data_max"]
+        return scaler
+
+
+def add_feature_csvs(root, source_dir):
+    """Store every <TICKER>_features.csv written by rots.chunked."""
+    import pandas as pd
+
+    store = FeatureStore(root)
+    for path in sorted(glob.glob(os.path.join(source_dir, "*_features.csv"))):
+        ticker = os.path.basename(path)[: -len("_features.csv")]
+        data = pd.read_csv(path, index_col=0, parse_dates=True)
+        store.add(ticker, data)
+    return store
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source_dir", help="directory of <TICKER>_features.csv")
+    parser.add_argument("store_dir")
+    args = parser.parse_args()
+    store = add_feature_csvs(args.store_dir, args.source_dir)
+    for ticker in store.tickers():
+        entry = store.manifest["tickers"][ticker]
+        print(ticker, entry["rows"], entry["start"], entry["end"])
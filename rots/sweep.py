@@ -0,0 +1,131 @@
+"""Threshold sweep over stored buy probabilities.
+
+The pipeline writes the network's sigmoid output next to the 0/1 prediction
+(the probability column), so a sparser or denser signal set is a different
+cut of the same numbers, not a retrain. sweep() sorts the probabilities once
+and reads every cutoff off cumulative sums over that order: signal count,
+precision, recall and, given closes, the rots.backtest trade PnL of the
+signals above the cutoff. emit() writes prediction files for chosen cutoffs:
+
+    python -m rots.sweep TSLA_pred_2021-05-30.csv --bars TSLA_bars.csv \
+        --emit 0.6 0.7
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+from rots import backtest, pipeline
+
+THRESHOLDS = np.arange(1, 200) / 200.0
+
+
+def trade_returns(close, target=0.03, horizon=3):
+    """Return of the trade a signal on each row would make, NaN if none."""
+    close = np.asarray(close, dtype=np.float64)
+    trades = backtest.signal_trades(
+        close, np.ones(len(close), dtype=bool), target, horizon
+    )
+    returns = np.full(len(close), np.nan)
+    returns[trades["entry"]] = trades["return"]
+    return returns
+
+
+def sweep(probabilities, expected, thresholds=THRESHOLDS, returns=None):
+    """One row per threshold; a row is a signal when probability > threshold."""
+    import pandas as pd
+
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    expected = np.asarray(expected).astype(bool)
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+    order = np.argsort(-probabilities, kind="stable")
+    # rows above each cutoff are a prefix of the descending order
+    signals = np.searchsorted(-probabilities[order], -thresholds, side="left")
+
+    def prefix(values):
+        return np.concatenate(([0], np.cumsum(values[order])))[signals]
+
+    hits = prefix(expected)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        table = pd.DataFrame(
+            {
+                "signals": signals,
+                "density": signals / max(len(probabilities), 1),
+                "precision": np.where(signals > 0, hits / signals, np.nan),
+                "recall": hits / max(expected.sum(), 1),
+            },
+            index=pd.Index(thresholds, name="threshold"),
+        )
+        if returns is not None:
+            returns = np.asarray(returns, dtype=np.float64)
+            traded = np.isfinite(returns)
+            trades = prefix(traded)
+            total = prefix(np.where(traded, returns, 0.0))
+            table["trades"] = trades
+            table["hit_rate"] = np.where(
+                trades > 0, prefix(traded & (returns > 0)) / trades, np.nan
+            )
+            table["mean_return"] = np.where(trades > 0, total / trades, np.nan)
+            table["total_return"] = total
+    return table
+
+
+def sweep_frame(frame, close=None, thresholds=THRESHOLDS, target=0.03, horizon=3):
+    """sweep() a prediction file's frame; close is a date indexed Series."""
+    returns = None
+    if close is not None:
+        dates = frame.index.astype(str).str[:10]
+        close = close.copy()
+        close.index = close.index.astype(str).str[:10]
+        returns = trade_returns(close.reindex(dates).to_numpy(), target, horizon)
+    return sweep(frame["probability"], frame["expected"], thresholds, returns)
+
+
+def cutoff_path(path, threshold, out_dir=None):
+    stem, ext = os.path.splitext(path)
+    if out_dir is not None:
+        stem = os.path.join(out_dir, os.path.basename(stem))
+    return "%s_t%.3f%s" % (stem, threshold, ext)
+
+
+def emit(frame, thresholds, path, out_dir=None):
+    """Write the prediction file again for each cutoff; returns the paths."""
+    paths = []
+    probabilities = frame["probability"].to_numpy()
+    if out_dir is not None:
+        os.makedirs(out_dir, exist_ok=True)
+    for threshold in thresholds:
+        test_DF = pipeline.prediction_frame(
+            frame.index,
+            (probabilities > threshold).astype("int32"),
+            frame["expected"].to_numpy(),
+            frame["ticker"].iloc[0] if len(frame) else "",
+            probabilities=probabilities,
+        )
+        paths.append(cutoff_path(path, threshold, out_dir))
+        test_DF.to_csv(paths[-1])
+    return paths
+
+
+if __name__ == "__main__":
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("prediction", help="a *_pred_*.csv with a probability column")
+    parser.add_argument("--bars", help="daily bars CSV (date, close/adjusted_close)")
+    parser.add_argument("--emit", type=float, nargs="*", default=[])
+    parser.add_argument("--out", help="write the sweep table to this CSV")
+    parser.add_argument("--out-dir", help="directory for the emitted files")
+    args = parser.parse_args()
+    frame = pd.read_csv(args.prediction, index_col="date")
+    close = None
+    if args.bars:
+        bars = pd.read_csv(args.bars, index_col=0)
+        close = bars["adjusted_close" if "adjusted_close" in bars else "close"]
+    table = sweep_frame(frame, close)
+    if args.out:
+        table.to_csv(args.out)
+    print(table.iloc[::10].round(3).to_string())
+    for path in emit(frame, args.emit, args.prediction, args.out_dir):
+        print(path)
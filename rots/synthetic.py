@@ -0,0 +1,179 @@
+"""Deterministic synthetic price data for benchmarks and scale tests.
+
+synthetic_ohlc is a plain GBM; regime_switching_ohlc switches drift and
+volatility between calm, choppy and crash regimes with a Markov chain, which
+gives the label and the indicators something closer to real market structure.
+synthetic_minutes fills each daily bar with 390 minute bars.
+synthetic_option_chain prices a chain off any bar with Black-Scholes.
+"""
+
+import numpy as np
+import pandas as pd
+
+# (daily drift, daily volatility) per regime: calm bull, choppy, crash
+REGIMES = np.array([[0.0006, 0.012], [0.0, 0.022], [-0.002, 0.045]])
+# daily regime transition probabilities, rows sum to 1
+TRANSITIONS = np.array(
+    [
+        [0.985, 0.012, 0.003],
+        [0.020, 0.970, 0.010],
+        [0.030, 0.070, 0.900],
+    ]
+)
+
+
+def _bars(returns, vol, rng, start, price):
+    n_days = len(returns)
+    close = price * np.exp(np.cumsum(returns))
+    open_ = np.concatenate(([price], close[:-1])) * np.exp(
+        rng.normal(0, 1, n_days) * vol / 4
+    )
+    spread = np.abs(rng.normal(0, 1, n_days) * vol / 2)
+    high = np.maximum(open_, close) * (1 + spread)
+    low = np.minimum(open_, close) * (1 - spread)
+    volume = rng.lognormal(15, 0.5, n_days).astype(np.int64)
+    return pd.DataFrame(
+        {
+            "open": open_,
+            "high": high,
+            "low": low,
+            "close": close,
+            "adjusted_close": close,
+            "volume": volume,
+        },
+        index=pd.bdate_range(start, periods=n_days, name="date"),
+    )
+
+
+def synthetic_ohlc(
+    n_days, seed=0, start="2010-01-04", price=100.0, drift=0.0003, vol=0.02
+):
+    """Daily OHLCV bars from a geometric Brownian motion, same seed -> same bars."""
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(drift - 0.5 * vol**2, vol, n_days)
+    return _bars(returns, vol, rng, start, price)
+
+
+def regime_path(n_days, rng, transitions=TRANSITIONS):
+    """Markov chain of regime indices, one per day."""
+    # draw all uniforms at once, then walk the chain with cumulative rows
+    uniforms = rng.random(n_days)
+    cumulative = np.cumsum(transitions, axis=1)
+    path = np.empty(n_days, dtype=np.int64)
+    state = 0
+    for day, u in enumerate(uniforms):
+        state = min(int(np.searchsorted(cumulative[state], u)), len(transitions) - 1)
+        path[day] = state
+    return path
+
+
+def regime_switching_ohlc(n_days, seed=0, start="2010-01-04", price=None):
+    """Daily bars from a GBM whose drift/volatility switch between REGIMES."""
+    rng = np.random.default_rng(seed)
+    price = price or float(rng.uniform(10, 500))
+    path = regime_path(n_days, rng)
+    drift, vol = REGIMES[path, 0], REGIMES[path, 1]
+    returns = drift - 0.5 * vol**2 + vol * rng.normal(0, 1, n_days)
+    return _bars(returns, vol, rng, start, price)
+
+
+def synthetic_minutes(daily, seed=0):
+    """Minute bars (09:30-15:59, indexed by bar start) for daily bars.
+
+    Each day's minute closes are a Brownian bridge from the day's open to
+    its close, so resampling them back to a day gives the same open and
+    close (the high and low follow the path, not the daily bar).
+    """
+    rng = np.random.default_rng(seed)
+    n_days = len(daily)
+    open_ = daily["open"].to_numpy(dtype=np.float64)
+    close = daily["close"].to_numpy(dtype=np.float64)
+    vol = np.abs(np.log(close / open_)).mean() + 0.01
+    steps = rng.normal(0, vol / np.sqrt(390), (n_days, 390)).cumsum(axis=1)
+    fraction = np.arange(1, 391) / 390.0
+    bridge = steps - fraction * steps[:, -1:]
+    log_path = np.log(open_)[:, None] + fraction * np.log(close / open_)[:, None]
+    closes = np.exp(log_path + bridge)
+    opens = np.concatenate((open_[:, None], closes[:, :-1]), axis=1)
+    wick = np.abs(rng.normal(0, vol / np.sqrt(390) / 2, (n_days, 390)))
+    days = np.asarray(daily.index.normalize(), dtype="datetime64[m]")
+    index = (days[:, None] + np.timedelta64(570, "m") + np.arange(390)).ravel()
+    volume = (daily["volume"].to_numpy()[:, None] / 390).astype(np.int64)
+    return pd.DataFrame(
+        {
+            "open": opens.ravel(),
+            "high": (np.maximum(opens, closes) * (1 + wick)).ravel(),
+            "low": (np.minimum(opens, closes) * (1 - wick)).ravel(),
+            "close": closes.ravel(),
+            "volume": np.repeat(volume, 390, axis=1).ravel(),
+        },
+        index=pd.DatetimeIndex(index, name="date"),
+    )
+
+
+def synthetic_universe(n_tickers, years, seed=0, start="2010-01-04"):
+    """Yield (ticker, bars) for n_tickers regime-switching histories.
+
+    A generator, so a universe of thousands of tickers never has to be held
+    in memory at once. Each ticker gets its own seed derived from `seed`.
+    """
+    n_days = int(252 * years)
+    seeds = np.random.SeedSequence(seed).spawn(n_tickers)
+    for i, ticker_seed in enumerate(seeds):
+        yield f"SYN{i:05d}", regime_switching_ohlc(
+            n_days, seed=ticker_seed, start=start
+        )
+
+
+def black_scholes(spot, strike, years, vol, rate=0.01, right=0):
+    """Black-Scholes price; right 0 is a call and 1 is a put (QC's OptionRight)."""
+    from scipy.special import ndtr
+
+    years = np.maximum(years, 1e-8)
+    root = vol * np.sqrt(years)
+    d1 = (np.log(spot / strike) + (rate + 0.5 * vol**2) * years) / root
+    d2 = d1 - root
+    discount = strike * np.exp(-rate * years)
+    call = spot * ndtr(d1) - discount * ndtr(d2)
+    put = discount * ndtr(-d2) - spot * ndtr(-d1)
+    return np.where(np.asarray(right) == 0, call, put)
+
+
+def synthetic_option_chain(
+    spot,
+    date,
+    vol,
+    seed=0,
+    strike_step=None,
+    strike_range=0.3,
+    expiry_days=(7, 14, 21, 28, 35, 42, 63),
+    rate=0.01,
+):
+    """Calls and puts around `spot` priced with Black-Scholes plus a spread.
+
+    Returns a dict of equal length arrays: strike, expiry, right, bid, ask,
+    underlying. Implied volatility has a mild smile around the money.
+    """
+    rng = np.random.default_rng(seed)
+    date = np.datetime64(date, "D")
+    strike_step = strike_step or max(0.5, round(spot * 0.01 * 2) / 2)
+    strikes = np.arange(
+        np.floor(spot * (1 - strike_range) / strike_step) * strike_step,
+        spot * (1 + strike_range) + strike_step,
+        strike_step,
+    )
+    days = np.asarray(expiry_days)
+    strike, day, right = (
+        a.ravel() for a in np.meshgrid(strikes, days, [0, 1], indexing="ij")
+    )
+    smile = vol * (1 + 0.5 * np.log(strike / spot) ** 2 * 10)
+    mid = black_scholes(spot, strike, day / 365.0, smile, rate, right)
+    half_spread = np.maximum(0.01, mid * rng.uniform(0.01, 0.05, len(mid)))
+    return {
+        "strike": strike,
+        "expiry": date + day.astype("timedelta64[D]"),
+        "right": right.astype(np.int8),
+        "bid": np.round(np.maximum(mid - half_spread, 0.0), 2),
+        "ask": np.round(mid + half_spread, 2),
+        "underlying": np.full(len(strike), spot),
+    }
@@ -0,0 +1,184 @@
+"""Several (threshold, horizon) targets from one network.
+
+The archive keeps a separate model and prediction file per target
+(TQQQ_pred for 3% within 3 days, TQQQ_5pct_pred, TQQQ_3pct1day_pred), each
+from its own full training run. Here the label of every target is a column
+of one label matrix and the ROTS network gets one sigmoid output unit per
+target on the shared 12 -> 10 -> 8 trunk, so one fit and one forward pass
+give every signal:
+
+    python -m rots.targets TSLA --bars TSLA_bars.csv --model-dir models
+
+The export is one <TICKER>_targets_<date>.csv with a prediction, probability
+and expected column per target (prediction_5pct, ...). The name keeps it out
+of the *_pred_*.csv globs of rots.evaluate and the QC algorithms; split()
+writes the archive style per-target prediction files when those are needed.
+"""
+
+import argparse
+import datetime
+import json
+import os
+
+import numpy as np
+
+from rots import features, labels, model, pipeline
+from rots.instrument import Recorder
+
+TARGETS = [(0.03, 3), (0.05, 3), (0.03, 1)]
+
+
+def target_name(threshold, horizon):
+    """5pct, 3pct1day, ...: the archive file names without the 3 day default."""
+    name = "%gpct" % round(threshold * 100, 2)
+    return name if horizon == 3 else "%s%dday" % (name, horizon)
+
+
+def label_matrix(bars, index, targets=TARGETS):
+    """Label of every target for the rows of index, one column per target."""
+    import pandas as pd
+
+    close = bars["adjusted_close"].to_numpy()
+    return np.column_stack(
+        [
+            pd.Series(labels.expected_labels(close, threshold, horizon), bars.index)
+            .reindex(index)
+            .to_numpy()
+            for threshold, horizon in targets
+        ]
+    ).astype(np.float32)
+
+
+def targets_path(ticker, out_dir=".", today=None):
+    today = today or datetime.date.today()
+    return os.path.join(out_dir, "%s_targets_%s.csv" % (ticker, today))
+
+
+def model_paths(ticker, model_dir):
+    base = os.path.join(model_dir, "%s_targets" % ticker)
+    return base + ".h5", base + ".json"
+
+
+def targets_frame(dates, probabilities, expected, ticker, targets=TARGETS):
+    """prediction/probability/expected per target, then the ticker."""
+    import pandas as pd
+
+    test_DF = pd.DataFrame(index=pd.Index(dates, name="date"))
+    for j, (threshold, horizon) in enumerate(targets):
+        name = target_name(threshold, horizon)
+        test_DF["prediction_" + name] = (
+            probabilities[:, j] > pipeline.THRESHOLD
+        ).astype("int32")
+        test_DF["probability_" + name] = probabilities[:, j]
+        test_DF["expected_" + name] = np.asarray(expected)[:, j].astype(int)
+    test_DF["ticker"] = ticker
+    return test_DF
+
+
+def split(frame, path, targets=TARGETS, out_dir="."):
+    """Write one pipeline.prediction_frame file per target; returns the paths."""
+    ticker = frame["ticker"].iloc[0] if len(frame) else ""
+    date = os.path.splitext(os.path.basename(path))[0].rsplit("_", 1)[-1]
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for threshold, horizon in targets:
+        name = target_name(threshold, horizon)
+        test_DF = pipeline.prediction_frame(
+            frame.index,
+            frame["prediction_" + name].to_numpy(),
+            frame["expected_" + name].to_numpy(),
+            ticker,
+            probabilities=frame["probability_" + name].to_numpy(),
+        )
+        paths.append(os.path.join(out_dir, "%s_%s_pred_%s.csv" % (ticker, name, date)))
+        test_DF.to_csv(paths[-1])
+    return paths
+
+
+def run(
+    ticker,
+    bars=None,
+    out_dir=".",
+    targets=TARGETS,
+    recorder=None,
+    epochs=model.EPOCHS,
+    model_dir=None,
+):
+    """pipeline.run with a label column per target; returns (path, fitted)."""
+    recorder = recorder or Recorder()
+    if bars is None:
+        with recorder.stage("fetch", ticker=ticker) as record:
+            bars = pipeline.fetch_bars(ticker)
+            record["rows"] = len(bars)
+
+    with recorder.stage("features", ticker=ticker) as record:
+        history = pipeline.labelled(bars)
+        data = features.last_years(history)
+        y = label_matrix(bars, data.index, targets)
+        record["rows"] = len(data)
+
+    with recorder.stage("scale", ticker=ticker) as record:
+        scaler, X = pipeline.scale(ticker, history, len(data))
+        record["rows"] = len(X)
+
+    with recorder.stage("fit", ticker=ticker, epochs=epochs, targets=len(targets)):
+        fitted = model.train(X, y, epochs=epochs)
+
+    if model_dir is not None:
+        with recorder.stage("save", ticker=ticker):
+            os.makedirs(model_dir, exist_ok=True)
+            network_path, targets_file = model_paths(ticker, model_dir)
+            fitted.save(network_path)
+            with open(targets_file, "w") as f:
+                json.dump([list(target) for target in targets], f)
+            scaler.save(pipeline.scaler_path(ticker, model_dir))
+
+    with recorder.stage("predict", ticker=ticker) as record:
+        probabilities = model.DenseWeights.from_model(fitted).forward(X)
+        record["rows"] = len(probabilities)
+
+    with recorder.stage("export", ticker=ticker) as record:
+        test_DF = targets_frame(
+            pipeline.date_strings(data.index), probabilities, y, ticker, targets
+        )
+        os.makedirs(out_dir, exist_ok=True)
+        path = targets_path(ticker, out_dir)
+        test_DF.to_csv(path)
+        record["rows"] = len(test_DF)
+    return path, fitted
+
+
+def load(ticker, model_dir):
+    """The saved network (numpy forward pass) and its targets."""
+    network_path, targets_file = model_paths(ticker, model_dir)
+    with open(targets_file) as f:
+        targets = [tuple(target) for target in json.load(f)]
+    return model.DenseWeights.from_h5(network_path), targets
+
+
+if __name__ == "__main__":
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("ticker")
+    parser.add_argument("--bars", help="bars CSV instead of fetching")
+    parser.add_argument("--epochs", type=int, default=model.EPOCHS)
+    parser.add_argument("--model-dir")
+    parser.add_argument("--out-dir", default=".")
+    parser.add_argument(
+        "--split", action="store_true", help="also write one file per target"
+    )
+    args = parser.parse_args()
+    bars = pd.read_csv(args.bars, index_col=0, parse_dates=True) if args.bars else None
+    path, _ = run(
+        args.ticker,
+        bars=bars,
+        out_dir=args.out_dir,
+        epochs=args.epochs,
+        model_dir=args.model_dir,
+    )
+    print(path)
+    if args.split:
+        frame = pd.read_csv(path, index_col="date")
+        for target_path in split(frame, path, out_dir=args.out_dir):
+            print(target_path)